@@ -12,6 +12,7 @@ from bfcl.constant import (
     SCORE_PATH,
     TEST_COLLECTION_MAPPING,
 )
+from bfcl.eval_checker.constant import SIMULATOR_CALL_MEMORY_LIMIT, SIMULATOR_CALL_TIME_LIMIT
 from bfcl.eval_checker.eval_runner import main as evaluation_main
 from bfcl.model_handler.handler_map import HANDLER_MAP
 from dotenv import load_dotenv
@@ -134,6 +135,51 @@ def generate(
         "--run-ids",
         help="If true, also run the test entry mentioned in the test_case_ids_to_generate.json file, in addition to the --test_category argument.",
     ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Query the model in streaming mode and record time-to-first-token metrics in the result metadata.",
+    ),
+    batch_api: bool = typer.Option(
+        False,
+        "--batch-api",
+        help="Submit the single-turn entries through the provider's batch API (OpenAI, Anthropic and Gemini models) instead of querying them one by one.",
+    ),
+    simulator_processes: int = typer.Option(
+        0,
+        "--simulator-processes",
+        help="Number of isolated worker processes that execute the multi-turn function calls, with per-call time and memory limits. By default, they are executed in the main process, without limits.",
+    ),
+    simulator_time_limit: float = typer.Option(
+        SIMULATOR_CALL_TIME_LIMIT,
+        "--simulator-time-limit",
+        help="Wall time and CPU time limit of each multi-turn function call, in seconds; only with --simulator-processes.",
+    ),
+    simulator_memory_limit: int = typer.Option(
+        SIMULATOR_CALL_MEMORY_LIMIT,
+        "--simulator-memory-limit",
+        help="Memory limit of each multi-turn function call, in MiB; only with --simulator-processes.",
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Write the timings of the hot paths, per phase and per test category, to profile_metrics.json in the result folder.",
+    ),
+    profile_sampling: bool = typer.Option(
+        False,
+        "--profile-sampling",
+        help="With --profile, also write the sampled call stacks to profile_stacks.txt in the result folder.",
+    ),
+    metrics_textfile: str = typer.Option(
+        None,
+        "--metrics-textfile",
+        help="Path of a file where the live generation metrics are periodically written in the Prometheus text format.",
+    ),
+    metrics_port: int = typer.Option(
+        None,
+        "--metrics-port",
+        help="Serve the live generation metrics in the Prometheus text format on /metrics at this port.",
+    ),
 ):
     """
     Generate the LLM response for one or more models on a test-category (same as openfunctions_evaluation.py).
@@ -153,6 +199,15 @@ def generate(
         result_dir=result_dir,
         allow_overwrite=allow_overwrite,
         run_ids=run_ids,
+        stream=stream,
+        batch_api=batch_api,
+        simulator_processes=simulator_processes,
+        simulator_time_limit=simulator_time_limit,
+        simulator_memory_limit=simulator_memory_limit,
+        profile=profile,
+        profile_sampling=profile_sampling,
+        metrics_textfile=metrics_textfile,
+        metrics_port=metrics_port,
     )
     load_dotenv(dotenv_path=DOTENV_PATH, verbose=True, override=True)  # Load the .env file
     generation_main(args)
@@ -242,13 +297,79 @@ def evaluate(
         "--score-dir",
         help="Relative path to the evaluation score folder, if different from the default; Path should be relative to the `berkeley-function-call-leaderboard` root folder",
     ),
+    decode_processes: int = typer.Option(
+        1,
+        "--decode-processes",
+        help="Number of worker processes used to decode the model responses.",
+    ),
+    partial_eval: bool = typer.Option(
+        False,
+        "--partial-eval",
+        help="Only evaluate the entries present in the result files; the accuracy is computed over those entries only.",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Only re-check the entries that changed since the previous evaluation, and patch the existing score files.",
+    ),
+    compact_score_files: bool = typer.Option(
+        False,
+        "--compact-score-files",
+        help="Store each distinct function doc, inference log, raw model result and instance state of the score files only once.",
+    ),
+    simulator_processes: int = typer.Option(
+        0,
+        "--simulator-processes",
+        help="Number of isolated worker processes that execute the multi-turn function calls, with per-call time and memory limits. By default, they are executed in the main process, without limits.",
+    ),
+    simulator_time_limit: float = typer.Option(
+        SIMULATOR_CALL_TIME_LIMIT,
+        "--simulator-time-limit",
+        help="Wall time and CPU time limit of each multi-turn function call, in seconds; only with --simulator-processes.",
+    ),
+    simulator_memory_limit: int = typer.Option(
+        SIMULATOR_CALL_MEMORY_LIMIT,
+        "--simulator-memory-limit",
+        help="Memory limit of each multi-turn function call, in MiB; only with --simulator-processes.",
+    ),
+    multi_turn_processes: int = typer.Option(
+        1,
+        "--multi-turn-processes",
+        help="Number of worker processes that check the multi-turn entries in parallel.",
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Write the timings of the hot paths, per phase and per test category, to profile_metrics.json in the score folder.",
+    ),
+    profile_sampling: bool = typer.Option(
+        False,
+        "--profile-sampling",
+        help="With --profile, also write the sampled call stacks to profile_stacks.txt in the score folder.",
+    ),
 ):
     """
     Evaluate results from run of one or more models on a test-category (same as eval_runner.py).
     """
 
     load_dotenv(dotenv_path=DOTENV_PATH, verbose=True, override=True)  # Load the .env file
-    evaluation_main(model, test_category, api_sanity_check, result_dir, score_dir)
+    evaluation_main(
+        model,
+        test_category,
+        api_sanity_check,
+        result_dir,
+        score_dir,
+        decode_processes,
+        partial_eval,
+        incremental,
+        compact_score_files,
+        simulator_processes,
+        simulator_time_limit,
+        simulator_memory_limit,
+        multi_turn_processes,
+        profile,
+        profile_sampling,
+    )
 
 
 @cli.command()
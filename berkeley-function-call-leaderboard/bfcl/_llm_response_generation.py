@@ -18,9 +18,25 @@ from bfcl.constant import (
     TEST_FILE_MAPPING,
     TEST_IDS_TO_GENERATE_PATH,
 )
+from bfcl.eval_checker.constant import SIMULATOR_CALL_MEMORY_LIMIT, SIMULATOR_CALL_TIME_LIMIT
 from bfcl.eval_checker.eval_runner_helper import load_file
+from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import set_simulator_executor
+from bfcl.eval_checker.multi_turn_eval.simulator_executor import IsolatedSimulatorExecutor
+from bfcl.metrics_exporter import (
+    GenerationMetrics,
+    record_entry_completed,
+    record_retry,
+    set_generation_metrics,
+)
 from bfcl.model_handler.handler_map import HANDLER_MAP
 from bfcl.model_handler.model_style import ModelStyle
+from bfcl.profiling import (
+    PROFILE_SAMPLE_INTERVAL,
+    PhaseProfiler,
+    instrument_handler,
+    set_profile_category,
+    set_profiler,
+)
 from bfcl.utils import (
     check_api_key_supplied,
     is_executable,
@@ -63,13 +79,67 @@ def get_args():
         default=False,
         help="Skip vLLM/SGLang server setup and use existing endpoint specified by the VLLM_ENDPOINT and VLLM_PORT environment variables.",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=False,
+        help="Query the model in streaming mode and record time-to-first-token metrics.",
+    )
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        default=False,
+        help="Submit the single-turn entries through the provider's batch API instead of querying them one by one.",
+    )
+    parser.add_argument(
+        "--simulator-processes",
+        default=0,
+        type=int,
+        help="Number of isolated worker processes that execute the multi-turn function calls, with per-call time and memory limits. By default, they are executed in the main process, without limits.",
+    )
+    parser.add_argument(
+        "--simulator-time-limit",
+        default=SIMULATOR_CALL_TIME_LIMIT,
+        type=float,
+        help="Wall time and CPU time limit of each multi-turn function call, in seconds; only with `--simulator-processes`.",
+    )
+    parser.add_argument(
+        "--simulator-memory-limit",
+        default=SIMULATOR_CALL_MEMORY_LIMIT,
+        type=int,
+        help="Memory limit of each multi-turn function call, in MiB; only with `--simulator-processes`.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Time the hot paths of the generation (handler phases, multi-turn execution, file I/O) and write the timings per phase and per test category to `profile_metrics.json` in the result folder.",
+    )
+    parser.add_argument(
+        "--profile-sampling",
+        action="store_true",
+        default=False,
+        help="With `--profile`, also sample the call stacks of the run and write them to `profile_stacks.txt` in the result folder, in the collapsed (flame graph) format.",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        default=None,
+        type=str,
+        help="Path of a file where the live generation metrics (queries in flight, completed entries, retries, tokens, latency quantiles) are periodically written in the Prometheus text format, eg, for the node_exporter textfile collector.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        default=None,
+        type=int,
+        help="Serve the live generation metrics in the Prometheus text format on `/metrics` at this port.",
+    )
     args = parser.parse_args()
     return args
 
 
 def build_handler(model_name, temperature):
     handler = HANDLER_MAP[model_name](model_name, temperature)
-    return handler
+    return instrument_handler(handler)
 
 
 def get_involved_test_entries(test_category_args, run_ids):
@@ -276,6 +346,7 @@ def multi_threaded_inference(handler, test_case, include_input_log, exclude_stat
 
     assert type(test_case["function"]) is list
 
+    set_profile_category(test_case["id"].rsplit("_", 1)[0])
     retry_count = 0
 
     logger.info(f"Generating result for test case: {test_case['id']}")
@@ -294,6 +365,7 @@ def multi_threaded_inference(handler, test_case, include_input_log, exclude_stat
                 logger.warning(
                     f"❗️ Rate limit reached. Sleeping for {RETRY_DELAY} seconds. Test case ID: {test_case['id']}, Error: {str(e)}. Retry {retry_count + 1}/{RETRY_LIMIT}"
                 )
+                record_retry(handler, e)
                 time.sleep(RETRY_DELAY)
                 # NOTE let's skip to increment the retry counter if the error is an ASI 'something went wrong'
                 if "something went wrong" not in str(e).lower():
@@ -337,10 +409,12 @@ def multi_threaded_inference(handler, test_case, include_input_log, exclude_stat
                     f"❗️❗️❗️ Error occurred during inference. Maximum retries reached for rate limit or other error. Continuing to next test case. Test case ID: {test_case['id']}, Error: {str(e)}"
                 )
 
-                return {
+                result_to_write = {
                     "id": test_case["id"],
                     "result": f"Error during inference: {str(e)}",
                 }
+                record_entry_completed(handler, result_to_write)
+                return result_to_write
 
     result_to_write = {
         "id": test_case["id"],
@@ -348,6 +422,7 @@ def multi_threaded_inference(handler, test_case, include_input_log, exclude_stat
     }
 
     result_to_write.update(metadata)
+    record_entry_completed(handler, result_to_write)
 
     return result_to_write
 
@@ -355,6 +430,13 @@ def multi_threaded_inference(handler, test_case, include_input_log, exclude_stat
 def generate_results(args, model_name, test_cases_total):
     update_mode = args.allow_overwrite
     handler = build_handler(model_name, args.temperature)
+    if args.stream:
+        if handler.supports_streaming():
+            handler.stream = True
+        else:
+            print(
+                f"Warning: {model_name} does not support streaming mode; falling back to non-streaming queries."
+            )
 
     if handler.model_style == ModelStyle.OSSMODEL:
         # batch_inference will handle the writing of results
@@ -371,8 +453,33 @@ def generate_results(args, model_name, test_cases_total):
         )
 
     else:
+        # The batch job runs alongside the individual queries, as it can take up to a day to complete
+        batch_executor = ThreadPoolExecutor(max_workers=1)
+        batch_future = None
+        if args.batch_api:
+            if handler.supports_batch_api():
+                # Only single-turn entries can be batched, as each step of a multi-turn entry depends on the previous response
+                single_turn_test_cases = [
+                    test_case for test_case in test_cases_total if not is_multi_turn(test_case["id"])
+                ]
+                test_cases_total = [
+                    test_case for test_case in test_cases_total if is_multi_turn(test_case["id"])
+                ]
+                if single_turn_test_cases:
+                    batch_future = batch_executor.submit(
+                        handler.batch_api_inference,
+                        test_entries=single_turn_test_cases,
+                        include_input_log=args.include_input_log,
+                        result_dir=args.result_dir,
+                        update_mode=args.run_ids,
+                    )
+            else:
+                print(
+                    f"Warning: {model_name} does not support the batch API mode; falling back to individual queries."
+                )
+
         futures = []
-        with ThreadPoolExecutor(max_workers=args.num_threads) as executor:
+        with batch_executor, ThreadPoolExecutor(max_workers=args.num_threads) as executor:
             with tqdm(total=len(test_cases_total), desc=f"Generating results for {model_name}") as pbar:
 
                 for test_case in test_cases_total:
@@ -393,6 +500,9 @@ def generate_results(args, model_name, test_cases_total):
                     )  # Only when we run specific test ids, we will need update_mode=True to keep entries in the same order
                     pbar.update()
 
+            if batch_future is not None:
+                batch_future.result()
+
 
 def main(args):
 
@@ -401,6 +511,16 @@ def main(args):
     if type(args.test_category) is not list:
         args.test_category = [args.test_category]
 
+    profiler = None
+    if args.profile:
+        profiler = PhaseProfiler(sample_interval=PROFILE_SAMPLE_INTERVAL if args.profile_sampling else None)
+        set_profiler(profiler)
+
+    generation_metrics = None
+    if args.metrics_textfile is not None or args.metrics_port is not None:
+        generation_metrics = GenerationMetrics(textfile_path=args.metrics_textfile, port=args.metrics_port)
+        set_generation_metrics(generation_metrics)
+
     (
         all_test_file_paths,
         all_test_categories,
@@ -434,6 +554,13 @@ def main(args):
     else:
         args.result_dir = RESULT_PATH
 
+    if args.simulator_processes > 0:
+        set_simulator_executor(
+            IsolatedSimulatorExecutor(
+                args.simulator_processes, args.simulator_time_limit, memory_limit=args.simulator_memory_limit
+            )
+        )
+
     # Set logger
     root_logger = logging.getLogger("response_generation")
     file_handler = logging.FileHandler(f"{args.result_dir}/results.log", mode="w")
@@ -459,3 +586,10 @@ def main(args):
             print(f"Generating results for model {model_name} with {len(test_cases_total)} test cases.")
             logger.info(f"Generating results for model {model_name} with {len(test_cases_total)} test cases.")
             generate_results(args, model_name, test_cases_total)
+
+    if generation_metrics is not None:
+        generation_metrics.close()
+
+    if profiler is not None:
+        profiler.write(args.result_dir)
+        print(f"⏱️ Profiling metrics written to {args.result_dir}.")
@@ -227,3 +227,10 @@ TEST_IDS_TO_GENERATE_PATH = (script_dir / TEST_IDS_TO_GENERATE_PATH).resolve()
 
 RESULT_PATH.mkdir(parents=True, exist_ok=True)
 SCORE_PATH.mkdir(parents=True, exist_ok=True)
+
+# The synthetic scaled-up multi-turn categories, generated by `utils/generate_scaled_multi_turn_dataset.py`, are registered when present
+# They are left out of all the other collections, as they are meant for stress testing, not for the leaderboard
+for scaled_file_path in sorted(PROMPT_PATH.glob(f"{VERSION_PREFIX}_multi_turn_*_scaled_*.json")):
+    scaled_test_category = scaled_file_path.stem[len(VERSION_PREFIX) + 1 :]
+    TEST_FILE_MAPPING[scaled_test_category] = scaled_file_path.name
+    TEST_COLLECTION_MAPPING.setdefault("multi_turn_scaled", []).append(scaled_test_category)
@@ -25,32 +25,16 @@ PYTHON_NESTED_TYPE_CHECK_LIST = ["array", "tuple"]
 
 NESTED_CONVERSION_TYPE_LIST = ["Array", "ArrayList", "array"]
 
+STANDARDIZE_STRING_PATTERN = re.compile(r"[ \,\.\/\-\_\*\^]")
+
 
 #### Main function ####
 def ast_checker(
     func_description, model_output, possible_answer, language, test_category, model_name
 ):
-    if "parallel" in test_category:
-        return parallel_function_checker_no_order(
-            func_description, model_output, possible_answer, language, model_name
-        )
-        
-    elif "multiple" in test_category:
-        return multiple_function_checker(
-            func_description, model_output, possible_answer, language, model_name
-        )
-        
-    else:
-        if len(model_output) != 1:
-            return {
-                "valid": False,
-                "error": ["Wrong number of functions."],
-                "error_type": "simple_function_checker:wrong_count",
-            }
-
-        return simple_function_checker(
-            func_description[0], model_output[0], possible_answer[0], language, model_name
-        )
+    return CompiledASTChecker(
+        func_description, possible_answer, language, test_category
+    ).check(model_output, model_name)
 
 
 #### Helper functions for AST ####
@@ -89,78 +73,98 @@ def type_checker(
     expected_type_description: str,
     expected_type_converted,
     nested_type_converted,
+):
+    return _compile_type_checker(
+        param,
+        possible_answer,
+        expected_type_description,
+        expected_type_converted,
+        nested_type_converted,
+    )(value)
+
+
+def _compile_type_checker(
+    param: str,
+    possible_answer: list,
+    expected_type_description: str,
+    expected_type_converted,
+    nested_type_converted,
 ):
     # NOTE: This type checker only supports nested type checking for one level deep.
     # We didn't implement recursive type checking for nested types, as it's not needed for the current use case and it's very complex.
 
-    result = {
-        "valid": True,
-        "error": [],
-        "is_variable": False,
-        "error_type": "type_error:simple",
-    }
-
-    is_variable = False
-    # check for the case where a variable is used instead of a actual value.
+    # Everything that only depends on the possible answer is computed once here; the returned closure only looks at the value.
     # use the type in possible_answer as the expected type
     possible_answer_type = get_possible_answer_type(possible_answer)
+    # check for the case where a variable is used instead of a actual value.
     # if possible_answer only contains optional parameters, we can't determine the type
-    if possible_answer_type != None:
-        # we are being precise here.
-        # in fact, possible_answer_type should always be string, as that's how we treat varibale in possible_answer
-        if possible_answer_type != expected_type_converted:
-            is_variable = True
-
-    # value is the same type as in function description
-    if type(value) == expected_type_converted:
-        # We don't need to do recursive check for simple types
-        if nested_type_converted == None:
-            result["is_variable"] = is_variable
-            return result
-        else:
-            for possible_answer_item in possible_answer:
-                flag = True  # Each parameter should match to at least one possible answer type.
-                # Here, we assume that each item should be the same type. We could also relax it.
-                if type(possible_answer_item) == list:
-                    for value_item in value:
-                        checker_result = type_checker(
-                            param,
-                            value_item,
-                            possible_answer_item,
-                            str(nested_type_converted),
-                            nested_type_converted,
-                            None,
-                        )
-                        if not checker_result["valid"]:
-                            flag = False
-                            break
-
-                if flag:
-                    return {"valid": True, "error": [], "is_variable": is_variable}
+    # we are being precise here.
+    # in fact, possible_answer_type should always be string, as that's how we treat varibale in possible_answer
+    is_variable = (
+        possible_answer_type != None and possible_answer_type != expected_type_converted
+    )
 
-            result["valid"] = False
-            result["error"] = [
-                f"Nested type checking failed for parameter {repr(param)}. Expected outer type {expected_type_description} with inner type {str(nested_type_converted)}. Parameter value: {repr(value)}."
-            ]
-            result["error_type"] = "type_error:nested"
+    nested_checkers = []
+    if nested_type_converted != None:
+        for possible_answer_item in possible_answer:
+            # Each parameter should match to at least one possible answer type.
+            # Here, we assume that each item should be the same type. We could also relax it.
+            # A possible answer that is not a list puts no constraint on the inner type, which is marked with None.
+            if type(possible_answer_item) == list:
+                nested_checkers.append(
+                    _compile_type_checker(
+                        param,
+                        possible_answer_item,
+                        str(nested_type_converted),
+                        nested_type_converted,
+                        None,
+                    )
+                )
+            else:
+                nested_checkers.append(None)
+
+    def check(value):
+        result = {
+            "valid": True,
+            "error": [],
+            "is_variable": False,
+            "error_type": "type_error:simple",
+        }
 
-    # value is not as expected, check for the case where a variable is used instead of a actual value
-    # use the type in possible_answer as the expected type
-    possible_answer_type = get_possible_answer_type(possible_answer)
-    # if possible_answer only contains optional parameters, we can't determine the type
-    if possible_answer_type != None:
-        # we are being precise here.
-        # in fact, possible_answer_type should always be string, as that's how we treat varibale in possible_answer
-        if type(value) == possible_answer_type:
-            result["is_variable"] = True
-            return result
+        # value is the same type as in function description
+        if type(value) == expected_type_converted:
+            # We don't need to do recursive check for simple types
+            if nested_type_converted == None:
+                result["is_variable"] = is_variable
+                return result
+            else:
+                for nested_checker in nested_checkers:
+                    if nested_checker is None or all(
+                        nested_checker(value_item)["valid"] for value_item in value
+                    ):
+                        return {"valid": True, "error": [], "is_variable": is_variable}
 
-    result["valid"] = False
-    result["error"].append(
-        f"Incorrect type for parameter {repr(param)}. Expected type {expected_type_description}, got {type(value).__name__}. Parameter value: {repr(value)}."
-    )
-    result["error_type"] = "type_error:simple"
-    return result
+                result["valid"] = False
+                result["error"] = [
+                    f"Nested type checking failed for parameter {repr(param)}. Expected outer type {expected_type_description} with inner type {str(nested_type_converted)}. Parameter value: {repr(value)}."
+                ]
+                result["error_type"] = "type_error:nested"
+
+        # value is not as expected, check for the case where a variable is used instead of a actual value
+        # if possible_answer only contains optional parameters, we can't determine the type
+        if possible_answer_type != None:
+            if type(value) == possible_answer_type:
+                result["is_variable"] = True
+                return result
+
+        result["valid"] = False
+        result["error"].append(
+            f"Incorrect type for parameter {repr(param)}. Expected type {expected_type_description}, got {type(value).__name__}. Parameter value: {repr(value)}."
+        )
+        result["error_type"] = "type_error:simple"
+        return result
+
+    return check
 
 
 def standardize_string(input_string: str):
@@ -168,270 +172,413 @@ def standardize_string(input_string: str):
     # It will also convert all the single quotes to double quotes
     # This is used to compare the model output with the possible answers
     # We don't want to punish model for answer like April 1, 2024 vs April 1,2024, vs April 1 2024
-    regex_string = r"[ \,\.\/\-\_\*\^]"
-    return re.sub(regex_string, "", input_string).lower().replace("'", '"')
+    return STANDARDIZE_STRING_PATTERN.sub("", input_string).lower().replace("'", '"')
 
 
-def string_checker(param: str, model_output: str, possible_answer: list):
-    standardize_possible_answer = []
-    standardize_model_output = standardize_string(model_output)
-    for i in range(len(possible_answer)):
-        if type(possible_answer[i]) == str:
-            standardize_possible_answer.append(standardize_string(possible_answer[i]))
+def _standardize_list(items) -> list:
+    # Standardize the string elements of a list, and keep the other elements as is
+    standardized = []
+    for i in range(len(items)):
+        if type(items[i]) == str:
+            standardized.append(standardize_string(items[i]))
+        else:
+            standardized.append(items[i])
+    return standardized
 
-    if standardize_model_output not in standardize_possible_answer:
-        return {
-            "valid": False,
-            "error": [
-                f"Invalid value for parameter {repr(param)}: {repr(model_output)}. Expected one of {possible_answer}. Case insensitive."
-            ],
-            "error_type": "value_error:string",
-        }
 
-    return {"valid": True, "error": []}
+def string_checker(param: str, model_output: str, possible_answer: list):
+    return _StringAnswers(possible_answer).check(param, model_output)
 
 
 def list_checker(param: str, model_output: list, possible_answer: list):
-    # Convert the tuple to a list
-
-    standardize_model_output = list(model_output)
-
-    # If the element in the list is a string, we need to standardize it
-    for i in range(len(standardize_model_output)):
-        if type(standardize_model_output[i]) == str:
-            standardize_model_output[i] = standardize_string(model_output[i])
-
-    standardize_possible_answer = []
-    # We also need to standardize the possible answers
-    for i in range(len(possible_answer)):
-        standardize_possible_answer.append([])
-        for j in range(len(possible_answer[i])):
-            if type(possible_answer[i][j]) == str:
-                standardize_possible_answer[i].append(
-                    standardize_string(possible_answer[i][j])
-                )
-            else:
-                standardize_possible_answer[i].append(possible_answer[i][j])
+    return _ListAnswers(possible_answer).check(param, model_output)
+
+
+def dict_checker(param: str, model_output: dict, possible_answers: list):
+    return _DictAnswers(possible_answers).check(param, model_output)
+
+
+def list_dict_checker(param: str, model_output: list, possible_answers: list):
+    return _ListDictAnswers(possible_answers).check(param, model_output)
 
-    if standardize_model_output not in standardize_possible_answer:
+
+def simple_function_checker(
+    func_description: dict,
+    model_output: dict,
+    possible_answer: dict,
+    language: str,
+    model_name: str,
+):
+    return CompiledFunctionChecker(func_description, possible_answer, language).check(
+        model_output, model_name
+    )
+
+
+def parallel_function_checker_enforce_order(
+    func_descriptions: list,
+    model_output: list,
+    possible_answers: dict,
+    language: str,
+    model_name: str,
+):
+    if len(model_output) != len(possible_answers):
         return {
             "valid": False,
-            "error": [
-                f"Invalid value for parameter {repr(param)}: {repr(model_output)}. Expected one of {possible_answer}."
-            ],
-            "error_type": "value_error:list/tuple",
+            "error": ["Wrong number of functions."],
+            "error_type": "parallel_function_checker_enforce_order:wrong_count",
         }
 
+    func_name_list = list(possible_answers.keys())
+    possible_answers_list = []
+
+    for key, value in possible_answers.items():
+        possible_answers_list.append({key: value})
+
+    for i in range(len(possible_answers_list)):
+        func_description = find_description(func_descriptions, func_name_list[i])
+        
+        result = simple_function_checker(
+            func_description,
+            model_output[i],
+            possible_answers_list[i],
+            language,
+            model_name,
+        )
+        if not result["valid"]:
+            return result
+
     return {"valid": True, "error": []}
 
 
-def dict_checker(param: str, model_output: dict, possible_answers: list):
-    # This function works for simple dictionaries, but not dictionaries with nested dictionaries.
+def parallel_function_checker_no_order(
+    func_descriptions: list,
+    model_output: list,
+    possible_answers: list,
+    language: str,
+    model_name: str,
+):
+    return CompiledASTChecker(
+        func_descriptions, possible_answers, language, "parallel"
+    ).check(model_output, model_name)
+
+
+def multiple_function_checker(
+    func_descriptions: list,
+    model_output: list,
+    possible_answers: list,
+    language: str,
+    model_name: str,
+):
+    return CompiledASTChecker(
+        func_descriptions, possible_answers, language, "multiple"
+    ).check(model_output, model_name)
+
+
+#### Compiled checkers ####
+def _freeze(value):
+    # Hashable form of a (JSON-like) value, such that two frozen values are equal if and only if the values compare equal.
+    # Containers are tagged with their kind, as a list never compares equal to a tuple.
+    # Raises TypeError for values that can't be hashed.
+    if isinstance(value, list):
+        return ("list", tuple(_freeze(item) for item in value))
+    if isinstance(value, tuple):
+        return ("tuple", tuple(_freeze(item) for item in value))
+    if isinstance(value, dict):
+        return (
+            "dict",
+            frozenset((key, _freeze(item)) for key, item in value.items()),
+        )
+    hash(value)
+    return value
+
+
+class _HashedValues:
+    """
+    A list of possible values with the same membership semantics as `value in values`, but in O(1) for hashable values.
+    """
+
+    def __init__(self, values) -> None:
+        self.values = list(values)
+        self.hashed_values = set()
+        self.unhashable_values = []
+        for value in self.values:
+            try:
+                self.hashed_values.add(_freeze(value))
+            except TypeError:
+                self.unhashable_values.append(value)
+
+    def __contains__(self, value) -> bool:
+        try:
+            frozen_value = _freeze(value)
+        except TypeError:
+            return value in self.values
+        return frozen_value in self.hashed_values or value in self.unhashable_values
+
+
+class _StringAnswers:
+    def __init__(self, possible_answer: list) -> None:
+        self.possible_answer = possible_answer
+        self.standardized_possible_answer = _HashedValues(
+            standardize_string(answer) for answer in possible_answer if type(answer) == str
+        )
+
+    def check(self, param: str, model_output: str):
+        if standardize_string(model_output) not in self.standardized_possible_answer:
+            return {
+                "valid": False,
+                "error": [
+                    f"Invalid value for parameter {repr(param)}: {repr(model_output)}. Expected one of {self.possible_answer}. Case insensitive."
+                ],
+                "error_type": "value_error:string",
+            }
+
+        return {"valid": True, "error": []}
+
+
+class _ListAnswers:
+    def __init__(self, possible_answer: list) -> None:
+        self.possible_answer = possible_answer
+        # We also need to standardize the possible answers
+        self.standardized_possible_answer = _HashedValues(
+            _standardize_list(answer) for answer in possible_answer
+        )
+
+    def check(self, param: str, model_output: list):
+        # Convert the tuple to a list
+        # If the element in the list is a string, we need to standardize it
+        if _standardize_list(model_output) not in self.standardized_possible_answer:
+            return {
+                "valid": False,
+                "error": [
+                    f"Invalid value for parameter {repr(param)}: {repr(model_output)}. Expected one of {self.possible_answer}."
+                ],
+                "error_type": "value_error:list/tuple",
+            }
+
+        return {"valid": True, "error": []}
+
+
+class _DictAnswers:
+    # This works for simple dictionaries, but not dictionaries with nested dictionaries.
     # The current dataset only contains simple dictionaries, so this is sufficient.
 
-    result = {"valid": False, "error": [], "error_type": "dict_checker:unclear"}
-    for i in range(len(possible_answers)):
+    def __init__(self, possible_answers: list) -> None:
+        self.possible_answers = possible_answers
+        # (answer index, key) -> (standardized possible values, as a list for the error message and hashed for the lookup)
+        self._standardized_values = {}
+        # answer index -> keys that must be present in the model output
+        self._required_keys = {}
 
-        if possible_answers[i] == "":
-            continue
+    def _get_standardized_values(self, answer_index: int, key):
+        if (answer_index, key) not in self._standardized_values:
+            # We also need to standardize the possible answers if they are string
+            standardized = _standardize_list(self.possible_answers[answer_index][key])
+            self._standardized_values[(answer_index, key)] = (
+                standardized,
+                _HashedValues(standardized),
+            )
+        return self._standardized_values[(answer_index, key)]
+
+    def _get_required_keys(self, answer_index: int) -> list:
+        if answer_index not in self._required_keys:
+            self._required_keys[answer_index] = [
+                key
+                for key, value in self.possible_answers[answer_index].items()
+                if "" not in value
+            ]
+        return self._required_keys[answer_index]
 
+    def check(self, param: str, model_output: dict):
         result = {"valid": False, "error": [], "error_type": "dict_checker:unclear"}
+        for i in range(len(self.possible_answers)):
 
-        flag = True
+            if self.possible_answers[i] == "":
+                continue
 
-        possible_answer = possible_answers[i]
-        # possible_anwer is a single dictionary
-        
-        for key, value in model_output.items():
-            if key not in possible_answer:
-                result["valid"] = False
-                result["error"].append(f"Unexpected dict key parameter: '{key}'.")
-                result["error_type"] = "value_error:dict_key"
-                flag = False
-                break
+            result = {"valid": False, "error": [], "error_type": "dict_checker:unclear"}
 
-            standardize_value = value
-            # If the value is a string, we need to standardize it
-            if type(value) == str:
-                standardize_value = standardize_string(value)
-                
-            # We also need to standardize the possible answers if they are string
-            standardize_possible_answer = []
-            for i in range(len(possible_answer[key])):
-                if type(possible_answer[key][i]) == str:
-                    standardize_possible_answer.append(
-                        standardize_string(possible_answer[key][i])
-                    )
-                else:
-                    standardize_possible_answer.append(possible_answer[key][i])
+            flag = True
 
-            if standardize_value not in standardize_possible_answer:
-                result["valid"] = False
-                result["error"].append(
-                    f"Invalid value for parameter {repr(key)}: {repr(value)}. Expected one of {standardize_possible_answer}."
+            possible_answer = self.possible_answers[i]
+            # possible_anwer is a single dictionary
+
+            for key, value in model_output.items():
+                if key not in possible_answer:
+                    result["valid"] = False
+                    result["error"].append(f"Unexpected dict key parameter: '{key}'.")
+                    result["error_type"] = "value_error:dict_key"
+                    flag = False
+                    break
+
+                standardize_value = value
+                # If the value is a string, we need to standardize it
+                if type(value) == str:
+                    standardize_value = standardize_string(value)
+
+                standardize_possible_answer, hashed_possible_answer = (
+                    self._get_standardized_values(i, key)
                 )
-                result["error_type"] = "value_error:dict_value"
-                flag = False
-                break
-        
-        for key, value in possible_answer.items():
-            if key not in model_output and "" not in value:
-                result["valid"] = False
-                result["error"].append(f"Missing dict key parameter: '{key}'.")
-                result["error_type"] = "value_error:dict_key"
-                flag = False
-                break
-            
-        if flag:
-            return {"valid": True, "error": []}
+                if standardize_value not in hashed_possible_answer:
+                    result["valid"] = False
+                    result["error"].append(
+                        f"Invalid value for parameter {repr(key)}: {repr(value)}. Expected one of {standardize_possible_answer}."
+                    )
+                    result["error_type"] = "value_error:dict_value"
+                    flag = False
+                    break
 
-    return result
+            for key in self._get_required_keys(i):
+                if key not in model_output:
+                    result["valid"] = False
+                    result["error"].append(f"Missing dict key parameter: '{key}'.")
+                    result["error_type"] = "value_error:dict_key"
+                    flag = False
+                    break
 
+            if flag:
+                return {"valid": True, "error": []}
 
-def list_dict_checker(param: str, model_output: list, possible_answers: list):
-    # This function takes in a list of dictionaries and checks if each dictionary is valid
-    # The order of the dictionaries in the list must match the order of the possible answers
+        return result
 
-    result = {"valid": False, "error": [], "error_type": "list_dict_checker:unclear"}
 
-    for answer_index in range(len(possible_answers)):
-        flag = True  # True means so far, all dictionaries are valid
+class _ListDictAnswers:
+    # This takes in a list of dictionaries and checks if each dictionary is valid
+    # The order of the dictionaries in the list must match the order of the possible answers
 
-        # Only proceed if the number of dictionaries in the list matches the number of dictionaries in the possible answers
-        if len(model_output) != len(possible_answers[answer_index]):
-            result["valid"] = False
-            result["error"] = ["Wrong number of dictionaries in the list."]
-            result["error_type"] = "value_error:list_dict_count"
-            flag = False
-            continue
-
-        for dict_index in range(len(model_output)):
-            result = dict_checker(
-                param,
-                model_output[dict_index],
-                [possible_answers[answer_index][dict_index]],
-            )
-            if not result["valid"]:
-                flag = False
-                break
-        if flag:
-            return {"valid": True, "error": []}
+    def __init__(self, possible_answers: list) -> None:
+        self.possible_answers = possible_answers
+        # (answer index, dict index) -> _DictAnswers
+        self._dict_answers = {}
 
-    return result
+    def _get_dict_answers(self, answer_index: int, dict_index: int) -> _DictAnswers:
+        if (answer_index, dict_index) not in self._dict_answers:
+            self._dict_answers[(answer_index, dict_index)] = _DictAnswers(
+                [self.possible_answers[answer_index][dict_index]]
+            )
+        return self._dict_answers[(answer_index, dict_index)]
 
+    def check(self, param: str, model_output: list):
+        result = {"valid": False, "error": [], "error_type": "list_dict_checker:unclear"}
 
-def simple_function_checker(
-    func_description: dict,
-    model_output: dict,
-    possible_answer: dict,
-    language: str,
-    model_name: str,
-):
-    possible_answer = list(possible_answer.values())[0]
-    # Extract function name and parameters details
-    func_name = func_description["name"]
-    param_details = func_description["parameters"]["properties"]
-    required_params = func_description["parameters"]["required"]
-
-    # Initialize a result dictionary
-    result = {
-        "valid": True,
-        "error": [],
-        "error_type": "simple_function_checker:unclear",
-    }
-
-    func_name = convert_func_name(func_name, model_name)
-
-    # Check if function name matches
-    if func_name not in model_output:
-        result["valid"] = False
-        result["error"].append(
-            f"Function name {repr(func_name)} not found in model output."
-        )
-        result["error_type"] = "simple_function_checker:wrong_func_name"
-        return result
+        for answer_index in range(len(self.possible_answers)):
+            flag = True  # True means so far, all dictionaries are valid
 
-    model_params = model_output[func_name]
+            # Only proceed if the number of dictionaries in the list matches the number of dictionaries in the possible answers
+            if len(model_output) != len(self.possible_answers[answer_index]):
+                result["valid"] = False
+                result["error"] = ["Wrong number of dictionaries in the list."]
+                result["error_type"] = "value_error:list_dict_count"
+                flag = False
+                continue
 
-    # Check for required parameters in model output
-    for param in required_params:
-        if param not in model_params:
-            result["valid"] = False
-            result["error"].append(f"Missing required parameter: {repr(param)}.")
-            result["error_type"] = "simple_function_checker:missing_required"
-            return result
+            for dict_index in range(len(model_output)):
+                result = self._get_dict_answers(answer_index, dict_index).check(
+                    param, model_output[dict_index]
+                )
+                if not result["valid"]:
+                    flag = False
+                    break
+            if flag:
+                return {"valid": True, "error": []}
 
-    # Validate types and values for each parameter in model output
-    for param, value in model_params.items():
-        if param not in param_details or param not in possible_answer:
-            result["valid"] = False
-            result["error"].append(f"Unexpected parameter: {repr(param)}.")
-            result["error_type"] = "simple_function_checker:unexpected_param"
-            return result
+        return result
 
-        full_param_details = param_details[param]
-        expected_type_description = full_param_details["type"]  # This is a string
-        is_variable = False
-        nested_type_converted = None
 
-        if language == "Java":
-            expected_type_converted = JAVA_TYPE_CONVERSION[expected_type_description]
+class _CompiledParamChecker:
+    """
+    Type and value checker for one parameter of a function, against its possible answers.
+    """
 
-            if expected_type_description in JAVA_TYPE_CONVERSION:
-                if type(value) != str:
-                    result["valid"] = False
-                    result["error"].append(
-                        f"Incorrect type for parameter {repr(param)}. Expected type String, got {type(value).__name__}. Parameter value: {repr(value)}."
-                    )
-                    result["error_type"] = "type_error:java"
-                    return result
-
-                if expected_type_description in NESTED_CONVERSION_TYPE_LIST:
-                    nested_type = param_details[param]["items"]["type"]
-                    nested_type_converted = JAVA_TYPE_CONVERSION[nested_type]
-                    value = java_type_converter(
-                        value, expected_type_description, nested_type
-                    )
-                else:
-                    value = java_type_converter(value, expected_type_description)
+    def __init__(
+        self, param: str, full_param_details: dict, possible_answer: list, language: str
+    ) -> None:
+        self.param = param
+        self.language = language
+        self.possible_answer = possible_answer
+        self.expected_type_description = full_param_details["type"]  # This is a string
+        self.nested_type = None
+        self.nested_type_converted = None
 
+        if language == "Java":
+            type_conversion = JAVA_TYPE_CONVERSION
         elif language == "JavaScript":
-            expected_type_converted = JS_TYPE_CONVERSION[expected_type_description]
+            type_conversion = JS_TYPE_CONVERSION
+        elif language == "Python":
+            type_conversion = PYTHON_TYPE_MAPPING
+        else:
+            raise NotImplementedError(f"Unsupported language: {language}")
 
-            if expected_type_description in JS_TYPE_CONVERSION:
-                if type(value) != str:
-                    result["valid"] = False
-                    result["error"].append(
+        self.expected_type_converted = type_conversion[self.expected_type_description]
+        if self.expected_type_description in (
+            PYTHON_NESTED_TYPE_CHECK_LIST
+            if language == "Python"
+            else NESTED_CONVERSION_TYPE_LIST
+        ):
+            self.nested_type = full_param_details["items"]["type"]
+            self.nested_type_converted = type_conversion[self.nested_type]
+
+        self.type_checker = _compile_type_checker(
+            param,
+            possible_answer,
+            self.expected_type_description,
+            self.expected_type_converted,
+            self.nested_type_converted,
+        )
+        if type(possible_answer) == list:
+            self.hashed_possible_answer = _HashedValues(possible_answer)
+        else:
+            self.hashed_possible_answer = possible_answer
+        # The value checkers are only built when needed, as not every parameter type has a valid answer layout for all of them
+        self._value_checker = None
+
+    def _get_value_checker(self):
+        if self._value_checker is None:
+            if self.expected_type_converted == dict:
+                self._value_checker = _DictAnswers(self.possible_answer)
+            elif self.expected_type_converted == list and self.nested_type_converted == dict:
+                self._value_checker = _ListDictAnswers(self.possible_answer)
+            elif self.expected_type_converted == str:
+                self._value_checker = _StringAnswers(self.possible_answer)
+            else:
+                self._value_checker = _ListAnswers(self.possible_answer)
+        return self._value_checker
+
+    def check(self, value):
+        """
+        Returns the error result if the value is invalid.
+        Otherwise, returns the result of the special value checker (dictionaries, lists and strings), or None if the plain value check was used.
+        """
+        param = self.param
+        if self.language in ["Java", "JavaScript"]:
+            if type(value) != str:
+                return {
+                    "valid": False,
+                    "error": [
                         f"Incorrect type for parameter {repr(param)}. Expected type String, got {type(value).__name__}. Parameter value: {repr(value)}."
-                    )
-                    result["error_type"] = "type_error:js"
-                    return result
-
-                if expected_type_description in NESTED_CONVERSION_TYPE_LIST:
-                    nested_type = param_details[param]["items"]["type"]
-                    nested_type_converted = JS_TYPE_CONVERSION[nested_type]
-                    value = js_type_converter(
-                        value, expected_type_description, nested_type
-                    )
-                else:
-                    value = js_type_converter(value, expected_type_description)
+                    ],
+                    "error_type": "type_error:java" if self.language == "Java" else "type_error:js",
+                }
 
-        elif language == "Python":
-            expected_type_converted = PYTHON_TYPE_MAPPING[expected_type_description]
-            if expected_type_description in PYTHON_NESTED_TYPE_CHECK_LIST:
-                nested_type = param_details[param]["items"]["type"]
-                nested_type_converted = PYTHON_TYPE_MAPPING[nested_type]
+            type_converter = (
+                java_type_converter if self.language == "Java" else js_type_converter
+            )
+            if self.nested_type is not None:
+                value = type_converter(
+                    value, self.expected_type_description, self.nested_type
+                )
+            else:
+                value = type_converter(value, self.expected_type_description)
 
         # We convert all tuple value to list when the expected type is tuple.
         # The conversion is necessary because any tuple in the possible answer would become a list after being processed through json.dump() and json.load().
         # This does introduce some false positive (eg, when the model provides a list value instead of tuple). We hope to find a better solution in the future.
-        if expected_type_description == "tuple" and type(value) == tuple:
+        if self.expected_type_description == "tuple" and type(value) == tuple:
             value = list(value)
 
         # Allow python auto conversion from int to float
         if (
-            language == "Python"
-            and expected_type_description == "float"
+            self.language == "Python"
+            and self.expected_type_description == "float"
             and type(value) == int
         ):
             value = float(value)
@@ -439,198 +586,237 @@ def simple_function_checker(
         # Type checking
         # In fact, we only check for Python here.
         # Type check for other languages are handled by the type converter, and so their value (after conversion) is always correct.
-        type_check_result = type_checker(
-            param,
-            value,
-            possible_answer[param],
-            expected_type_description,
-            expected_type_converted,
-            nested_type_converted,
-        )
-        is_variable = type_check_result["is_variable"]
+        type_check_result = self.type_checker(value)
         if not type_check_result["valid"]:
             return type_check_result
 
         # It doesn't make sense to special handle dictionaries and list of dictionaries if the value is a variable.
         # We can just treat the variable as a string and use the normal flow.
-        if not is_variable:
-            # Special handle for dictionaries
-            if expected_type_converted == dict:
-                result = dict_checker(param, value, possible_answer[param])
-                if not result["valid"]:
-                    return result
-                continue
+        if not type_check_result["is_variable"] and (
+            self.expected_type_converted in [dict, str, list]
+        ):
+            # Special handle for dictionaries, list of dictionaries, strings and lists
+            # We don't check for case sensitivity for string, as long as it's not a variable
+            return self._get_value_checker().check(param, value)
 
-            # Special handle for list of dictionaries
-            elif expected_type_converted == list and nested_type_converted == dict:
-                result = list_dict_checker(param, value, possible_answer[param])
-                if not result["valid"]:
-                    return result
-                continue
+        # Check if the value is within the possible answers
+        if value not in self.hashed_possible_answer:
+            return {
+                "valid": False,
+                "error": [
+                    f"Invalid value for parameter {repr(param)}: {repr(value)}. Expected one of {self.possible_answer}."
+                ],
+                "error_type": "value_error:others",
+            }
 
-            # Special handle for strings
-            elif expected_type_converted == str:
-                # We don't check for case sensitivity for string, as long as it's not a variable
-                result = string_checker(param, value, possible_answer[param])
-                if not result["valid"]:
-                    return result
-                continue
+        return None
 
-            elif expected_type_converted == list:
-                result = list_checker(param, value, possible_answer[param])
-                if not result["valid"]:
-                    return result
-                continue
 
-        # Check if the value is within the possible answers
-        if value not in possible_answer[param]:
-            result["valid"] = False
-            result["error"].append(
-                f"Invalid value for parameter {repr(param)}: {repr(value)}. Expected one of {possible_answer[param]}."
+class CompiledFunctionChecker:
+    """
+    Checker for a single function call against one function description and its possible answer.
+    Everything that only depends on the function description and the possible answer is computed once, so that the checker can be reused for every model output.
+    """
+
+    def __init__(self, func_description: dict, possible_answer: dict, language: str) -> None:
+        self.possible_answer = list(possible_answer.values())[0]
+        # Extract function name and parameters details
+        self.func_name = func_description["name"]
+        self.param_details = func_description["parameters"]["properties"]
+        self.required_params = func_description["parameters"]["required"]
+        self.language = language
+        # Parameters in the possible answer that can't be omitted
+        self.required_answer_params = [
+            param
+            for param in self.possible_answer
+            if "" not in self.possible_answer[param]
+        ]
+        # model name -> function name as it appears in that model's output
+        self._func_names = {}
+        # param -> _CompiledParamChecker, compiled when the parameter first shows up in a model output
+        self._param_checkers = {}
+
+    def _get_param_checker(self, param: str) -> _CompiledParamChecker:
+        if param not in self._param_checkers:
+            self._param_checkers[param] = _CompiledParamChecker(
+                param, self.param_details[param], self.possible_answer[param], self.language
             )
-            result["error_type"] = "value_error:others"
-            return result
+        return self._param_checkers[param]
+
+    def check(self, model_output: dict, model_name: str):
+        # Initialize a result dictionary
+        result = {
+            "valid": True,
+            "error": [],
+            "error_type": "simple_function_checker:unclear",
+        }
 
-    # Check for optional parameters not provided but allowed
-    for param in possible_answer:
-        if param not in model_params and "" not in possible_answer[param]:
+        if model_name not in self._func_names:
+            self._func_names[model_name] = convert_func_name(self.func_name, model_name)
+        func_name = self._func_names[model_name]
+
+        # Check if function name matches
+        if func_name not in model_output:
             result["valid"] = False
             result["error"].append(
-                f"Optional parameter {repr(param)} not provided and not marked as optional."
+                f"Function name {repr(func_name)} not found in model output."
             )
-            result["error_type"] = "simple_function_checker:missing_optional"
+            result["error_type"] = "simple_function_checker:wrong_func_name"
             return result
 
-    return result
+        model_params = model_output[func_name]
 
+        # Check for required parameters in model output
+        for param in self.required_params:
+            if param not in model_params:
+                result["valid"] = False
+                result["error"].append(f"Missing required parameter: {repr(param)}.")
+                result["error_type"] = "simple_function_checker:missing_required"
+                return result
 
-def parallel_function_checker_enforce_order(
-    func_descriptions: list,
-    model_output: list,
-    possible_answers: dict,
-    language: str,
-    model_name: str,
-):
-    if len(model_output) != len(possible_answers):
-        return {
-            "valid": False,
-            "error": ["Wrong number of functions."],
-            "error_type": "parallel_function_checker_enforce_order:wrong_count",
-        }
+        # Validate types and values for each parameter in model output
+        for param, value in model_params.items():
+            if param not in self.param_details or param not in self.possible_answer:
+                result["valid"] = False
+                result["error"].append(f"Unexpected parameter: {repr(param)}.")
+                result["error_type"] = "simple_function_checker:unexpected_param"
+                return result
+
+            param_result = self._get_param_checker(param).check(value)
+            if param_result is not None:
+                if not param_result["valid"]:
+                    return param_result
+                result = param_result
+
+        # Check for optional parameters not provided but allowed
+        for param in self.required_answer_params:
+            if param not in model_params:
+                return {
+                    "valid": False,
+                    "error": [
+                        f"Optional parameter {repr(param)} not provided and not marked as optional."
+                    ],
+                    "error_type": "simple_function_checker:missing_optional",
+                }
 
-    func_name_list = list(possible_answers.keys())
-    possible_answers_list = []
+        return result
 
-    for key, value in possible_answers.items():
-        possible_answers_list.append({key: value})
 
-    for i in range(len(possible_answers_list)):
-        func_description = find_description(func_descriptions, func_name_list[i])
-        
-        result = simple_function_checker(
-            func_description,
-            model_output[i],
-            possible_answers_list[i],
-            language,
-            model_name,
-        )
-        if not result["valid"]:
-            return result
+class CompiledASTChecker:
+    """
+    Checker for one test entry of a single-turn AST category.
+    The function checkers are compiled lazily for each function in the possible answer, and reused across model outputs.
+    """
+
+    def __init__(self, func_description, possible_answer: list, language: str, test_category: str) -> None:
+        self.func_description = func_description
+        self.possible_answer = possible_answer
+        self.language = language
+        self.test_category = test_category
+        # function name -> function description, same as `find_description`, where the first match wins
+        self._descriptions_by_name = None
+        if type(func_description) == list:
+            self._descriptions_by_name = {}
+            for description in func_description:
+                self._descriptions_by_name.setdefault(description["name"], description)
+        # possible answer index -> CompiledFunctionChecker
+        self._function_checkers = {}
+
+    def _find_description(self, name: str):
+        if self._descriptions_by_name is None:
+            # it is a dict, there is only one function
+            return self.func_description
+        return self._descriptions_by_name.get(name)
+
+    def _get_function_checker(self, index: int) -> CompiledFunctionChecker:
+        if index not in self._function_checkers:
+            if "parallel" in self.test_category or "multiple" in self.test_category:
+                # possible_answer[index] is a dictionary with only one key
+                func_name_expected = list(self.possible_answer[index].keys())[0]
+                func_description = self._find_description(func_name_expected)
+            else:
+                func_description = self.func_description[0]
+            self._function_checkers[index] = CompiledFunctionChecker(
+                func_description, self.possible_answer[index], self.language
+            )
+        return self._function_checkers[index]
 
-    return {"valid": True, "error": []}
+    def check(self, model_output: list, model_name: str):
+        if "parallel" in self.test_category:
+            return self._check_parallel_no_order(model_output, model_name)
 
+        elif "multiple" in self.test_category:
+            if len(model_output) != len(self.possible_answer):
+                return {
+                    "valid": False,
+                    "error": ["Wrong number of functions."],
+                    "error_type": "multiple_function_checker:wrong_count",
+                }
 
-def parallel_function_checker_no_order(
-    func_descriptions: list,
-    model_output: list,
-    possible_answers: list,
-    language: str,
-    model_name: str,
-):
-    if len(model_output) != len(possible_answers):
-        return {
-            "valid": False,
-            "error": ["Wrong number of functions."],
-            "error_type": "parallel_function_checker_no_order:wrong_count",
-        }
+            # possible_answer is a list of only one dictionary with only one key
+            return self._get_function_checker(0).check(model_output[0], model_name)
 
-    matched_indices = []
+        else:
+            if len(model_output) != 1:
+                return {
+                    "valid": False,
+                    "error": ["Wrong number of functions."],
+                    "error_type": "simple_function_checker:wrong_count",
+                }
+
+            return self._get_function_checker(0).check(model_output[0], model_name)
+
+    def _check_parallel_no_order(self, model_output: list, model_name: str):
+        possible_answers = self.possible_answer
+        if len(model_output) != len(possible_answers):
+            return {
+                "valid": False,
+                "error": ["Wrong number of functions."],
+                "error_type": "parallel_function_checker_no_order:wrong_count",
+            }
 
-    # We go throught the possible answers one by one, and eliminate the model output that matches the possible answer
-    # It must be this way because we need ground truth to fetch the correct function description
-    for i in range(len(possible_answers)):
-        # possible_answers[i] is a dictionary with only one key
-        func_name_expected = list(possible_answers[i].keys())[0]
-        func_description = find_description(func_descriptions, func_name_expected)
+        matched_indices = []
 
+        # We go throught the possible answers one by one, and eliminate the model output that matches the possible answer
+        # It must be this way because we need ground truth to fetch the correct function description
+        for i in range(len(possible_answers)):
+            function_checker = self._get_function_checker(i)
 
-        all_errors = []
+            all_errors = []
 
-        for index in range(len(model_output)):
-            if index in matched_indices:
-                continue
+            for index in range(len(model_output)):
+                if index in matched_indices:
+                    continue
 
-            result = simple_function_checker(
-                func_description,
-                model_output[index],
-                possible_answers[i],
-                language,
-                model_name,
-            )
+                result = function_checker.check(model_output[index], model_name)
 
-            if result["valid"]:
-                matched_indices.append(index)
-                break
-            else:
-                all_errors.append(
-                    {
-                        f"Model Result Index {index}": {
-                            "sub_error": result["error"],
-                            "sub_error_type": result["error_type"],
-                            "model_output_item": model_output[index],
-                            "possible_answer_item": possible_answers[i],
+                if result["valid"]:
+                    matched_indices.append(index)
+                    break
+                else:
+                    all_errors.append(
+                        {
+                            f"Model Result Index {index}": {
+                                "sub_error": result["error"],
+                                "sub_error_type": result["error_type"],
+                                "model_output_item": model_output[index],
+                                "possible_answer_item": possible_answers[i],
+                            }
                         }
-                    }
-                )
-
-        if not result["valid"]:
-            considered_indices = [
-                i for i in range(len(model_output)) if i not in matched_indices
-            ]
-            all_errors.insert(
-                0,
-                f"Could not find a matching function among index {considered_indices} of model output for index {i} of possible answers.",
-            )
-            return {
-                "valid": False,
-                "error": all_errors,
-                "error_type": "parallel_function_checker_no_order:cannot_find_match",
-            }
-
-    return {"valid": True, "error": []}
-
+                    )
 
-def multiple_function_checker(
-    func_descriptions: list,
-    model_output: list,
-    possible_answers: list,
-    language: str,
-    model_name: str,
-):
-    if len(model_output) != len(possible_answers):
-        return {
-            "valid": False,
-            "error": ["Wrong number of functions."],
-            "error_type": "multiple_function_checker:wrong_count",
-        }
+            if not result["valid"]:
+                considered_indices = [
+                    i for i in range(len(model_output)) if i not in matched_indices
+                ]
+                all_errors.insert(
+                    0,
+                    f"Could not find a matching function among index {considered_indices} of model output for index {i} of possible answers.",
+                )
+                return {
+                    "valid": False,
+                    "error": all_errors,
+                    "error_type": "parallel_function_checker_no_order:cannot_find_match",
+                }
 
-    # possible_answers is a list of only one dictionary with only one key
-    func_name_expected = list(possible_answers[0].keys())[0]
-    func_description = find_description(func_descriptions, func_name_expected)
-    return simple_function_checker(
-        func_description,
-        model_output[0],
-        possible_answers[0],
-        language,
-        model_name,
-    )
+        return {"valid": True, "error": []}
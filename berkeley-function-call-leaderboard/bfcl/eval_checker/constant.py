@@ -2,6 +2,38 @@ from pathlib import Path
 
 REAL_TIME_MATCH_ALLOWED_DIFFERENCE = 0.2
 
+# Maximum number of memoized conversions in each of the Java and JavaScript type converters
+TYPE_CONVERSION_CACHE_SIZE = 50000
+
+# Name of the file, in the score folder, persisting the accuracy of every score file for the leaderboard aggregation
+LEADERBOARD_SUMMARY_FILE_NAME = ".leaderboard_summary.json"
+
+# Name of the folder, inside each model's score folder, holding the per-entry verdicts used by incremental evaluation
+VERDICT_CACHE_DIR_NAME = ".verdict_cache"
+
+# Name of the folder, inside each model's score folder, holding the content-addressed values of the compact score files
+SCORE_BLOB_DIR_NAME = ".score_blobs"
+
+# Paths of the fields of a score record that are stored once per distinct value in compact score files
+# For the prompts, only the parts shared by many entries (function docs, initial states) are worth it; the questions are unique
+BULKY_SCORE_FIELDS = [
+    ("prompt", "function"),
+    ("prompt", "initial_config"),
+    ("inference_log",),
+    ("model_result_raw",),
+    ("error", "details", "model_instance_state"),
+    ("error", "details", "ground_truth_instance_state"),
+]
+
+# Serialized values shorter than this (in characters) are kept inline, as a blob reference would not be much shorter
+SCORE_BLOB_MIN_SIZE = 512
+
+# Default limits of each function call executed in the simulator worker processes (`--simulator-processes`)
+SIMULATOR_CALL_TIME_LIMIT = 10  # In seconds, of wall time; also used as the CPU time limit
+SIMULATOR_CALL_MEMORY_LIMIT = 2048  # In MiB, of address space allocated during the call
+# A worker process stuck in a call for this many seconds past the time limit is killed and restarted
+SIMULATOR_KILL_GRACE_PERIOD = 5
+
 # These two files are for the API status sanity check
 REST_API_GROUND_TRUTH_FILE_PATH = "./executable_eval/data/api_status_check_ground_truth_REST.json"
 EXECTUABLE_API_GROUND_TRUTH_FILE_PATH = "./executable_eval/data/api_status_check_ground_truth_executable.json"
@@ -73,6 +105,9 @@ COLUMNS_OVERALL = [
     "Latency Mean (s)",
     "Latency Standard Deviation (s)",
     "Latency 95th Percentile (s)",
+    "TTFT Mean (s)",
+    "Inter-Token Latency Mean (s)",
+    "Output Tokens Per Second Mean",
     "Non-Live AST Acc",
     "Non-Live Simple AST",
     "Non-Live Multiple AST",
@@ -0,0 +1,120 @@
+import hashlib
+import json
+
+from bfcl.constant import POSSIBLE_ANSWER_PATH, PROMPT_PATH, VERSION_PREFIX
+from bfcl.eval_checker.ast_eval.ast_checker import CompiledASTChecker
+from bfcl.utils import find_file_with_suffix, is_relevance_or_irrelevance, load_file
+
+# (dataset version, test category) -> CategoryIndex, shared by every model evaluated in the same run
+_CATEGORY_INDEX_CACHE = {}
+
+
+class CategoryIndex:
+    """
+    The dataset entries of one test category, in dataset (`sort_key`) order, with an id -> position index to join the model results in O(1) per entry.
+    Each column (prompts, possible answers, compiled AST checkers) is only built when first accessed.
+    """
+
+    def __init__(self, test_category: str) -> None:
+        self.test_category = test_category
+        self._prompt = None
+        self._possible_answer = None
+        # entry id -> positions of the entries with that id; a few datasets contain duplicate ids
+        self._positions = None
+        # position -> CompiledASTChecker
+        self._compiled_ast_checkers = {}
+        # position -> digest of the dataset entry
+        self._entry_digests = {}
+
+    @property
+    def prompt_file(self):
+        return find_file_with_suffix(PROMPT_PATH, self.test_category)
+
+    @property
+    def prompt(self) -> list[dict]:
+        if self._prompt is None:
+            self._prompt = load_file(self.prompt_file, sort_by_id=True)
+        return self._prompt
+
+    @property
+    def possible_answer(self) -> list[dict]:
+        if self._possible_answer is None:
+            self._possible_answer = load_file(
+                find_file_with_suffix(POSSIBLE_ANSWER_PATH, self.test_category),
+                sort_by_id=True,
+            )
+        return self._possible_answer
+
+    @property
+    def positions(self) -> dict[str, list[int]]:
+        if self._positions is None:
+            self._positions = {}
+            for position, entry in enumerate(self.prompt):
+                self._positions.setdefault(entry["id"], []).append(position)
+        return self._positions
+
+    def reload_prompt(self) -> None:
+        """
+        Needed when the prompt file is modified on disk, eg, after the expected execution outputs are added for the executable categories.
+        """
+        self._prompt = None
+        self._positions = None
+        self._entry_digests = {}
+
+    def entry_digest(self, position: int) -> str:
+        """
+        Digest of the prompt and possible answer at `position`, used to tell whether a dataset entry changed since a previous evaluation.
+        """
+        if position not in self._entry_digests:
+            dataset_entry = [self.prompt[position]]
+            # The relevance and irrelevance categories have no possible answer
+            if not is_relevance_or_irrelevance(self.test_category):
+                dataset_entry.append(self.possible_answer[position])
+            self._entry_digests[position] = hashlib.sha256(
+                json.dumps(dataset_entry, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+        return self._entry_digests[position]
+
+    def get_compiled_ast_checker(self, position: int, language: str) -> CompiledASTChecker:
+        if position not in self._compiled_ast_checkers:
+            self._compiled_ast_checkers[position] = CompiledASTChecker(
+                self.prompt[position]["function"],
+                self.possible_answer[position]["ground_truth"],
+                language,
+                self.test_category,
+            )
+        return self._compiled_ast_checkers[position]
+
+    def join(self, model_result: list[dict], partial_eval: bool = False) -> list[int]:
+        """
+        Match each model result entry with its dataset entry, by id.
+        Returns the dataset position of each model result entry; entries sharing an id are matched in order.
+        Unless `partial_eval` is set, the model result must cover every entry of the dataset.
+        """
+        entry_positions = []
+        occurrence_count = {}
+        unknown_ids = []
+        for entry in model_result:
+            test_entry_id = entry["id"]
+            occurrence = occurrence_count.get(test_entry_id, 0)
+            occurrence_count[test_entry_id] = occurrence + 1
+            if occurrence >= len(self.positions.get(test_entry_id, [])):
+                unknown_ids.append(test_entry_id)
+                continue
+            entry_positions.append(self.positions[test_entry_id][occurrence])
+
+        assert (
+            not unknown_ids
+        ), f"The model result contains entries that are not in the {self.test_category} dataset: {unknown_ids[:10]}. Please check the input files."
+        if not partial_eval:
+            assert len(model_result) == len(
+                self.prompt
+            ), f"The length of the model result ({len(model_result)}) does not match the length of the dataset ({len(self.prompt)}). Please check the input files for completeness, or use partial evaluation to only evaluate the entries present."
+        return entry_positions
+
+
+def get_category_index(test_category: str) -> CategoryIndex:
+    cache_key = (VERSION_PREFIX, test_category)
+    if cache_key not in _CATEGORY_INDEX_CACHE:
+        _CATEGORY_INDEX_CACHE[cache_key] = CategoryIndex(test_category)
+    return _CATEGORY_INDEX_CACHE[cache_key]
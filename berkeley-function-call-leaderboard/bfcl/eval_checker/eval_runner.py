@@ -1,20 +1,22 @@
 import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor
 
 from dotenv import load_dotenv
 from tqdm import tqdm
 
 from bfcl.constant import (
     DOTENV_PATH,
-    POSSIBLE_ANSWER_PATH,
     PROJECT_ROOT,
     PROMPT_PATH,
     RESULT_PATH,
     SCORE_PATH,
     TEST_COLLECTION_MAPPING,
     TEST_FILE_MAPPING,
-    VERSION_PREFIX,
 )
-from bfcl.eval_checker.ast_eval.ast_checker import ast_checker
+from bfcl.eval_checker.dataset_index import get_category_index
+from bfcl.eval_checker.score_cache import ScoreVerdictCache
+from bfcl.eval_checker.score_writer import ScoreFileWriter
 from bfcl.eval_checker.eval_runner_helper import *
 from bfcl.eval_checker.executable_eval.custom_exception import BadAPIStatusError
 from bfcl.eval_checker.executable_eval.executable_checker import (
@@ -25,8 +27,28 @@ from bfcl.eval_checker.multi_turn_eval.multi_turn_checker import (
     multi_turn_checker,
     multi_turn_irrelevance_checker,
 )
-from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import is_empty_execute_response
+from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
+    CLASS_FILE_PATH_MAPPING,
+    is_empty_execute_response,
+    release_multi_turn_instances,
+    set_simulator_executor,
+)
+from bfcl.eval_checker.multi_turn_eval.simulator_executor import (
+    IsolatedSimulatorExecutor,
+    SimulatorWorkerError,
+)
 from bfcl.model_handler.handler_map import HANDLER_MAP
+from bfcl.profiling import (
+    PROFILE_SAMPLE_INTERVAL,
+    PhaseProfiler,
+    collect_worker_profile,
+    init_worker_profiler,
+    instrument_handler,
+    is_profiling,
+    merge_worker_profile,
+    set_profile_category,
+    set_profiler,
+)
 from bfcl.utils import *
 
 # A dictionary to store the evaluation scores.
@@ -34,26 +56,86 @@ from bfcl.utils import *
 LEADERBOARD_TABLE = {}
 
 
-def multi_turn_runner(handler, model_result, prompt, possible_answer, model_name, test_category, score_dir):
-    assert (
-        len(model_result) == len(prompt) == len(possible_answer)
-    ), f"The length of the model result ({len(model_result)}) does not match the length of the prompt ({len(prompt)}) or possible answer ({len(possible_answer)}). Please check the input files for completeness."
+def multi_turn_runner(handler, model_result, dataset_index, entry_positions, score_writer, model_name, test_category, decode_processes=1, multi_turn_processes=1):
+    # Decode the model responses of every step of every entry in one pass
+    step_model_results = []
+    step_offsets = [0]
+    for i in range(len(model_result)):
+        # A malformed result (eg, an inference error message) has no step to decode
+        if _is_multi_turn_result_well_formed(model_result[i]["result"]):
+            for single_turn_model_result_list in model_result[i]["result"]:
+                step_model_results.extend(single_turn_model_result_list)
+        step_offsets.append(len(step_model_results))
+    step_decoded_results = handler.batch_decode_execute(
+        step_model_results, num_processes=decode_processes
+    )
+
+    # Collect the decoded model results of the entries to check, which are executable function calls
+    # Entry index -> decoded model results
+    entries_to_check = {}
+    for i in range(len(model_result)):
+        multi_turn_model_result_list: list[list] = model_result[i]["result"]
+        multi_turn_ground_truth_list: list[list[str]] = dataset_index.possible_answer[entry_positions[i]]["ground_truth"]
+        if not _is_multi_turn_result_well_formed(multi_turn_model_result_list) or len(multi_turn_model_result_list) != len(
+            multi_turn_ground_truth_list
+        ):
+            continue
+
+        entry_decoded_results = iter(step_decoded_results[step_offsets[i] : step_offsets[i + 1]])
+        multi_turn_model_result_list_decoded: list[list[list[str]]] = []  # decode_execute returns a list of strings
+        for single_turn_model_result_list in multi_turn_model_result_list:
+            single_turn_model_result_list_decoded = []
+            for _ in single_turn_model_result_list:
+                # the decoded result is per step
+                decoded_result: list[str] = next(entry_decoded_results)
+                if isinstance(decoded_result, Exception):
+                    # Ignore any failed decoding and continue to the next message
+                    # We only care about the decoded function call, not the error message or if the model is chatting
+                    continue
+                if is_empty_execute_response(decoded_result):
+                    # Empty output is not considered as a valid function call
+                    continue
+
+                single_turn_model_result_list_decoded.append(decoded_result)
+            multi_turn_model_result_list_decoded.append(single_turn_model_result_list_decoded)
+        entries_to_check[i] = multi_turn_model_result_list_decoded
+
+    # Check if the model output the correct function calls
+    # Each entry runs on its own simulator instances, so the entries can be checked in any order; the results come back in entry order
+    check_tasks = [(entry_positions[i], decoded) for i, decoded in entries_to_check.items()]
+    if multi_turn_processes > 1 and len(check_tasks) > 1:
+        with ProcessPoolExecutor(
+            max_workers=multi_turn_processes,
+            initializer=_init_multi_turn_worker,
+            initargs=(test_category, model_name, is_profiling()),
+        ) as executor:
+            checker_results = []
+            for checker_result, worker_profile in executor.map(
+                _check_multi_turn_entry_in_worker,
+                check_tasks,
+                chunksize=max(len(check_tasks) // (multi_turn_processes * 4), 1),
+            ):
+                checker_results.append(checker_result)
+                merge_worker_profile(worker_profile)
+    else:
+        checker_results = [
+            _check_multi_turn_entry(dataset_index, position, decoded, test_category, model_name)
+            for position, decoded in check_tasks
+        ]
+    checker_results = dict(zip(entries_to_check, checker_results))
 
-    result = []
     correct_count = 0
     for i in range(len(model_result)):
         index: str = model_result[i]["id"]
         # Model result is stored as a list of list of model responses. Each inner list represents a turn.
         multi_turn_model_result_list: list[list] = model_result[i]["result"]
-        multi_turn_ground_truth_list: list[list[str]] = possible_answer[i]["ground_truth"]
-        test_entry: dict = prompt[i]
-
-        # Remove the function doc from the score file for better readability; they are repeated and way too long
-        if "function" in test_entry:
-            del test_entry["function"]
+        multi_turn_ground_truth_list: list[list[str]] = dataset_index.possible_answer[entry_positions[i]]["ground_truth"]
+        # Leave out the function doc from the score file for better readability; they are repeated and way too long
+        # The dataset entry itself is shared across models, so it is not modified
+        test_entry: dict = _get_multi_turn_test_entry(dataset_index, entry_positions[i])
 
-        if type(multi_turn_model_result_list) != list:
-            result.append(
+        if not _is_multi_turn_result_well_formed(multi_turn_model_result_list):
+            score_writer.add(
                 {
                     "id": index,
                     "model_name": model_name,
@@ -72,7 +154,7 @@ def multi_turn_runner(handler, model_result, prompt, possible_answer, model_name
         # This happens when the model has retried too many times and still haven't figured out the answer.
         # When force-terminated, no further evaluation is needed. This whole entry will be failed.
         if len(multi_turn_model_result_list) != len(multi_turn_ground_truth_list):
-            result.append(
+            score_writer.add(
                 {
                     "id": index,
                     "model_name": model_name,
@@ -90,35 +172,12 @@ def multi_turn_runner(handler, model_result, prompt, possible_answer, model_name
                 }
             )
             continue
+        # The malformed result is already recorded as an inference error
+        if i not in entries_to_check:
+            continue
 
-        multi_turn_model_result_list_decoded: list[list[list[str]]] = []  # decode_execute returns a list of strings
-        # Try decoding the model results into executable function calls
-        for single_turn_model_result_list in multi_turn_model_result_list:
-            single_turn_model_result_list_decoded = []
-            for model_result_item in single_turn_model_result_list:
-                # model_result_item is per step
-                try:
-                    decoded_result: list[str] = handler.decode_execute(model_result_item)
-                    if is_empty_execute_response(decoded_result):
-                        # Empty output is not considered as a valid function call
-                        continue
-
-                    single_turn_model_result_list_decoded.append(decoded_result)
-
-                except Exception as e:
-                    # Ignore any failed decoding and continue to the next message
-                    # We only care about the decoded function call, not the error message or if the model is chatting
-                    continue
-            multi_turn_model_result_list_decoded.append(single_turn_model_result_list_decoded)
-
-        # Check if the model output the correct function calls
-        accuracy_checker_result = multi_turn_checker(
-            multi_turn_model_result_list_decoded,
-            multi_turn_ground_truth_list,
-            test_entry,
-            test_category,
-            model_name,
-        )
+        multi_turn_model_result_list_decoded = entries_to_check[i]
+        accuracy_checker_result = checker_results[i]
 
         # Perform additional check for multi-turn irrelevance
         # This happens when the model is expected to not output any function calls in a certain turn due to miss parameters or miss functions
@@ -139,48 +198,94 @@ def multi_turn_runner(handler, model_result, prompt, possible_answer, model_name
             temp["model_result_decoded"] = multi_turn_model_result_list_decoded
             temp["possible_answer"] = multi_turn_ground_truth_list
             temp["inference_log"] = model_result[i].get("inference_log", "")
-            result.append(temp)
+            score_writer.add(temp)
         else:
             correct_count += 1
 
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
+    return correct_count
+
+
+def _is_multi_turn_result_well_formed(multi_turn_model_result_list) -> bool:
+    # The model result should be a list (per turn) of lists (per step) of model responses
+    return type(multi_turn_model_result_list) == list and all(
+        type(single_turn_model_result_list) == list for single_turn_model_result_list in multi_turn_model_result_list
     )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
 
-    return accuracy, len(model_result)
 
+def _get_multi_turn_test_entry(dataset_index, position: int) -> dict:
+    return {key: value for key, value in dataset_index.prompt[position].items() if key != "function"}
 
-def executable_file_runner(handler, model_result, prompt, model_name, test_category, score_dir):
-    assert len(model_result) == len(prompt)
+
+def _check_multi_turn_entry(dataset_index, position: int, multi_turn_model_result_list_decoded: list, test_category: str, model_name: str) -> dict:
+    test_entry = _get_multi_turn_test_entry(dataset_index, position)
+    try:
+        return multi_turn_checker(
+            multi_turn_model_result_list_decoded,
+            dataset_index.possible_answer[position]["ground_truth"],
+            test_entry,
+            test_category,
+            model_name,
+        )
+    except SimulatorWorkerError as e:
+        # The state of the instances could not be read back from the simulator; only this entry is failed
+        return {
+            "valid": False,
+            "error_message": f"Error during execution: {str(e)}",
+            "error_type": "multi_turn:simulator_error",
+        }
+    finally:
+        # The instances of the entry are not used again once it is checked
+        release_multi_turn_instances(model_name, test_entry["id"], is_evaL_run=True)
+        release_multi_turn_instances(model_name + "_ground_truth", test_entry["id"], is_evaL_run=True)
+
+
+# The dataset index, test category and model name of a multi-turn checking worker process, set up by `_init_multi_turn_worker`
+_multi_turn_worker_context: tuple = None
+
+
+def _init_multi_turn_worker(test_category: str, model_name: str, profiling: bool) -> None:
+    global _multi_turn_worker_context
+    init_worker_profiler(profiling, test_category)
+    # The dataset entries and the simulator modules are loaded once per worker, so that the tasks only carry the entry position and the decoded model results
+    dataset_index = get_category_index(test_category)
+    dataset_index.prompt, dataset_index.possible_answer
+    for module_name in CLASS_FILE_PATH_MAPPING.values():
+        importlib.import_module(module_name)
+    _multi_turn_worker_context = (dataset_index, test_category, model_name)
+
+
+def _check_multi_turn_entry_in_worker(check_task: tuple) -> tuple:
+    position, multi_turn_model_result_list_decoded = check_task
+    dataset_index, test_category, model_name = _multi_turn_worker_context
+    checker_result = _check_multi_turn_entry(dataset_index, position, multi_turn_model_result_list_decoded, test_category, model_name)
+    # The span timings of the worker are merged into the profiler of the main process, if any
+    return checker_result, collect_worker_profile()
+
+
+def executable_file_runner(handler, model_result, dataset_index, entry_positions, score_writer, model_name, test_category, decode_processes=1):
     # ERROR IS HAPPENING HERE CAUSE THE MODEL RESULTS SOMETIMES FAILS SOME TESTS
     # TODO WE GOTTA CATCH THE ERROR AND CONTINUE OR SOMETHING
 
-    result = []
+    decoded_results = handler.batch_decode_execute(
+        [item["result"] for item in model_result], num_processes=decode_processes
+    )
+
     correct_count = 0
     for i in tqdm(range(len(model_result)), desc="Running tests"):
         index: str = model_result[i]["id"]
         raw_result = model_result[i]["result"]
-        try:
-            decoded_result = handler.decode_execute(raw_result)
-        except Exception as e:
-            result.append(
+        prompt_item = dataset_index.prompt[entry_positions[i]]
+        decoded_result = decoded_results[i]
+        if isinstance(decoded_result, Exception):
+            score_writer.add(
                 {
                     "id": index,
                     "model_name": model_name,
                     "test_category": test_category,
                     "valid": False,
-                    "error": [f"Failed to decode executable. {str(e)}"],
+                    "error": [f"Failed to decode executable. {str(decoded_result)}"],
                     "error_type": "executable_decoder:decoder_failed",
-                    "prompt": prompt[i],
+                    "prompt": prompt_item,
                     "model_result_raw": raw_result,
                 }
             )
@@ -189,7 +294,7 @@ def executable_file_runner(handler, model_result, prompt, model_name, test_categ
         if "rest" in test_category:
             # REST is always single-functioned. Therefore we take the first one and pass it to the REST checker.
             if not is_rest_format_output(decoded_result):
-                result.append(
+                score_writer.add(
                     {
                         "id": index,
                         "model_name": model_name,
@@ -197,18 +302,18 @@ def executable_file_runner(handler, model_result, prompt, model_name, test_categ
                         "valid": False,
                         "error": ["Did not output in the specified format. Note: the model_result is wrapped in a string to ensure json serializability."],
                         "error_type": "executable_decoder:rest_wrong_output_format",
-                        "prompt": prompt[i],
+                        "prompt": prompt_item,
                         "model_result_raw": str(raw_result),
                         "model_result_decoded": str(decoded_result),
                     }
                 )
                 continue
 
-            checker_result = executable_checker_rest(decoded_result[0], i)
+            checker_result = executable_checker_rest(decoded_result[0], entry_positions[i])
 
         else:
             if not is_executable_format_output(decoded_result):
-                result.append(
+                score_writer.add(
                     {
                         "id": index,
                         "model_name": model_name,
@@ -216,14 +321,13 @@ def executable_file_runner(handler, model_result, prompt, model_name, test_categ
                         "valid": False,
                         "error": ["Did not output in the specified format. Note: the model_result is wrapped in a string to ensure json serializability."],
                         "error_type": "executable_decoder:wrong_output_format",
-                        "prompt": prompt[i],
+                        "prompt": prompt_item,
                         "model_result_raw": str(raw_result),
                         "model_result_decoded": str(decoded_result),
                     }
                 )
                 continue
 
-            prompt_item = prompt[i]
             checker_result = executable_checker_non_rest(decoded_result, prompt_item, test_category)
 
         if checker_result["valid"]:
@@ -236,35 +340,38 @@ def executable_file_runner(handler, model_result, prompt, model_name, test_categ
             temp["valid"] = checker_result["valid"]
             temp["error"] = checker_result["error"]
             temp["error_type"] = checker_result["error_type"]
-            temp["prompt"] = prompt[i]
+            temp["prompt"] = prompt_item
             temp["model_result_raw"] = raw_result
             temp["model_result_decoded"] = decoded_result
             if "model_executed_output" in checker_result:
                 temp["model_executed_output"] = checker_result["model_executed_output"]
-            result.append(temp)
-
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
+            score_writer.add(temp)
 
-    return accuracy, len(model_result)
+    return correct_count
 
 
-def relevance_file_runner(handler, model_result, prompt, model_name, test_category, score_dir):
+def relevance_file_runner(handler, model_result, dataset_index, entry_positions, score_writer, model_name, test_category, decode_processes=1):
     # This function serves for both relevance and irrelevance tests, which share the exact opposite logic.
     # If `test_category` is "irrelevance", the model is expected to output no function call.
     # No function call means either the AST decoding fails (a error message is generated) or the decoded AST does not contain any function call (such as a empty list, `[]`).
     # If `test_category` is "relevance", the model is expected to output to a function call, and empty list doesn't count as a function call.
-    result = []
+
+    # In the irrelevance categories, the outputs that the handler can tell contain no function call (eg, plain text) are correct without decoding.
+    # All the other outputs are decoded; for the failed entries, the decoded result goes to the score file anyway.
+    if "irrelevance" in test_category:
+        may_contain_func_call = handler.batch_may_contain_function_call([item["result"] for item in model_result])
+    else:
+        may_contain_func_call = [True] * len(model_result)
+    indices_to_decode = [i for i in range(len(model_result)) if may_contain_func_call[i]]
+    decoded_results = [None] * len(model_result)
+    for i, decoded_result in zip(
+        indices_to_decode,
+        handler.batch_decode_ast(
+            [model_result[i]["result"] for i in indices_to_decode], language="Python", num_processes=decode_processes
+        ),
+    ):
+        decoded_results[i] = decoded_result
+
     correct_count = 0
     for i in range(len(model_result)):
         index: str = model_result[i]["id"]
@@ -273,19 +380,20 @@ def relevance_file_runner(handler, model_result, prompt, model_name, test_catego
         decoded_result = None
         decode_error = None
 
-        try:
-            decoded_result = handler.decode_ast(model_result_item, language="Python")
+        if not may_contain_func_call[i]:
+            contain_func_call = False
+        elif isinstance(decoded_results[i], Exception):
+            # Decode failed, which means the model output is not in valid function call format
+            contain_func_call = False
+            decode_error = str(decoded_results[i])
+        else:
+            decoded_result = decoded_results[i]
             # Decode successfully, which means the model output is in valid function call format
             contain_func_call = True
             if is_empty_output(decoded_result):
                 # Empty output is not considered as a valid function call
                 contain_func_call = False
 
-        except Exception as e:
-            # Decode failed, which means the model output is not in valid function call format
-            contain_func_call = False
-            decode_error = str(e)
-
         # irrelevance test means no function call outputted
         if "irrelevance" in test_category:
             success = not contain_func_call
@@ -306,63 +414,49 @@ def relevance_file_runner(handler, model_result, prompt, model_name, test_catego
             else:
                 temp["error"] = [f"Invalid syntax. Failed to decode AST when it should have. {decode_error}"]
                 temp["error_type"] = "relevance_error:decoder_failed"
-            temp["prompt"] = prompt[i]
+            temp["prompt"] = dataset_index.prompt[entry_positions[i]]
             temp["model_result"] = model_result_item
             temp["decoded_result"] = decoded_result
 
-            result.append(temp)
-
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
+            score_writer.add(temp)
 
-    return accuracy, len(model_result)
+    return correct_count
 
 
 def ast_file_runner(
     handler,
     model_result,
-    prompt,
-    possible_answer,
+    dataset_index,
+    entry_positions,
+    score_writer,
     language,
     test_category,
     model_name,
-    score_dir,
+    decode_processes=1,
 ):
-    assert (
-        len(model_result) == len(prompt) == len(possible_answer)
-    ), f"The length of the model result ({len(model_result)}) does not match the length of the prompt ({len(prompt)}) or possible answer ({len(possible_answer)}). Please check the input files for completeness."
+    decoded_results = handler.batch_decode_ast(
+        [item["result"] for item in model_result], language, num_processes=decode_processes
+    )
 
-    result = []
     correct_count = 0
     for i in range(len(model_result)):
         index: str = model_result[i]["id"]
         model_result_item = model_result[i]["result"]
-        prompt_item = prompt[i]["function"]
-        possible_answer_item = possible_answer[i]["ground_truth"]
-
-        try:
-            model_result_item_raw = model_result_item
-            model_result_item = handler.decode_ast(model_result_item, language)
-        except Exception as e:
-            result.append(
+        prompt_item = dataset_index.prompt[entry_positions[i]]
+        possible_answer_item = dataset_index.possible_answer[entry_positions[i]]["ground_truth"]
+
+        model_result_item_raw = model_result_item
+        model_result_item = decoded_results[i]
+        if isinstance(model_result_item, Exception):
+            score_writer.add(
                 {
                     "id": index,
                     "model_name": model_name,
                     "test_category": test_category,
                     "valid": False,
-                    "error": [f"Invalid syntax. Failed to decode AST. {str(e)}"],
+                    "error": [f"Invalid syntax. Failed to decode AST. {str(model_result_item)}"],
                     "error_type": "ast_decoder:decoder_failed",
-                    "prompt": prompt[i],
+                    "prompt": prompt_item,
                     "model_result_raw": model_result_item_raw,
                     "possible_answer": possible_answer_item,
                 }
@@ -371,7 +465,7 @@ def ast_file_runner(
 
         decoder_output_valid = is_function_calling_format_output(model_result_item)
         if not decoder_output_valid:
-            result.append(
+            score_writer.add(
                 {
                     "id": index,
                     "model_name": model_name,
@@ -379,7 +473,7 @@ def ast_file_runner(
                     "valid": False,
                     "error": ["Did not output in the specified format. Note: the model_result is wrapped in a string to ensure json serializability."],
                     "error_type": "ast_decoder:decoder_wrong_output_format",
-                    "prompt": prompt[i],
+                    "prompt": prompt_item,
                     "model_result_raw": str(model_result_item_raw),
                     "model_result_decoded": str(model_result_item),
                     "possible_answer": possible_answer_item,
@@ -387,13 +481,9 @@ def ast_file_runner(
             )
             continue
 
-        checker_result = ast_checker(
-            prompt_item,
-            model_result_item,
-            possible_answer_item,
-            language,
-            test_category,
-            model_name,
+        # The compiled checker is shared by every model evaluated on this test entry
+        checker_result = dataset_index.get_compiled_ast_checker(entry_positions[i], language).check(
+            model_result_item, model_name
         )
 
         if checker_result["valid"]:
@@ -406,30 +496,17 @@ def ast_file_runner(
             temp["valid"] = checker_result["valid"]
             temp["error"] = checker_result["error"]
             temp["error_type"] = checker_result["error_type"]
-            temp["prompt"] = prompt[i]
+            temp["prompt"] = prompt_item
             temp["model_result_raw"] = model_result_item_raw
             temp["model_result_decoded"] = model_result_item
             temp["possible_answer"] = possible_answer_item
-            result.append(temp)
-
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
+            score_writer.add(temp)
 
-    return accuracy, len(model_result)
+    return correct_count
 
 
 #### Main runner function ####
-def runner(model_names, test_categories, api_sanity_check, result_dir, score_dir):
+def runner(model_names, test_categories, api_sanity_check, result_dir, score_dir, decode_processes=1, partial_eval=False, incremental=False, compact_score_files=False, multi_turn_processes=1):
 
     # A flag to indicate if the API has been tested.
     # We should always test the API with ground truth first before running the executable tests.
@@ -465,6 +542,7 @@ def runner(model_names, test_categories, api_sanity_check, result_dir, score_dir
             test_category = extract_test_category(model_result_json)
             if test_category not in test_categories:
                 continue
+            set_profile_category(test_category)
 
             handler = get_handler(model_name_escaped)
 
@@ -483,17 +561,24 @@ def runner(model_names, test_categories, api_sanity_check, result_dir, score_dir
             model_result = load_file(model_result_json, sort_by_id=True)
             record_cost_latency(LEADERBOARD_TABLE, model_name, model_result)
 
-            # Find the corresponding test file
-            prompt_file = find_file_with_suffix(PROMPT_PATH, test_category)
-            prompt = load_file(prompt_file, sort_by_id=True)
+            # The dataset entries are looked up by id; they are loaded once and shared across models
+            dataset_index = get_category_index(test_category)
+            entry_positions = dataset_index.join(model_result, partial_eval)
 
-            if is_relevance_or_irrelevance(test_category):
-                accuracy, total_count = relevance_file_runner(handler, model_result, prompt, model_name, test_category, score_dir)
-                record_result(LEADERBOARD_TABLE, model_name, test_category, accuracy, total_count)
-                print(f"✅ Test completed: {test_category}. 🎯 Accuracy: {accuracy}")
-                continue
+            # In incremental mode, only the entries that changed since the previous evaluation are checked.
+            # The executable categories depend on real-time API responses, so they are always fully re-evaluated.
+            score_cache = None
+            entries_to_check = list(range(len(model_result)))
+            if incremental and not is_executable(test_category):
+                score_cache = ScoreVerdictCache(score_dir, model_name, test_category, dataset_index)
+                entries_to_check = score_cache.select_entries_to_check(model_result, entry_positions)
+                print(f"♻️ Re-checking {len(entries_to_check)} of {len(model_result)} entries")
 
-            if is_executable(test_category):
+            model_result_to_check = [model_result[i] for i in entries_to_check]
+            entry_positions_to_check = [entry_positions[i] for i in entries_to_check]
+
+            # The expected outputs are fetched before the score writer is opened, so that a failed fetch leaves no temporary files behind
+            if is_executable(test_category) and len(model_result_to_check) > 0:
                 # We only test the API with ground truth once
                 if not API_TESTED and api_sanity_check:
                     print("---- Sanity checking API status ----")
@@ -518,48 +603,80 @@ def runner(model_names, test_categories, api_sanity_check, result_dir, score_dir
 
                 if test_category not in EXECUTABLE_TEST_CATEGORIES_HAVE_RUN and not is_rest(test_category):
                     print(f"---- Getting real-time execution result from ground truth for {test_category} ----")
-                    get_executable_expected_output(prompt_file)
+                    get_executable_expected_output(dataset_index.prompt_file)
                     print(f"---- Ground truth real-time execution result obtained for {test_category} 🌟 ----")
                     EXECUTABLE_TEST_CATEGORIES_HAVE_RUN.append(test_category)
                     # Need to re-load the prompt file after getting the expected output, as the prompt file has been updated
-                    prompt = load_file(prompt_file, sort_by_id=True)
+                    dataset_index.reload_prompt()
+
+            # The failure records are written to the score file as they are produced
+            with ScoreFileWriter(score_dir, model_name, test_category, compact_score_files) as score_writer:
+                # In incremental mode, the failure records of the re-checked entries are first collected by the cache, to be merged with the previous ones
+                record_sink = score_cache if score_cache is not None else score_writer
+
+                if len(model_result_to_check) == 0:
+                    correct_count = 0
+
+                elif is_relevance_or_irrelevance(test_category):
+                    correct_count = relevance_file_runner(
+                        handler,
+                        model_result_to_check,
+                        dataset_index,
+                        entry_positions_to_check,
+                        record_sink,
+                        model_name,
+                        test_category,
+                        decode_processes,
+                    )
+
+                elif is_executable(test_category):
+                    correct_count = executable_file_runner(
+                        handler,
+                        model_result_to_check,
+                        dataset_index,
+                        entry_positions_to_check,
+                        record_sink,
+                        model_name,
+                        test_category,
+                        decode_processes,
+                    )
 
-                accuracy, total_count = executable_file_runner(handler, model_result, prompt, model_name, test_category, score_dir)
-                record_result(LEADERBOARD_TABLE, model_name, test_category, accuracy, total_count)
-                print(f"✅ Test completed: {test_category}. 🎯 Accuracy: {accuracy}")
+                elif is_multi_turn(test_category):
+                    correct_count = multi_turn_runner(
+                        handler,
+                        model_result_to_check,
+                        dataset_index,
+                        entry_positions_to_check,
+                        record_sink,
+                        model_name,
+                        test_category,
+                        decode_processes,
+                        multi_turn_processes,
+                    )
 
-                continue
+                # Single turn test
+                else:
+                    correct_count = ast_file_runner(
+                        handler,
+                        model_result_to_check,
+                        dataset_index,
+                        entry_positions_to_check,
+                        record_sink,
+                        language,
+                        test_category,
+                        model_name,
+                        decode_processes,
+                    )
 
-            # Find the corresponding possible answer file
-            possible_answer_file = find_file_with_suffix(POSSIBLE_ANSWER_PATH, test_category)
-            possible_answer = load_file(possible_answer_file, sort_by_id=True)
-
-            if is_multi_turn(test_category):
-                accuracy, total_count = multi_turn_runner(
-                    handler,
-                    model_result,
-                    prompt,
-                    possible_answer,
-                    model_name,
-                    test_category,
-                    score_dir,
-                )
-                record_result(LEADERBOARD_TABLE, model_name, test_category, accuracy, total_count)
-                print(f"✅ Test completed: {test_category}. 🎯 Accuracy: {accuracy}")
-            # Single turn test
-            else:
-                accuracy, total_count = ast_file_runner(
-                    handler,
-                    model_result,
-                    prompt,
-                    possible_answer,
-                    language,
-                    test_category,
-                    model_name,
-                    score_dir,
-                )
-                record_result(LEADERBOARD_TABLE, model_name, test_category, accuracy, total_count)
-                print(f"✅ Test completed: {test_category}. 🎯 Accuracy: {accuracy}")
+                if score_cache is not None:
+                    correct_count = score_cache.merge(model_result, entries_to_check, correct_count, score_writer)
+
+                accuracy = score_writer.close(correct_count, len(model_result))
+
+            if score_cache is not None:
+                score_cache.save()
+            record_result(LEADERBOARD_TABLE, model_name, test_category, accuracy, len(model_result))
+            print(f"✅ Test completed: {test_category}. 🎯 Accuracy: {accuracy}")
 
     # This function reads all the score files from local folder and updates the leaderboard table.
     # This is helpful when you only want to run the evaluation for a subset of models and test categories.
@@ -570,11 +687,34 @@ def runner(model_names, test_categories, api_sanity_check, result_dir, score_dir
     # Clean up the executable expected output files
     # They should be re-generated the next time the evaluation is run
     clean_up_executable_expected_output(PROMPT_PATH, EXECUTABLE_TEST_CATEGORIES_HAVE_RUN)
+    for test_category in EXECUTABLE_TEST_CATEGORIES_HAVE_RUN:
+        get_category_index(test_category).reload_prompt()
 
     display_api_status_error(API_STATUS_ERROR_REST, API_STATUS_ERROR_EXECUTABLE, display_success=False)
 
 
-def main(model, test_categories, api_sanity_check, result_dir, score_dir):
+def main(
+    model,
+    test_categories,
+    api_sanity_check,
+    result_dir,
+    score_dir,
+    decode_processes=1,
+    partial_eval=False,
+    incremental=False,
+    compact_score_files=False,
+    simulator_processes=0,
+    simulator_time_limit=SIMULATOR_CALL_TIME_LIMIT,
+    simulator_memory_limit=SIMULATOR_CALL_MEMORY_LIMIT,
+    multi_turn_processes=1,
+    profile=False,
+    profile_sampling=False,
+):
+    profiler = None
+    if profile:
+        profiler = PhaseProfiler(sample_interval=PROFILE_SAMPLE_INTERVAL if profile_sampling else None)
+        set_profiler(profiler)
+
     if result_dir is None:
         result_dir = RESULT_PATH
     else:
@@ -612,8 +752,19 @@ def main(model, test_categories, api_sanity_check, result_dir, score_dir):
             # We patch it here to avoid confusing the user.
             model_names.append(model_name.replace("/", "_"))
 
+    if simulator_processes > 0:
+        set_simulator_executor(
+            IsolatedSimulatorExecutor(
+                simulator_processes, simulator_time_limit, memory_limit=simulator_memory_limit
+            )
+        )
+        if multi_turn_processes > 1:
+            # The isolated simulator workers are owned by the main process, so the multi-turn entries are checked there
+            print("❗️ Note: --multi-turn-processes is ignored when --simulator-processes is set.")
+            multi_turn_processes = 1
+
     # Driver function to run the evaluation for all categories involved.
-    runner(model_names, all_test_categories, api_sanity_check, result_dir, score_dir)
+    runner(model_names, all_test_categories, api_sanity_check, result_dir, score_dir, decode_processes, partial_eval, incremental, compact_score_files, multi_turn_processes)
 
     if len(skipped_categories) > 0:
         print("----------")
@@ -622,6 +773,10 @@ def main(model, test_categories, api_sanity_check, result_dir, score_dir):
         )
         print("----------")
 
+    if profiler is not None:
+        profiler.write(score_dir)
+        print(f"⏱️ Profiling metrics written to {score_dir}.")
+
     print(f"🏁 Evaluation completed. See {score_dir / 'data_overall.csv'} for overall evaluation results on BFCL V3.")
     print(
         f"See {score_dir / 'data_live.csv'}, {score_dir / 'data_non_live.csv'} and {score_dir / 'data_multi_turn.csv'} for detailed evaluation results on each sub-section categories respectively."
@@ -629,7 +784,8 @@ def main(model, test_categories, api_sanity_check, result_dir, score_dir):
 
 
 def get_handler(model_name):
-    return HANDLER_MAP[model_name](model_name, temperature=0)  # Temperature doesn't matter for evaluation
+    handler = HANDLER_MAP[model_name](model_name, temperature=0)  # Temperature doesn't matter for evaluation
+    return instrument_handler(handler)
 
 
 if __name__ == "__main__":
@@ -663,6 +819,67 @@ if __name__ == "__main__":
         type=str,
         help="Path to the folder where the evaluation score files will be stored; relative to the `berkeley-function-call-leaderboard` root folder",
     )
+    parser.add_argument(
+        "--decode-processes",
+        default=1,
+        type=int,
+        help="Number of worker processes used to decode the model responses. By default, the decoding runs in the main process.",
+    )
+    parser.add_argument(
+        "--partial-eval",
+        action="store_true",
+        default=False,
+        help="Only evaluate the entries present in the result files, instead of requiring every entry of the test category. The accuracy is then computed over those entries only.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=False,
+        help="Only re-check the entries whose model result, dataset entry or checker code changed since the previous evaluation, and patch the existing score files.",
+    )
+    parser.add_argument(
+        "--compact-score-files",
+        action="store_true",
+        default=False,
+        help="Store each distinct function doc, inference log, raw model result and instance state of the score files only once, in a separate blob file.",
+    )
+
+    parser.add_argument(
+        "--simulator-processes",
+        default=0,
+        type=int,
+        help="Number of isolated worker processes that execute the multi-turn function calls, with per-call time and memory limits. By default, they are executed in the main process, without limits.",
+    )
+    parser.add_argument(
+        "--simulator-time-limit",
+        default=SIMULATOR_CALL_TIME_LIMIT,
+        type=float,
+        help="Wall time and CPU time limit of each multi-turn function call, in seconds; only with `--simulator-processes`.",
+    )
+    parser.add_argument(
+        "--simulator-memory-limit",
+        default=SIMULATOR_CALL_MEMORY_LIMIT,
+        type=int,
+        help="Memory limit of each multi-turn function call, in MiB; only with `--simulator-processes`.",
+    )
+    parser.add_argument(
+        "--multi-turn-processes",
+        default=1,
+        type=int,
+        help="Number of worker processes that check the multi-turn entries in parallel. By default, the entries are checked one after the other in the main process.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Time the hot paths of the evaluation (decoding, multi-turn execution, state checks, file I/O) and write the timings per phase and per test category to `profile_metrics.json` in the score folder.",
+    )
+    parser.add_argument(
+        "--profile-sampling",
+        action="store_true",
+        default=False,
+        help="With `--profile`, also sample the call stacks of the run and write them to `profile_stacks.txt` in the score folder, in the collapsed (flame graph) format.",
+    )
 
     args = parser.parse_args()
 
@@ -673,4 +890,14 @@ if __name__ == "__main__":
         args.api_sanity_check,
         args.result_dir,
         args.score_dir,
+        args.decode_processes,
+        args.partial_eval,
+        args.incremental,
+        args.compact_score_files,
+        args.simulator_processes,
+        args.simulator_time_limit,
+        args.simulator_memory_limit,
+        args.multi_turn_processes,
+        args.profile,
+        args.profile_sampling,
     )
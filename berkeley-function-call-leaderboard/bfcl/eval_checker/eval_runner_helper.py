@@ -11,10 +11,16 @@ from httpx import get
 from tqdm import tqdm
 
 from bfcl._apply_function_credential_config import apply_function_credential_config
-from bfcl.constant import PROMPT_PATH, TEST_FILE_MAPPING
 from bfcl.eval_checker.constant import *
 from bfcl.eval_checker.executable_eval.custom_exception import BadAPIStatusError
+from bfcl.eval_checker.leaderboard_aggregation import (
+    LeaderboardSummary,
+    get_category_column,
+    unweighted_accuracy,
+    weighted_accuracy,
+)
 from bfcl.eval_checker.model_metadata import *
+from bfcl.model_handler.constant import STREAMING_METRIC_KEYS
 from bfcl.utils import (
     extract_test_category,
     find_file_with_suffix,
@@ -225,56 +231,6 @@ def clean_up_executable_expected_output(prompt_path, categories):
         write_list_of_dicts_to_file(prompt_file, prompt_content)
 
 
-def calculate_weighted_accuracy(accuracy_dict_list, display_na_if_category_missing=True):
-    has_na = False
-    total_count = 0
-    total_accuracy = 0
-    for accuracy_dict in accuracy_dict_list:
-        accuracy = accuracy_dict["accuracy"]
-        count = accuracy_dict["total_count"]
-        if accuracy_dict["display_accuracy"] == "N/A":
-            has_na = True
-
-        total_count += count
-        total_accuracy += accuracy * count
-
-    result = {"accuracy": total_accuracy / total_count, "total_count": total_count}
-
-    if has_na and display_na_if_category_missing:
-        result["display_accuracy"] = "N/A"
-    else:
-        result["display_accuracy"] = result["accuracy"]
-
-    return result
-
-
-def calculate_unweighted_accuracy(accuracy_dict_list, display_na_if_category_missing=True):
-    has_na = False
-    total_count = 0
-    total_accuracy = 0
-    for accuracy_dict in accuracy_dict_list:
-        accuracy = accuracy_dict["accuracy"]
-        count = accuracy_dict["total_count"]
-        if accuracy_dict["display_accuracy"] == "N/A":
-            # If a category is not being evaluated, it will still be considered 0 in the overall score calculation.
-            has_na = True
-
-        total_count += count
-        total_accuracy += accuracy
-
-    result = {
-        "accuracy": total_accuracy / len(accuracy_dict_list),
-        "total_count": total_count,
-    }
-
-    if has_na and display_na_if_category_missing:
-        result["display_accuracy"] = "N/A"
-    else:
-        result["display_accuracy"] = result["accuracy"]
-
-    return result
-
-
 def record_result(leaderboard_table, model_name, test_category, accuracy, total_count):
     if model_name not in leaderboard_table:
         leaderboard_table[model_name] = {}
@@ -290,27 +246,46 @@ def record_cost_latency(leaderboard_table, model_name, model_output_data):
         if key in data:
             if isinstance(data[key], list) and all(isinstance(inner_item, list) for inner_item in data[key]):
                 flattened_list = sum(data[key], [])
-                output_list.extend([item for item in flattened_list if item != 0])
+                # Streaming metrics are None for the queries that were not streamed
+                output_list.extend([item for item in flattened_list if item is not None and item != 0])
             else:
-                if data[key] != 0:
+                if data[key] is not None and data[key] != 0:
                     output_list.append(data[key])
 
     if model_name not in leaderboard_table:
         leaderboard_table[model_name] = {}
-        leaderboard_table[model_name]["cost"] = {"input_data": [], "output_data": []}
+        leaderboard_table[model_name]["cost"] = {
+            "input_data": [],
+            "output_data": [],
+            "cached_input_data": [],
+            "cache_creation_input_data": [],
+        }
         leaderboard_table[model_name]["latency"] = {"data": []}
+    if "streaming" not in leaderboard_table[model_name]:
+        leaderboard_table[model_name]["streaming"] = {key: [] for key in STREAMING_METRIC_KEYS}
 
     input_token = []
+    cached_input_token = []
+    cache_creation_input_token = []
     output_token = []
     latency = []
+    streaming = {key: [] for key in STREAMING_METRIC_KEYS}
     for data in model_output_data:
         process_data("latency", data, latency)
         process_data("input_token_count", data, input_token)
+        process_data("cached_input_token_count", data, cached_input_token)
+        process_data("cache_creation_input_token_count", data, cache_creation_input_token)
         process_data("output_token_count", data, output_token)
+        for key in STREAMING_METRIC_KEYS:
+            process_data(key, data, streaming[key])
 
     leaderboard_table[model_name]["cost"]["input_data"].extend(input_token)
+    leaderboard_table[model_name]["cost"]["cached_input_data"].extend(cached_input_token)
+    leaderboard_table[model_name]["cost"]["cache_creation_input_data"].extend(cache_creation_input_token)
     leaderboard_table[model_name]["cost"]["output_data"].extend(output_token)
     leaderboard_table[model_name]["latency"]["data"].extend(latency)
+    for key in STREAMING_METRIC_KEYS:
+        leaderboard_table[model_name]["streaming"][key].extend(streaming[key])
 
 
 def get_cost_letency_info(model_name, cost_data, latency_data):
@@ -321,7 +296,23 @@ def get_cost_letency_info(model_name, cost_data, latency_data):
 
         mean_input_token = statistics.mean(cost_data["input_data"])
         mean_output_token = statistics.mean(cost_data["output_data"])
-        cost = (mean_input_token * INPUT_PRICE_PER_MILLION_TOKEN[model_name] + mean_output_token * OUTPUT_PRICE_PER_MILLION_TOKEN[model_name]) / 1000
+        # Input tokens served from the provider's prompt cache are billed at a discounted price, and the ones written to it at a premium.
+        # Only the queries that read from (or write to) the cache report those tokens, so average over all queries.
+        mean_cached_input_token = 0
+        if model_name in CACHED_INPUT_PRICE_PER_MILLION_TOKEN:
+            mean_cached_input_token = sum(cost_data.get("cached_input_data", [])) / len(cost_data["input_data"])
+        mean_cache_creation_input_token = 0
+        if model_name in CACHE_WRITE_INPUT_PRICE_PER_MILLION_TOKEN:
+            mean_cache_creation_input_token = sum(cost_data.get("cache_creation_input_data", [])) / len(
+                cost_data["input_data"]
+            )
+        cost = (
+            (mean_input_token - mean_cached_input_token - mean_cache_creation_input_token)
+            * INPUT_PRICE_PER_MILLION_TOKEN[model_name]
+            + mean_cached_input_token * CACHED_INPUT_PRICE_PER_MILLION_TOKEN.get(model_name, 0)
+            + mean_cache_creation_input_token * CACHE_WRITE_INPUT_PRICE_PER_MILLION_TOKEN.get(model_name, 0)
+            + mean_output_token * OUTPUT_PRICE_PER_MILLION_TOKEN[model_name]
+        ) / 1000
         cost = round(cost, 2)
 
     # TODO: Have a formal way to calculate the cost and latency for OSS models
@@ -354,18 +345,19 @@ def get_cost_letency_info(model_name, cost_data, latency_data):
     return cost, mean_latency, std_latency, percentile_95_latency
 
 
-def get_category_score(score_dict: dict, test_category: str) -> dict:
-    if test_category in score_dict:
-        score = score_dict[test_category]
-        score["display_accuracy"] = score["accuracy"]
-        return score
-    else:
-        test_file_path = TEST_FILE_MAPPING[test_category]
-        num_entry = len(load_file(PROMPT_PATH / test_file_path))
-        # If a category is not being evaluated, it needs to be distinguished from the situation where the evaluation score is 0
-        # It will still be considered 0 in the overall score calculation though
-        # We use `display_accuracy` to special handle
-        return {"accuracy": 0, "total_count": num_entry, "display_accuracy": "N/A"}
+def get_streaming_latency_info(streaming_data):
+    """
+    Mean of each streaming metric (time to first token, inter-token latency, output tokens per second).
+    Models evaluated without `--stream` have no such data and get "N/A".
+    """
+    streaming_latency_info = []
+    for key in STREAMING_METRIC_KEYS:
+        if len(streaming_data.get(key, [])) != 0:
+            streaming_latency_info.append(round(statistics.mean(streaming_data[key]), 3))
+        else:
+            streaming_latency_info.append("N/A")
+
+    return streaming_latency_info
 
 
 def write_score_csv_file(
@@ -401,249 +393,259 @@ def write_score_csv_file(
 
 def generate_leaderboard_csv(leaderboard_table, output_path, eval_models=None, eval_categories=None):
     print("📈 Aggregating data to generate leaderboard score table...")
+    model_names = list(leaderboard_table.keys())
+
+    # Every score is computed for all models at once, one column (test category or summary) at a time
+    def category(test_category):
+        return get_category_column(leaderboard_table, model_names, test_category)
+
+    # Non-Live Score
+    python_simple_ast_non_live = category("simple")
+    python_multiple_ast_non_live = category("multiple")
+    python_parallel_ast_non_live = category("parallel")
+    python_parallel_multiple_ast_non_live = category("parallel_multiple")
+    python_simple_exec_non_live = category("exec_simple")
+    python_multiple_exec_non_live = category("exec_multiple")
+    python_parallel_exec_non_live = category("exec_parallel")
+    python_parallel_multiple_exec_non_live = category("exec_parallel_multiple")
+    python_nestful_multiple_exec_non_live = category("exec_parallel_multiple_nestful")
+    java_simple_ast_non_live = category("java")
+    javascript_simple_ast_non_live = category("javascript")
+    rest_simple_exec_non_live = category("rest")
+    irrelevance_non_live = category("irrelevance")
+
+    simple_ast_non_live = unweighted_accuracy(
+        [
+            python_simple_ast_non_live,
+            java_simple_ast_non_live,
+            javascript_simple_ast_non_live,
+        ]
+    )
+    multiple_ast_non_live = python_multiple_ast_non_live
+    parallel_ast_non_live = python_parallel_ast_non_live
+    parallel_multiple_ast_non_live = python_parallel_multiple_ast_non_live
+    simple_exec_non_live = unweighted_accuracy([python_simple_exec_non_live, rest_simple_exec_non_live])
+    multiple_exec_non_live = python_multiple_exec_non_live
+    parallel_exec_non_live = python_parallel_exec_non_live
+    parallel_multiple_exec_non_live = python_parallel_multiple_exec_non_live
+    nestful_multiple_exec_non_live = python_nestful_multiple_exec_non_live
+
+    summary_ast_non_live = unweighted_accuracy(
+        [
+            simple_ast_non_live,
+            multiple_ast_non_live,
+            parallel_ast_non_live,
+            parallel_multiple_ast_non_live,
+        ]
+    )
+    summary_exec_non_live = unweighted_accuracy(
+        [
+            simple_exec_non_live,
+            multiple_exec_non_live,
+            parallel_exec_non_live,
+            parallel_multiple_exec_non_live,
+            nestful_multiple_exec_non_live,
+        ]
+    )
+    overall_accuracy_non_live = unweighted_accuracy(
+        [
+            simple_ast_non_live,
+            multiple_ast_non_live,
+            parallel_ast_non_live,
+            parallel_multiple_ast_non_live,
+            simple_exec_non_live,
+            multiple_exec_non_live,
+            parallel_exec_non_live,
+            parallel_multiple_exec_non_live,
+            nestful_multiple_exec_non_live,
+            irrelevance_non_live,
+        ],
+        display_na_if_category_missing=False,
+    )
+
+    # Live Score
+    python_simple_ast_live = category("live_simple")
+    python_multiple_ast_live = category("live_multiple")
+    python_parallel_ast_live = category("live_parallel")
+    python_parallel_multiple_ast_live = category("live_parallel_multiple")
+    irrelevance_live = category("live_irrelevance")
+    relevance_live = category("live_relevance")
+    summary_ast_live = weighted_accuracy(
+        [
+            python_simple_ast_live,
+            python_multiple_ast_live,
+            python_parallel_ast_live,
+            python_parallel_multiple_ast_live,
+        ]
+    )
+
+    overall_accuracy_live = weighted_accuracy(
+        [
+            python_simple_ast_live,
+            python_multiple_ast_live,
+            python_parallel_ast_live,
+            python_parallel_multiple_ast_live,
+            irrelevance_live,
+            relevance_live,
+        ],
+        display_na_if_category_missing=False,
+    )
+
+    # Multi-Turn Score
+    multi_turn_base = category("multi_turn_base")
+    multi_turn_base_extended_double = category("multi_turn_base_extended_double")
+    multi_turn_base_extended_full = category("multi_turn_base_extended_full")
+    multi_turn_base_extended_900tools = category("multi_turn_base_extended_900tools")
+    multi_turn_miss_func = category("multi_turn_miss_func")
+    multi_turn_miss_param = category("multi_turn_miss_param")
+    multi_turn_long_context = category("multi_turn_long_context")
+    multi_turn_long_context_extended_double = category("multi_turn_long_context_extended_double")
+    multi_turn_long_context_extended_full = category("multi_turn_long_context_extended_full")
+    multi_turn_long_context_extended_900tools = category("multi_turn_long_context_extended_900tools")
+    overall_accuracy_multi_turn = unweighted_accuracy(
+        [
+            multi_turn_base,
+            multi_turn_base_extended_double,
+            multi_turn_base_extended_full,
+            multi_turn_base_extended_900tools,
+            multi_turn_miss_func,
+            multi_turn_miss_param,
+            multi_turn_long_context,
+            multi_turn_long_context_extended_double,
+            multi_turn_long_context_extended_full,
+            multi_turn_long_context_extended_900tools,
+        ],
+        display_na_if_category_missing=False,
+    )
+
+    # Total Score
+    total_irrelevance = unweighted_accuracy([irrelevance_non_live, irrelevance_live])
+    total_relevance = relevance_live
+
+    total_overall_accuracy = unweighted_accuracy(
+        [
+            overall_accuracy_live,
+            overall_accuracy_non_live,
+            overall_accuracy_multi_turn,
+        ],
+        display_na_if_category_missing=False,
+    )
+
+    non_live_columns = [
+        overall_accuracy_non_live,
+        summary_ast_non_live,
+        summary_exec_non_live,
+        simple_ast_non_live,
+        python_simple_ast_non_live,
+        java_simple_ast_non_live,
+        javascript_simple_ast_non_live,
+        multiple_ast_non_live,
+        parallel_ast_non_live,
+        parallel_multiple_ast_non_live,
+        simple_exec_non_live,
+        python_simple_exec_non_live,
+        rest_simple_exec_non_live,
+        multiple_exec_non_live,
+        parallel_exec_non_live,
+        parallel_multiple_exec_non_live,
+        nestful_multiple_exec_non_live,
+        irrelevance_non_live,
+    ]
+    live_columns = [
+        overall_accuracy_live,
+        summary_ast_live,
+        python_simple_ast_live,
+        python_multiple_ast_live,
+        python_parallel_ast_live,
+        python_parallel_multiple_ast_live,
+        irrelevance_live,
+        relevance_live,
+    ]
+    multi_turn_columns = [
+        overall_accuracy_multi_turn,
+        multi_turn_base,
+        multi_turn_base_extended_double,
+        multi_turn_base_extended_full,
+        multi_turn_base_extended_900tools,
+        multi_turn_miss_func,
+        multi_turn_miss_param,
+        multi_turn_long_context,
+        multi_turn_long_context_extended_double,
+        multi_turn_long_context_extended_full,
+        multi_turn_long_context_extended_900tools,
+    ]
+    combined_columns = [
+        summary_ast_non_live,
+        simple_ast_non_live,
+        multiple_ast_non_live,
+        parallel_ast_non_live,
+        parallel_multiple_ast_non_live,
+        summary_exec_non_live,
+        simple_exec_non_live,
+        multiple_exec_non_live,
+        parallel_exec_non_live,
+        parallel_multiple_exec_non_live,
+        nestful_multiple_exec_non_live,
+        overall_accuracy_live,
+        python_simple_ast_live,
+        python_multiple_ast_live,
+        python_parallel_ast_live,
+        python_parallel_multiple_ast_live,
+        overall_accuracy_multi_turn,
+        multi_turn_base,
+        multi_turn_base_extended_double,
+        multi_turn_base_extended_full,
+        multi_turn_base_extended_900tools,
+        multi_turn_miss_func,
+        multi_turn_miss_param,
+        multi_turn_long_context,
+        multi_turn_long_context_extended_double,
+        multi_turn_long_context_extended_full,
+        multi_turn_long_context_extended_900tools,
+        total_relevance,
+        total_irrelevance,
+    ]
+    # Transpose the columns into one row of displayed values per model
+    non_live_rows = list(zip(*[column.display() for column in non_live_columns]))
+    live_rows = list(zip(*[column.display() for column in live_columns]))
+    multi_turn_rows = list(zip(*[column.display() for column in multi_turn_columns]))
+    combined_rows = list(zip(*[column.display() for column in combined_columns]))
+    total_overall_accuracy_display = total_overall_accuracy.display()
+
     data_non_live = []
     data_live = []
     data_multi_turn = []
     data_combined = []
-    for model_name, value in leaderboard_table.items():
+    for i, model_name in enumerate(model_names):
+        value = leaderboard_table[model_name]
         model_name_escaped = model_name.replace("_", "/")
+        model_metadata = MODEL_METADATA_MAPPING[model_name_escaped]
 
         cost_data = value.get("cost", {"input_data": [], "output_data": []})
         latency_data = value.get("latency", {"data": []})
         cost, latency_mean, latency_std, percentile_95_latency = get_cost_letency_info(model_name_escaped, cost_data, latency_data)
+        streaming_data = value.get("streaming", {})
+        ttft_mean, inter_token_latency_mean, output_tokens_per_second_mean = get_streaming_latency_info(streaming_data)
 
-        # Non-Live Score
-        python_simple_ast_non_live = get_category_score(value, "simple")
-        python_multiple_ast_non_live = get_category_score(value, "multiple")
-        python_parallel_ast_non_live = get_category_score(value, "parallel")
-        python_parallel_multiple_ast_non_live = get_category_score(value, "parallel_multiple")
-        python_simple_exec_non_live = get_category_score(value, "exec_simple")
-        python_multiple_exec_non_live = get_category_score(value, "exec_multiple")
-        python_parallel_exec_non_live = get_category_score(value, "exec_parallel")
-        python_parallel_multiple_exec_non_live = get_category_score(value, "exec_parallel_multiple")
-        python_nestful_multiple_exec_non_live = get_category_score(value, "exec_parallel_multiple_nestful")
-        java_simple_ast_non_live = get_category_score(value, "java")
-        javascript_simple_ast_non_live = get_category_score(value, "javascript")
-        rest_simple_exec_non_live = get_category_score(value, "rest")
-        irrelevance_non_live = get_category_score(value, "irrelevance")
-
-        simple_ast_non_live = calculate_unweighted_accuracy(
-            [
-                python_simple_ast_non_live,
-                java_simple_ast_non_live,
-                javascript_simple_ast_non_live,
-            ]
-        )
-        multiple_ast_non_live = python_multiple_ast_non_live
-        parallel_ast_non_live = python_parallel_ast_non_live
-        parallel_multiple_ast_non_live = python_parallel_multiple_ast_non_live
-        simple_exec_non_live = calculate_unweighted_accuracy([python_simple_exec_non_live, rest_simple_exec_non_live])
-        multiple_exec_non_live = python_multiple_exec_non_live
-        parallel_exec_non_live = python_parallel_exec_non_live
-        parallel_multiple_exec_non_live = python_parallel_multiple_exec_non_live
-        nestful_multiple_exec_non_live = python_nestful_multiple_exec_non_live
-
-        summary_ast_non_live = calculate_unweighted_accuracy(
-            [
-                simple_ast_non_live,
-                multiple_ast_non_live,
-                parallel_ast_non_live,
-                parallel_multiple_ast_non_live,
-            ]
-        )
-        summary_exec_non_live = calculate_unweighted_accuracy(
-            [
-                simple_exec_non_live,
-                multiple_exec_non_live,
-                parallel_exec_non_live,
-                parallel_multiple_exec_non_live,
-                nestful_multiple_exec_non_live,
-            ]
-        )
-        overall_accuracy_non_live = calculate_unweighted_accuracy(
-            [
-                simple_ast_non_live,
-                multiple_ast_non_live,
-                parallel_ast_non_live,
-                parallel_multiple_ast_non_live,
-                simple_exec_non_live,
-                multiple_exec_non_live,
-                parallel_exec_non_live,
-                parallel_multiple_exec_non_live,
-                nestful_multiple_exec_non_live,
-                irrelevance_non_live,
-            ],
-            display_na_if_category_missing=False,
-        )
-
-        data_non_live.append(
-            [
-                "N/A",
-                MODEL_METADATA_MAPPING[model_name_escaped][0],
-                overall_accuracy_non_live["display_accuracy"],
-                summary_ast_non_live["display_accuracy"],
-                summary_exec_non_live["display_accuracy"],
-                simple_ast_non_live["display_accuracy"],
-                python_simple_ast_non_live["display_accuracy"],
-                java_simple_ast_non_live["display_accuracy"],
-                javascript_simple_ast_non_live["display_accuracy"],
-                multiple_ast_non_live["display_accuracy"],
-                parallel_ast_non_live["display_accuracy"],
-                parallel_multiple_ast_non_live["display_accuracy"],
-                simple_exec_non_live["display_accuracy"],
-                python_simple_exec_non_live["display_accuracy"],
-                rest_simple_exec_non_live["display_accuracy"],
-                multiple_exec_non_live["display_accuracy"],
-                parallel_exec_non_live["display_accuracy"],
-                parallel_multiple_exec_non_live["display_accuracy"],
-                nestful_multiple_exec_non_live["display_accuracy"],
-                irrelevance_non_live["display_accuracy"],
-            ]
-        )
-
-        # Live Score
-        python_simple_ast_live = get_category_score(value, "live_simple")
-        python_multiple_ast_live = get_category_score(value, "live_multiple")
-        python_parallel_ast_live = get_category_score(value, "live_parallel")
-        python_parallel_multiple_ast_live = get_category_score(value, "live_parallel_multiple")
-        irrelevance_live = get_category_score(value, "live_irrelevance")
-        relevance_live = get_category_score(value, "live_relevance")
-        summary_ast_live = calculate_weighted_accuracy(
-            [
-                python_simple_ast_live,
-                python_multiple_ast_live,
-                python_parallel_ast_live,
-                python_parallel_multiple_ast_live,
-            ]
-        )
-
-        overall_accuracy_live = calculate_weighted_accuracy(
-            [
-                python_simple_ast_live,
-                python_multiple_ast_live,
-                python_parallel_ast_live,
-                python_parallel_multiple_ast_live,
-                irrelevance_live,
-                relevance_live,
-            ],
-            display_na_if_category_missing=False,
-        )
-
-        data_live.append(
-            [
-                "N/A",
-                MODEL_METADATA_MAPPING[model_name_escaped][0],
-                overall_accuracy_live["display_accuracy"],
-                summary_ast_live["display_accuracy"],
-                python_simple_ast_live["display_accuracy"],
-                python_multiple_ast_live["display_accuracy"],
-                python_parallel_ast_live["display_accuracy"],
-                python_parallel_multiple_ast_live["display_accuracy"],
-                irrelevance_live["display_accuracy"],
-                relevance_live["display_accuracy"],
-            ]
-        )
-
-        # Multi-Turn Score
-        multi_turn_base = get_category_score(value, "multi_turn_base")
-        multi_turn_base_extended_double = get_category_score(value, "multi_turn_base_extended_double")
-        multi_turn_base_extended_full = get_category_score(value, "multi_turn_base_extended_full")
-        multi_turn_base_extended_900tools = get_category_score(value, "multi_turn_base_extended_900tools")
-        multi_turn_miss_func = get_category_score(value, "multi_turn_miss_func")
-        multi_turn_miss_param = get_category_score(value, "multi_turn_miss_param")
-        multi_turn_long_context = get_category_score(value, "multi_turn_long_context")
-        multi_turn_long_context_extended_double = get_category_score(value, "multi_turn_long_context_extended_double")
-        multi_turn_long_context_extended_full = get_category_score(value, "multi_turn_long_context_extended_full")
-        multi_turn_long_context_extended_900tools = get_category_score(value, "multi_turn_long_context_extended_900tools")
-        overall_accuracy_multi_turn = calculate_unweighted_accuracy(
-            [
-                multi_turn_base,
-                multi_turn_base_extended_double,
-                multi_turn_base_extended_full,
-                multi_turn_base_extended_900tools,
-                multi_turn_miss_func,
-                multi_turn_miss_param,
-                multi_turn_long_context,
-                multi_turn_long_context_extended_double,
-                multi_turn_long_context_extended_full,
-                multi_turn_long_context_extended_900tools,
-            ],
-            display_na_if_category_missing=False,
-        )
-
-        data_multi_turn.append(
-            [
-                "N/A",
-                MODEL_METADATA_MAPPING[model_name_escaped][0],
-                overall_accuracy_multi_turn["display_accuracy"],
-                multi_turn_base["display_accuracy"],
-                multi_turn_base_extended_double["display_accuracy"],
-                multi_turn_base_extended_full["display_accuracy"],
-                multi_turn_base_extended_900tools["display_accuracy"],
-                multi_turn_miss_func["display_accuracy"],
-                multi_turn_miss_param["display_accuracy"],
-                multi_turn_long_context["display_accuracy"],
-                multi_turn_long_context_extended_double["display_accuracy"],
-                multi_turn_long_context_extended_full["display_accuracy"],
-                multi_turn_long_context_extended_900tools["display_accuracy"],
-            ]
-        )
-
-        # Total Score
-        single_turn_ast = calculate_unweighted_accuracy([overall_accuracy_live, overall_accuracy_non_live])
-        total_irrelevance = calculate_unweighted_accuracy([irrelevance_non_live, irrelevance_live])
-        total_relevance = relevance_live
-
-        total_overall_accuracy = calculate_unweighted_accuracy(
-            [
-                overall_accuracy_live,
-                overall_accuracy_non_live,
-                overall_accuracy_multi_turn,
-            ],
-            display_na_if_category_missing=False,
-        )
-
+        data_non_live.append(["N/A", model_metadata[0], *non_live_rows[i]])
+        data_live.append(["N/A", model_metadata[0], *live_rows[i]])
+        data_multi_turn.append(["N/A", model_metadata[0], *multi_turn_rows[i]])
         data_combined.append(
             [
                 "N/A",
-                total_overall_accuracy["display_accuracy"],
-                MODEL_METADATA_MAPPING[model_name_escaped][0],
-                MODEL_METADATA_MAPPING[model_name_escaped][1],
+                total_overall_accuracy_display[i],
+                model_metadata[0],
+                model_metadata[1],
                 cost,
                 latency_mean,
                 latency_std,
                 percentile_95_latency,
-                summary_ast_non_live["display_accuracy"],
-                simple_ast_non_live["display_accuracy"],
-                multiple_ast_non_live["display_accuracy"],
-                parallel_ast_non_live["display_accuracy"],
-                parallel_multiple_ast_non_live["display_accuracy"],
-                summary_exec_non_live["display_accuracy"],
-                simple_exec_non_live["display_accuracy"],
-                multiple_exec_non_live["display_accuracy"],
-                parallel_exec_non_live["display_accuracy"],
-                parallel_multiple_exec_non_live["display_accuracy"],
-                nestful_multiple_exec_non_live["display_accuracy"],
-                overall_accuracy_live["display_accuracy"],
-                python_simple_ast_live["display_accuracy"],
-                python_multiple_ast_live["display_accuracy"],
-                python_parallel_ast_live["display_accuracy"],
-                python_parallel_multiple_ast_live["display_accuracy"],
-                overall_accuracy_multi_turn["display_accuracy"],
-                multi_turn_base["display_accuracy"],
-                multi_turn_base_extended_double["display_accuracy"],
-                multi_turn_base_extended_full["display_accuracy"],
-                multi_turn_base_extended_900tools["display_accuracy"],
-                multi_turn_miss_func["display_accuracy"],
-                multi_turn_miss_param["display_accuracy"],
-                multi_turn_long_context["display_accuracy"],
-                multi_turn_long_context_extended_double["display_accuracy"],
-                multi_turn_long_context_extended_full["display_accuracy"],
-                multi_turn_long_context_extended_900tools["display_accuracy"],
-                total_relevance["display_accuracy"],
-                total_irrelevance["display_accuracy"],
-                MODEL_METADATA_MAPPING[model_name_escaped][2],
-                MODEL_METADATA_MAPPING[model_name_escaped][3],
+                ttft_mean,
+                inter_token_latency_mean,
+                output_tokens_per_second_mean,
+                *combined_rows[i],
+                model_metadata[2],
+                model_metadata[3],
             ]
         )
 
@@ -677,7 +679,7 @@ def generate_leaderboard_csv(leaderboard_table, output_path, eval_models=None, e
         file_path=output_path / "data_overall.csv",
         header=COLUMNS_OVERALL,
         sort_column_index=1,
-        no_conversion_numeric_column_index=[4, 5, 6, 7],
+        no_conversion_numeric_column_index=[4, 5, 6, 7, 8, 9, 10],
     )
 
     # TODO: Update and optimize the logic
@@ -844,24 +846,15 @@ def check_all_category_present(category_status, eval_models=None, eval_categorie
 
 
 def update_leaderboard_table_with_local_score_file(leaderboard_table, score_path: Path) -> None:
-
-    entries = score_path.iterdir()
-
-    # Filter out the subdirectories
-    subdirs = [entry for entry in entries if entry.is_dir()]
-
-    # Traverse each subdirectory
-    for subdir in subdirs:
-        model_name = subdir.relative_to(score_path).name
-        # Find and process all JSON files in the subdirectory
-        for model_score_json in subdir.glob("*.json"):
-            metadata = load_file(model_score_json)[0]
-            accuracy, total_count = metadata["accuracy"], metadata["total_count"]
-            test_category = extract_test_category(model_score_json)
-            if model_name not in leaderboard_table:
-                leaderboard_table[model_name] = {}
-            if test_category not in leaderboard_table[model_name]:
-                leaderboard_table[model_name][test_category] = {
-                    "accuracy": accuracy,
-                    "total_count": total_count,
-                }
+    # Only the score files that changed since the last time are read, using the summary persisted in the score folder
+    leaderboard_summary = LeaderboardSummary(score_path)
+    leaderboard_summary.refresh()
+
+    for model_name, test_category, accuracy, total_count in leaderboard_summary.iter_scores():
+        if model_name not in leaderboard_table:
+            leaderboard_table[model_name] = {}
+        if test_category not in leaderboard_table[model_name]:
+            leaderboard_table[model_name][test_category] = {
+                "accuracy": accuracy,
+                "total_count": total_count,
+            }
@@ -0,0 +1,136 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from bfcl.constant import PROMPT_PATH, TEST_FILE_MAPPING
+from bfcl.eval_checker.constant import LEADERBOARD_SUMMARY_FILE_NAME
+from bfcl.utils import extract_test_category
+
+
+class LeaderboardSummary:
+    """
+    The accuracy and entry count of every score file in a score folder, persisted in the score folder itself.
+    On `refresh`, only the score files that changed since the previous refresh (by modification time and size) are read, and only their header line.
+    """
+
+    def __init__(self, score_dir: Path) -> None:
+        self.score_dir = score_dir
+        self.summary_file_path = score_dir / LEADERBOARD_SUMMARY_FILE_NAME
+        # model name -> score file name -> {"test_category", "accuracy", "total_count", "mtime_ns", "size"}
+        self.table = {}
+        if self.summary_file_path.exists():
+            try:
+                with open(self.summary_file_path, "r") as f:
+                    self.table = json.load(f)
+            except json.JSONDecodeError:
+                # A corrupted summary is simply rebuilt from the score files
+                self.table = {}
+
+    def refresh(self) -> None:
+        table = {}
+        for subdir in self.score_dir.iterdir():
+            if not subdir.is_dir():
+                continue
+            model_name = subdir.name
+            previous_entries = self.table.get(model_name, {})
+            for score_file in subdir.glob("*.json"):
+                stat = score_file.stat()
+                entry = previous_entries.get(score_file.name)
+                if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                    # The first line of a score file holds the accuracy
+                    with open(score_file, "r") as f:
+                        header = json.loads(f.readline())
+                    entry = {
+                        "test_category": extract_test_category(score_file),
+                        "accuracy": header["accuracy"],
+                        "total_count": header["total_count"],
+                        "mtime_ns": stat.st_mtime_ns,
+                        "size": stat.st_size,
+                    }
+                table.setdefault(model_name, {})[score_file.name] = entry
+
+        self.table = table
+        with open(self.summary_file_path, "w") as f:
+            json.dump(self.table, f)
+
+    def iter_scores(self):
+        """
+        Yield `(model_name, test_category, accuracy, total_count)` for every score file, in score folder order.
+        """
+        for model_name, entries in self.table.items():
+            for entry in entries.values():
+                yield model_name, entry["test_category"], entry["accuracy"], entry["total_count"]
+
+
+@lru_cache(maxsize=None)
+def get_category_entry_count(test_category: str) -> int:
+    with open(PROMPT_PATH / TEST_FILE_MAPPING[test_category], "r") as f:
+        return sum(1 for _ in f)
+
+
+class ScoreColumn(NamedTuple):
+    """
+    The scores of every model on one test category or summary, as parallel arrays.
+    `is_na` marks the models whose score is displayed as "N/A".
+    """
+
+    accuracy: np.ndarray
+    total_count: np.ndarray
+    is_na: np.ndarray
+
+    def display(self) -> list:
+        return ["N/A" if is_na else accuracy for accuracy, is_na in zip(self.accuracy.tolist(), self.is_na.tolist())]
+
+
+def get_category_column(leaderboard_table: dict, model_names: list[str], test_category: str) -> ScoreColumn:
+    accuracy = np.zeros(len(model_names))
+    total_count = np.zeros(len(model_names), dtype=np.int64)
+    is_na = np.zeros(len(model_names), dtype=bool)
+    for i, model_name in enumerate(model_names):
+        score = leaderboard_table[model_name].get(test_category)
+        if score is not None:
+            accuracy[i] = score["accuracy"]
+            total_count[i] = score["total_count"]
+        else:
+            # If a category is not being evaluated, it needs to be distinguished from the situation where the evaluation score is 0
+            # It will still be considered 0 in the overall score calculation though
+            total_count[i] = get_category_entry_count(test_category)
+            is_na[i] = True
+    return ScoreColumn(accuracy, total_count, is_na)
+
+
+def weighted_accuracy(columns: list[ScoreColumn], display_na_if_category_missing: bool = True) -> ScoreColumn:
+    # The columns are accumulated one at a time, same as the per-model sums, so that the results are identical
+    total_accuracy = np.zeros(len(columns[0].accuracy))
+    total_count = np.zeros(len(columns[0].accuracy), dtype=np.int64)
+    has_na = np.zeros(len(columns[0].accuracy), dtype=bool)
+    for column in columns:
+        total_accuracy += column.accuracy * column.total_count
+        total_count += column.total_count
+        has_na |= column.is_na
+
+    return ScoreColumn(
+        total_accuracy / total_count,
+        total_count,
+        has_na if display_na_if_category_missing else np.zeros_like(has_na),
+    )
+
+
+def unweighted_accuracy(columns: list[ScoreColumn], display_na_if_category_missing: bool = True) -> ScoreColumn:
+    # If a category is not being evaluated, it will still be considered 0 in the overall score calculation.
+    total_accuracy = np.zeros(len(columns[0].accuracy))
+    total_count = np.zeros(len(columns[0].accuracy), dtype=np.int64)
+    has_na = np.zeros(len(columns[0].accuracy), dtype=bool)
+    for column in columns:
+        total_accuracy += column.accuracy
+        total_count += column.total_count
+        has_na |= column.is_na
+
+    return ScoreColumn(
+        total_accuracy / len(columns),
+        total_count,
+        has_na if display_na_if_category_missing else np.zeros_like(has_na),
+    )
@@ -976,6 +976,54 @@ INPUT_PRICE_PER_MILLION_TOKEN = {
     "grok-beta": 5,
 }
 
+# Price of the input tokens read from the provider's prompt cache, for the models that support prompt caching.
+CACHED_INPUT_PRICE_PER_MILLION_TOKEN = {
+    "claude-3-opus-20240229-FC": 1.5,
+    "claude-3-opus-20240229": 1.5,
+    "claude-3-5-sonnet-20240620-FC": 0.3,
+    "claude-3-5-sonnet-20240620": 0.3,
+    "claude-3-5-sonnet-20241022-FC": 0.3,
+    "claude-3-5-sonnet-20241022": 0.3,
+    "claude-3-haiku-20240307-FC": 0.03,
+    "claude-3-haiku-20240307": 0.03,
+    "claude-3-5-haiku-20241022-FC": 0.08,
+    "claude-3-5-haiku-20241022": 0.08,
+    "o1-2024-12-17-FC": 7.5,
+    "o1-2024-12-17": 7.5,
+    "o3-mini-2025-01-31-FC": 0.55,
+    "o3-mini-2025-01-31": 0.55,
+    "gpt-4o-2024-11-20-FC": 1.25,
+    "gpt-4o-2024-11-20": 1.25,
+    "gpt-4o-mini-2024-07-18": 0.075,
+    "gpt-4o-mini-2024-07-18-FC": 0.075,
+    "gemini-2.0-flash-lite-preview-02-05": 0.01875,
+    "gemini-2.0-flash-lite-preview-02-05-FC": 0.01875,
+    "gemini-2.0-flash-001-FC": 0.0375,
+    "gemini-2.0-flash-001": 0.0375,
+    "gemini-1.5-pro-002": 0.3125,
+    "gemini-1.5-pro-002-FC": 0.3125,
+    "gemini-1.5-pro-001": 0.3125,
+    "gemini-1.5-pro-001-FC": 0.3125,
+    "gemini-1.5-flash-002": 0.01875,
+    "gemini-1.5-flash-002-FC": 0.01875,
+    "gemini-1.5-flash-001": 0.01875,
+    "gemini-1.5-flash-001-FC": 0.01875,
+}
+
+# Price of the input tokens written to the provider's prompt cache, for the models that bill cache writes separately (1.25x the input price for Anthropic).
+CACHE_WRITE_INPUT_PRICE_PER_MILLION_TOKEN = {
+    "claude-3-opus-20240229-FC": 18.75,
+    "claude-3-opus-20240229": 18.75,
+    "claude-3-5-sonnet-20240620-FC": 3.75,
+    "claude-3-5-sonnet-20240620": 3.75,
+    "claude-3-5-sonnet-20241022-FC": 3.75,
+    "claude-3-5-sonnet-20241022": 3.75,
+    "claude-3-haiku-20240307-FC": 0.3,
+    "claude-3-haiku-20240307": 0.3,
+    "claude-3-5-haiku-20241022-FC": 1.25,
+    "claude-3-5-haiku-20241022": 1.25,
+}
+
 OUTPUT_PRICE_PER_MILLION_TOKEN = {
     "claude-3-opus-20240229-FC": 75,
     "claude-3-opus-20240229": 75,
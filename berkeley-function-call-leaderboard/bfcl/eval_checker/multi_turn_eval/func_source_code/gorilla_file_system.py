@@ -5,6 +5,9 @@ from typing import Dict, List, Optional, Union
 
 from .long_context import FILE_CONTENT_EXTENSION, FILES_TAIL_USED, POPULATE_FILE_EXTENSION
 
+# The characters `str.splitlines` treats as line boundaries, besides the two-character "\r\n"
+LINE_BOUNDARIES = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
 
 class File:
 
@@ -19,6 +22,16 @@ class File:
         self.name: str = name
         self.content: str = content
         self._last_modified: datetime.datetime = datetime.datetime.now()
+        # Indexes of the directories holding the file, invalidated when its content changes
+        self._holders: List["DirectoryIndex"] = []
+        # Caches derived from the content, built on first use
+        self._size: Optional[int] = None
+        self._lines: Optional[List[str]] = None
+        self._word_count: Optional[int] = None
+
+    def __getstate__(self) -> dict:
+        # The content caches are rebuilt on demand, no need to copy them along with the file
+        return {**self.__dict__, "_size": None, "_lines": None, "_word_count": None}
 
     def _write(self, new_content: str) -> None:
         """
@@ -29,6 +42,11 @@ class File:
         """
         self.content = new_content
         self._last_modified = datetime.datetime.now()
+        self._size = None
+        self._lines = None
+        self._word_count = None
+        for holder in self._holders:
+            holder._invalidate(names=False)
 
     def _read(self) -> str:
         """
@@ -46,8 +64,60 @@ class File:
         Args:
             additional_content (str): The content to append to the file.
         """
+        last_line_start = self._get_last_line_start() if self._lines else 0
         self.content += additional_content
         self._last_modified = datetime.datetime.now()
+        self._size = None
+        if self._lines is not None:
+            # Only the last line can be continued by the appended content, the lines before it are kept as is
+            new_lines = self.content[last_line_start:].splitlines()
+            if self._lines:
+                last_line = self._lines.pop()
+                if self._word_count is not None:
+                    self._word_count -= len(last_line.split())
+            self._lines.extend(new_lines)
+            if self._word_count is not None:
+                self._word_count += sum(len(line.split()) for line in new_lines)
+        else:
+            self._word_count = None
+        for holder in self._holders:
+            holder._invalidate(names=False)
+
+    def _get_size(self) -> int:
+        """
+        Get the size of the file content in bytes.
+        """
+        if self._size is None:
+            self._size = len(self.content.encode("utf-8"))
+        return self._size
+
+    def _get_lines(self) -> List[str]:
+        """
+        Get the lines of the file content, as `str.splitlines` splits them.
+        The list is cached, so callers must not modify it.
+        """
+        if self._lines is None:
+            self._lines = self.content.splitlines()
+        return self._lines
+
+    def _get_word_count(self) -> int:
+        """
+        Get the number of whitespace-separated words in the file content.
+        """
+        if self._word_count is None:
+            self._word_count = len(self.content.split())
+        return self._word_count
+
+    def _get_last_line_start(self) -> int:
+        """
+        Get the offset in the content where the last line starts. The file must have at least one line.
+        """
+        end = len(self.content)
+        if self.content.endswith("\r\n"):
+            end -= 2
+        elif self.content[-1] in LINE_BOUNDARIES:
+            end -= 1
+        return end - len(self._lines[-1])
 
     def __repr__(self):
         return f"<<File: {self.name}, Content: {self.content}>>"
@@ -58,6 +128,45 @@ class File:
         return self.name == other.name and self.content == other.content
 
 
+class DirectoryIndex:
+    """
+    Cached aggregates of the subtree under a directory: its size in bytes, for `du`, and the names of the files and directories in it, for `find`.
+    The names are joined by "/", which cannot appear in a name, so that a single substring search tells whether any of them may contain a given string.
+    They are built on first use, and invalidated up the tree when a file is written or the subtree changes.
+
+    The index belongs to the `contents` dict of a directory rather than to the directory itself, since a moved directory shares its `contents` with the directory it was moved from.
+    `owners` are the directories sharing the `contents`; each file and directory keeps the indexes of the directories holding it (`_holders`), which can be several after a `cp`.
+    """
+
+    def __init__(self, owner: "Directory") -> None:
+        self.owners: List["Directory"] = [owner]
+        self.size: Optional[int] = None
+        self.names: Optional[str] = None
+
+    def __getstate__(self) -> dict:
+        # The aggregates are rebuilt on demand, no need to copy them along with the file system
+        return {"owners": self.owners, "size": None, "names": None}
+
+    def _invalidate(self, names: bool = True) -> None:
+        """
+        Invalidate the cached size, and the cached names unless `names` is False, of this index and of the indexes of the directories above it.
+
+        Args:
+            names (bool): Whether the names in the subtree changed too. Defaults to True.
+        """
+        # The indexes above a stale index are always stale too, so the walk can stop at the first one already invalidated
+        stack = [self]
+        while stack:
+            index = stack.pop()
+            if index.size is None and (not names or index.names is None):
+                continue
+            index.size = None
+            if names:
+                index.names = None
+            for owner in index.owners:
+                stack.extend(owner._holders)
+
+
 class Directory:
 
     def __init__(self, name: str, parent: Optional["Directory"] = None) -> None:
@@ -70,6 +179,9 @@ class Directory:
         self.name: str = name
         self.parent: Optional["Directory"] = parent
         self.contents: Dict[str, Union["File", "Directory"]] = {}
+        self._index: DirectoryIndex = DirectoryIndex(self)
+        # Indexes of the directories holding this directory
+        self._holders: List[DirectoryIndex] = []
 
     def _add_file(self, file_name: str, content: str = "") -> None:
         """
@@ -84,7 +196,7 @@ class Directory:
                 f"File '{file_name}' already exists in directory '{self.name}'."
             )
         new_file = File(file_name, content)
-        self.contents[file_name] = new_file
+        self._set_item(file_name, new_file)
 
     def _add_directory(self, dir_name: str) -> None:
         """
@@ -98,7 +210,59 @@ class Directory:
                 f"Directory '{dir_name}' already exists in directory '{self.name}'."
             )
         new_dir = Directory(dir_name, self)
-        self.contents[dir_name] = new_dir
+        self._set_item(dir_name, new_dir)
+
+    def _set_item(self, item_name: str, item: Union["File", "Directory"]) -> None:
+        """
+        Put an item (file or subdirectory) in the directory under the given name, which must not be taken.
+
+        Args:
+            item_name (str): The name of the item in the directory.
+            item (File or Directory): The item to put.
+        """
+        self.contents[item_name] = item
+        item._holders.append(self._index)
+        self._index._invalidate()
+
+    def _remove_item(self, item_name: str) -> Union["File", "Directory"]:
+        """
+        Remove an item (file or subdirectory) from the directory.
+
+        Args:
+            item_name (str): The name of the item to remove.
+
+        Returns:
+            item (File or Directory): The removed item.
+        """
+        item = self.contents.pop(item_name)
+        item._holders.remove(self._index)
+        self._index._invalidate()
+        return item
+
+    def _share_contents(self, other: "Directory") -> None:
+        """
+        Make a new, empty directory share the contents of another directory, so that changes in either are seen by both.
+
+        Args:
+            other (Directory): The directory to share the contents of.
+        """
+        self.contents = other.contents
+        self._index = other._index
+        self._index.owners.append(self)
+        for holder in self._holders:
+            holder._invalidate()
+
+    def _copy_contents(self, other: "Directory") -> None:
+        """
+        Make a new, empty directory hold the same items as another directory. The items themselves are not copied.
+
+        Args:
+            other (Directory): The directory to copy the contents of.
+        """
+        self.contents = other.contents.copy()
+        for item in self.contents.values():
+            item._holders.append(self._index)
+        self._index._invalidate()
 
     def _get_item(self, item_name: str) -> Union["File", "Directory", None]:
         """
@@ -121,6 +285,26 @@ class Directory:
         """
         return list(self.contents.keys())
 
+    def _get_size(self) -> int:
+        """
+        Get the total size in bytes of the files under the directory, at any depth.
+        """
+        if self._index.size is None:
+            self._index.size = sum(item._get_size() for item in self.contents.values())
+        return self._index.size
+
+    def _get_names(self) -> str:
+        """
+        Get the names of the files and directories under the directory, at any depth, joined by "/".
+        """
+        if self._index.names is None:
+            names = list(self.contents)
+            for item in self.contents.values():
+                if isinstance(item, Directory):
+                    names.append(item._get_names())
+            self._index.names = "/".join(names)
+        return self._index.names
+
     def __repr__(self):
         return f"<Directory: {self.name}, Parent: {self.parent.name if self.parent else None}, Contents: {self.contents}>"
 
@@ -218,14 +402,14 @@ class GorillaFileSystem:
                 is_bottommost = False
                 new_dir = Directory(dir_name, parent)
                 new_dir = self._load_directory(dir_data["contents"], new_dir)
-                parent.contents[dir_name] = new_dir
+                parent._set_item(dir_name, new_dir)
 
             elif dir_data["type"] == "file":
                 content = dir_data["content"]
                 if self.long_context and dir_name not in FILES_TAIL_USED:
                     content += FILE_CONTENT_EXTENSION
                 new_file = File(dir_name, content)
-                parent.contents[dir_name] = new_file
+                parent._set_item(dir_name, new_file)
 
         if is_bottommost and self.long_context:
             self._populate_directory(parent)
@@ -417,7 +601,8 @@ class GorillaFileSystem:
                 item_path = f"{base_path}/{item_name}"
                 if name is None or name in item_name:
                     matches.append(item_path)
-                if isinstance(item, Directory):
+                # Skip the subdirectories where no name can match
+                if isinstance(item, Directory) and (name is None or name in item._get_names()):
                     recursive_search(item, item_path)
 
         recursive_search(target_dir, path.rstrip("/"))
@@ -441,18 +626,16 @@ class GorillaFileSystem:
         if file_name in self._current_dir.contents:
             file = self._current_dir._get_item(file_name)
             if isinstance(file, File):
-                content = file._read()
-
                 if mode == "l":
-                    line_count = len(content.splitlines())
+                    line_count = len(file._get_lines())
                     return {"count": line_count, "type": "lines"}
 
                 elif mode == "w":
-                    word_count = len(content.split())
+                    word_count = file._get_word_count()
                     return {"count": word_count, "type": "words"}
 
                 elif mode == "c":
-                    char_count = len(content)
+                    char_count = len(file._read())
                     return {"count": char_count, "type": "characters"}
 
         return {"error": f"wc: {file_name}: No such file or directory"}
@@ -470,9 +653,7 @@ class GorillaFileSystem:
         if file_name in self._current_dir.contents:
             file = self._current_dir._get_item(file_name)
             if isinstance(file, File):
-                content = file._read()
-
-                sorted_content = "\n".join(sorted(content.splitlines()))
+                sorted_content = "\n".join(sorted(file._get_lines()))
 
                 return {"sorted_content": sorted_content}
 
@@ -492,9 +673,7 @@ class GorillaFileSystem:
         if file_name in self._current_dir.contents:
             file = self._current_dir._get_item(file_name)
             if isinstance(file, File):
-                content = file._read()
-
-                matching_lines = [line for line in content.splitlines() if pattern in line]
+                matching_lines = [line for line in file._get_lines() if pattern in line]
 
                 return {"matching_lines": matching_lines}
 
@@ -510,19 +689,11 @@ class GorillaFileSystem:
         Returns:
             disk_usage (str): The estimated disk usage.
         """
-
-        def get_size(item: Union[File, Directory]) -> int:
-            if isinstance(item, File):
-                return len(item._read().encode("utf-8"))
-            elif isinstance(item, Directory):
-                return sum(get_size(child) for child in item.contents.values())
-            return 0
-
         target_dir = self._navigate_to_directory(None)
         if isinstance(target_dir, dict):  # Error condition check
             return target_dir
 
-        total_size = get_size(target_dir)
+        total_size = target_dir._get_size()
 
         if human_readable:
             for unit in ["B", "KB", "MB", "GB", "TB"]:
@@ -551,7 +722,7 @@ class GorillaFileSystem:
         if file_name in self._current_dir.contents:
             file = self._current_dir._get_item(file_name)
             if isinstance(file, File):
-                content = file._read().splitlines()
+                content = file._get_lines()
 
                 if lines > len(content):
                     lines = len(content)
@@ -580,8 +751,8 @@ class GorillaFileSystem:
             file2 = self._current_dir._get_item(file_name2)
 
             if isinstance(file1, File) and isinstance(file2, File):
-                content1 = file1._read().splitlines()
-                content2 = file2._read().splitlines()
+                content1 = file1._get_lines()
+                content2 = file2._get_lines()
 
                 diff_lines = [
                     f"- {line1}\n+ {line2}"
@@ -628,12 +799,12 @@ class GorillaFileSystem:
                         "error": f"mv: cannot move '{source}' to '{destination}/{source}': File exists"
                     }
                 else:
-                    self._current_dir.contents.pop(source)
+                    self._current_dir._remove_item(source)
                     if isinstance(item, File):
                         dest_item._add_file(source, item.content)
                     else:
                         dest_item._add_directory(source)
-                        dest_item.contents[source].contents = item.contents
+                        dest_item.contents[source]._share_contents(item)
                     return {"result": f"'{source}' moved to '{destination}/{source}'"}
             else:
                 return {
@@ -641,12 +812,12 @@ class GorillaFileSystem:
                 }
         else:
             # Destination is not an existing directory, move/rename the item
-            self._current_dir.contents.pop(source)
+            self._current_dir._remove_item(source)
             if isinstance(item, File):
                 self._current_dir._add_file(destination, item.content)
             else:
                 self._current_dir._add_directory(destination)
-                self._current_dir.contents[destination].contents = item.contents
+                self._current_dir.contents[destination]._share_contents(item)
             return {"result": f"'{source}' moved to '{destination}'"}
 
     def rm(self, file_name: str) -> Dict[str, str]:
@@ -662,7 +833,7 @@ class GorillaFileSystem:
         if file_name in self._current_dir.contents:
             item = self._current_dir._get_item(file_name)
             if isinstance(item, File) or isinstance(item, Directory):
-                self._current_dir.contents.pop(file_name)
+                self._current_dir._remove_item(file_name)
                 return {"result": f"'{file_name}' removed"}
             else:
                 return {
@@ -689,7 +860,7 @@ class GorillaFileSystem:
                         "error": f"rmdir: failed to remove '{dir_name}': Directory not empty"
                     }
                 else:
-                    self._current_dir.contents.pop(dir_name)
+                    self._current_dir._remove_item(dir_name)
                     return {"result": f"'{dir_name}' removed"}
             else:
                 return {"error": f"rmdir: cannot remove '{dir_name}': Not a directory"}
@@ -743,7 +914,7 @@ class GorillaFileSystem:
                         dest_item._add_file(source, item.content)
                     else:
                         dest_item._add_directory(source)
-                        dest_item.contents[source].contents = item.contents.copy()
+                        dest_item.contents[source]._copy_contents(item)
                     return {"result": f"'{source}' copied to '{destination}/{source}'"}
             else:
                 return {
@@ -755,7 +926,7 @@ class GorillaFileSystem:
                 self._current_dir._add_file(destination, item.content)
             else:
                 self._current_dir._add_directory(destination)
-                self._current_dir.contents[destination].contents = item.contents.copy()
+                self._current_dir.contents[destination]._copy_contents(item)
             return {"result": f"'{source}' copied to '{destination}'"}
 
     def _navigate_to_directory(
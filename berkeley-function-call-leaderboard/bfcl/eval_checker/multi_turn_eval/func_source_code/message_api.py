@@ -1,6 +1,8 @@
 import random
 from copy import deepcopy
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
+
+from .text_index import SubstringIndex
 
 DEFAULT_STATE = {
     "generated_ids": set(),
@@ -27,6 +29,44 @@ DEFAULT_STATE = {
 }
 
 
+class InboxIndex:
+    """
+    Indexes over the inbox of a MessageAPI: the messages in inbox order, the messages sent to each receiver, and a substring index over the message contents.
+    New messages are always appended to the inbox, so the messages are numbered in inbox order.
+    """
+
+    def __init__(self) -> None:
+        # message number -> (receiver id, message content)
+        self.messages: Dict[int, Tuple[str, str]] = {}
+        # receiver id -> message numbers, in inbox order
+        self.receiver_messages: Dict[str, List[int]] = {}
+        self.contents = SubstringIndex()
+        self.next_number = 0
+
+    @staticmethod
+    def is_indexable(message: object) -> bool:
+        if type(message) is not dict or len(message) != 1:
+            return False
+        receiver_id, message_content = next(iter(message.items()))
+        return isinstance(receiver_id, str) and isinstance(message_content, str)
+
+    def add(self, message: Dict[str, str]) -> None:
+        receiver_id, message_content = next(iter(message.items()))
+        number = self.next_number
+        self.next_number += 1
+        self.messages[number] = (receiver_id, message_content)
+        self.receiver_messages.setdefault(receiver_id, []).append(number)
+        self.contents.add(number, message_content)
+
+    def remove(self, number: int) -> None:
+        receiver_id, _ = self.messages.pop(number)
+        numbers = self.receiver_messages[receiver_id]
+        numbers.remove(number)
+        if not numbers:
+            del self.receiver_messages[receiver_id]
+        self.contents.remove(number)
+
+
 class MessageAPI:
     """
     A class representing a Message API for managing user interactions in a workspace.
@@ -64,6 +104,8 @@ class MessageAPI:
         self.inbox: List[Dict[str, str]]
         self.message_count: int
         self.current_user: Optional[str]
+        # Built on first use, then kept up to date as messages are sent and deleted
+        self._inbox_index: Optional[InboxIndex] = None
         self._api_description = "This tool belongs to the Message API, which is used to manage user interactions in a workspace."
 
     def _load_scenario(self, scenario: dict, long_context=False) -> None:
@@ -85,6 +127,11 @@ class MessageAPI:
             "message_count", DEFAULT_STATE_COPY["message_count"]
         )
         self.current_user = scenario.get("current_user", DEFAULT_STATE_COPY["current_user"])
+        self._inbox_index = None
+
+    def __getstate__(self) -> dict:
+        # The inbox index is rebuilt on demand, no need to copy it along with the instance
+        return {**self.__dict__, "_inbox_index": None}
 
     def __eq__(self, value: object) -> bool:
         if not isinstance(value, MessageAPI):
@@ -101,6 +148,22 @@ class MessageAPI:
 
         return True
 
+    def _get_inbox_index(self) -> Optional[InboxIndex]:
+        """
+        Get the index over the inbox, building it if needed.
+
+        Returns:
+            inbox_index (InboxIndex): The index, or None if the inbox holds messages that cannot be indexed, such as non-string contents.
+                In that case, the inbox is scanned as is, so that the same errors are raised.
+        """
+        if self._inbox_index is None:
+            if not all(InboxIndex.is_indexable(message) for message in self.inbox):
+                return None
+            self._inbox_index = InboxIndex()
+            for message in self.inbox:
+                self._inbox_index.add(message)
+        return self._inbox_index
+
     def _generate_id(self):
         """
         Generate a unique ID for a message.
@@ -189,6 +252,11 @@ class MessageAPI:
         # Store the message in the inbox
         self.inbox.append({receiver_id: message})
         self.message_count += 1
+        if self._inbox_index is not None:
+            if InboxIndex.is_indexable(self.inbox[-1]):
+                self._inbox_index.add(self.inbox[-1])
+            else:
+                self._inbox_index = None
         return {
             "sent_status": True,
             "message_id": message_id,
@@ -209,6 +277,22 @@ class MessageAPI:
         if not self.current_user:
             return {"error": "No user is currently logged in."}
 
+        inbox_index = self._get_inbox_index()
+        if inbox_index is not None:
+            numbers = inbox_index.receiver_messages.get(receiver_id) if isinstance(receiver_id, str) else None
+            if not numbers:
+                return {"error": f"Receiver ID {receiver_id} not found."}
+            receiver, message_content = inbox_index.messages[numbers[-1]]
+            # `list.remove` removes the first message equal to the latest one, that is, the first one sent to the receiver with the same content
+            number = next(number for number in numbers if inbox_index.messages[number][1] == message_content)
+            self.inbox.remove({receiver: message_content})
+            inbox_index.remove(number)
+            return {
+                "deleted_status": True,
+                "message_id": receiver,
+                "message": f"Receiver {receiver_id}'s first message deleted successfully.",
+            }
+
         # Loop through the inbox in reverse order to find the first message sent to the receiver
         for message in self.inbox[::-1]:
             receiver, _ = list(message.items())[0]
@@ -231,6 +315,18 @@ class MessageAPI:
         """
         if not self.current_user:
             return {"error": "No user is currently logged in."}
+
+        inbox_index = self._get_inbox_index()
+        if inbox_index is not None:
+            # The receivers are listed in the order of their first message
+            receiver_messages = sorted(inbox_index.receiver_messages.items(), key=lambda item: item[1][0])
+            return {
+                "messages": {
+                    receiver: [inbox_index.messages[number][1] for number in numbers]
+                    for receiver, numbers in receiver_messages
+                }
+            }
+
         # Dictionary to collect messages grouped by receiver
         sent_messages = {}
         # Loop through the inbox and collect messages sent by the current user
@@ -280,6 +376,15 @@ class MessageAPI:
         if not self.current_user:
             return {"error": "No user is currently logged in."}
         keyword_lower = keyword.lower()
+
+        inbox_index = self._get_inbox_index()
+        if inbox_index is not None:
+            results = []
+            for number in sorted(inbox_index.contents.search(keyword_lower)):
+                receiver_id, message_content = inbox_index.messages[number]
+                results.append({"receiver_id": receiver_id, "message": message_content})
+            return {"results": results}
+
         results = []
         # Iterate through the inbox to search for the keyword in messages
         # for message_id, message_data in self.inbox.items():
@@ -304,6 +409,16 @@ class MessageAPI:
         """
         if not self.current_user:
             return {"error": "No user is currently logged in."}
+
+        inbox_index = self._get_inbox_index()
+        if inbox_index is not None:
+            return {
+                "stats": {
+                    "received_count": len(inbox_index.messages),
+                    "total_contacts": len(inbox_index.receiver_messages),
+                }
+            }
+
         sent_count = 0
         received_count = 0
         contacts = set()
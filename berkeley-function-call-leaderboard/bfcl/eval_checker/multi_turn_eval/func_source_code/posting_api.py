@@ -1,5 +1,7 @@
 from copy import deepcopy
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .text_index import SubstringIndex
 
 DEFAULT_STATE = {
     "username": "john",
@@ -13,6 +15,66 @@ DEFAULT_STATE = {
 }
 
 
+class TweetIndex:
+    """
+    Indexes over the tweets of a TwitterAPI: the tweets of each user, the tweets with each (lowercased) tag, and a substring index over the tweet contents.
+    Each tweet id is ranked by its position in the `tweets` dict, so that the search results can be listed in the same order.
+    """
+
+    def __init__(self) -> None:
+        # tweet id -> position in the tweets dict
+        self.ranks: Dict[int, int] = {}
+        # tweet id -> (username, lowercased tags) the tweet is indexed under
+        self.keys: Dict[int, Tuple[str, Set[str]]] = {}
+        # username -> tweet ids
+        self.user_tweets: Dict[str, Set[int]] = {}
+        # lowercased tag -> tweet ids
+        self.tag_tweets: Dict[str, Set[int]] = {}
+        self.contents = SubstringIndex()
+        self.next_rank = 0
+
+    @staticmethod
+    def is_indexable(tweet: object) -> bool:
+        return (
+            type(tweet) is dict
+            and isinstance(tweet.get("username"), str)
+            and isinstance(tweet.get("content"), str)
+            and type(tweet.get("tags")) is list
+            and all(isinstance(tag, str) for tag in tweet["tags"])
+        )
+
+    def add(self, tweet_id: int, tweet: Dict[str, Union[int, str, List[str]]]) -> None:
+        # A tweet replacing another one keeps its position in the tweets dict
+        if tweet_id in self.ranks:
+            self.remove(tweet_id)
+        else:
+            self.ranks[tweet_id] = self.next_rank
+            self.next_rank += 1
+        lowered_tags = {tag.lower() for tag in tweet["tags"]}
+        self.keys[tweet_id] = (tweet["username"], lowered_tags)
+        self.user_tweets.setdefault(tweet["username"], set()).add(tweet_id)
+        for tag in lowered_tags:
+            self.tag_tweets.setdefault(tag, set()).add(tweet_id)
+        self.contents.add(tweet_id, tweet["content"])
+
+    def remove(self, tweet_id: int) -> None:
+        username, lowered_tags = self.keys.pop(tweet_id)
+        self._discard(self.user_tweets, username, tweet_id)
+        for tag in lowered_tags:
+            self._discard(self.tag_tweets, tag, tweet_id)
+        self.contents.remove(tweet_id)
+
+    def sort(self, tweet_ids) -> List[int]:
+        return sorted(tweet_ids, key=self.ranks.__getitem__)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], key: str, tweet_id: int) -> None:
+        tweet_ids = index[key]
+        tweet_ids.discard(tweet_id)
+        if not tweet_ids:
+            del index[key]
+
+
 class TwitterAPI:
     def __init__(self):
         self.username: str
@@ -24,6 +86,8 @@ class TwitterAPI:
         self.following_list: List[str]
         # tweet_counter is used to assign unique IDs to tweets, it might not be the same as the length of the tweets list for different scenarios
         self.tweet_counter: int
+        # Built on first use, then kept up to date as tweets are posted
+        self._tweet_index: Optional[TweetIndex] = None
         self._api_description = "This tool belongs to the TwitterAPI, which provides core functionality for posting tweets, retweeting, commenting, and following users on Twitter."
 
     def _load_scenario(self, scenario: dict, long_context=False) -> None:
@@ -48,6 +112,27 @@ class TwitterAPI:
         self.tweet_counter = scenario.get(
             "tweet_counter", DEFAULT_STATE_COPY["tweet_counter"]
         )
+        self._tweet_index = None
+
+    def __getstate__(self) -> dict:
+        # The tweet index is rebuilt on demand, no need to copy it along with the instance
+        return {**self.__dict__, "_tweet_index": None}
+
+    def _get_tweet_index(self) -> Optional[TweetIndex]:
+        """
+        Get the index over the tweets, building it if needed.
+
+        Returns:
+            tweet_index (TweetIndex): The index, or None if some tweets cannot be indexed, such as tweets with non-string contents.
+                In that case, the tweets are scanned as is, so that the same errors are raised.
+        """
+        if self._tweet_index is None:
+            if not all(TweetIndex.is_indexable(tweet) for tweet in self.tweets.values()):
+                return None
+            self._tweet_index = TweetIndex()
+            for tweet_id, tweet in self.tweets.items():
+                self._tweet_index.add(tweet_id, tweet)
+        return self._tweet_index
 
     def authenticate_twitter(self, username: str, password: str) -> Dict[str, bool]:
         """
@@ -101,6 +186,11 @@ class TwitterAPI:
             "mentions": mentions,
         }
         self.tweets[self.tweet_counter] = tweet
+        if self._tweet_index is not None:
+            if TweetIndex.is_indexable(tweet):
+                self._tweet_index.add(self.tweet_counter, tweet)
+            else:
+                self._tweet_index = None
         self.tweet_counter += 1
         return tweet
 
@@ -251,6 +341,9 @@ class TwitterAPI:
                 - tags (List[str]): List of tags associated with the tweet.
                 - mentions (List[str]): List of users mentioned in the tweet.
         """
+        tweet_index = self._get_tweet_index()
+        if tweet_index is not None and isinstance(username, str):
+            return [self.tweets[tweet_id] for tweet_id in tweet_index.sort(tweet_index.user_tweets.get(username, ()))]
         return [tweet for tweet in self.tweets.values() if tweet["username"] == username]
 
     def search_tweets(self, keyword: str) -> List[Dict[str, Union[int, str, List[str]]]]:
@@ -267,6 +360,13 @@ class TwitterAPI:
                 - tags (List[str]): List of tags associated with the tweet.
                 - mentions (List[str]): List of users mentioned in the tweet.
         """
+        tweet_index = self._get_tweet_index()
+        # The keyword is only lowercased when there are tweets to match
+        if tweet_index is not None and self.tweets:
+            keyword_lower = keyword.lower()
+            tweet_ids = set(tweet_index.contents.search(keyword_lower))
+            tweet_ids.update(tweet_index.tag_tweets.get(keyword_lower, ()))
+            return [self.tweets[tweet_id] for tweet_id in tweet_index.sort(tweet_ids)]
         return [
             tweet
             for tweet in self.tweets.values()
@@ -300,9 +400,13 @@ class TwitterAPI:
             following_count (int): Number of users the specified user is following.
             retweet_count (int): Number of retweets made by the user.
         """
-        tweet_count = len(
-            [tweet for tweet in self.tweets.values() if tweet["username"] == username]
-        )
+        tweet_index = self._get_tweet_index()
+        if tweet_index is not None and isinstance(username, str):
+            tweet_count = len(tweet_index.user_tweets.get(username, ()))
+        else:
+            tweet_count = len(
+                [tweet for tweet in self.tweets.values() if tweet["username"] == username]
+            )
         following_count = len(self.following_list) if username == self.username else 0
         retweet_count = len(self.retweets.get(username, []))
 
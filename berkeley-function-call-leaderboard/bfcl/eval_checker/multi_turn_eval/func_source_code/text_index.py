@@ -0,0 +1,49 @@
+from collections import defaultdict
+from typing import DefaultDict, Dict, Hashable, List
+
+
+class SubstringIndex:
+    """
+    Case-insensitive substring search over a collection of texts, each stored under a key.
+
+    The lowercased texts are indexed by their whitespace-separated tokens. Any whitespace-free piece of a keyword found in a text lies within a single token of that text,
+    so a search only verifies the texts holding a token that contains the longest piece of the keyword.
+    Its cost depends on the number of distinct tokens and of candidate texts rather than on the size of the collection.
+    Keywords made only of whitespace are matched against every text.
+    """
+
+    def __init__(self) -> None:
+        # key -> lowercased text
+        self.texts: Dict[Hashable, str] = {}
+        # token -> keys of the texts containing it
+        self.postings: DefaultDict[str, List[Hashable]] = defaultdict(list)
+
+    def add(self, key: Hashable, text: str) -> None:
+        lowered_text = text.lower()
+        self.texts[key] = lowered_text
+        postings = self.postings
+        for token in set(lowered_text.split()):
+            postings[token].append(key)
+
+    def remove(self, key: Hashable) -> None:
+        lowered_text = self.texts.pop(key)
+        for token in set(lowered_text.split()):
+            keys = self.postings[token]
+            keys.remove(key)
+            if not keys:
+                del self.postings[token]
+
+    def search(self, keyword_lower: str) -> List[Hashable]:
+        """
+        Return the keys of the texts containing `keyword_lower`, in no particular order.
+
+        Args:
+            keyword_lower (str): The lowercased keyword to search for.
+        """
+        pieces = keyword_lower.split()
+        if not pieces:
+            return [key for key, text in self.texts.items() if keyword_lower in text]
+
+        longest_piece = max(pieces, key=len)
+        candidates = set().union(*[keys for token, keys in self.postings.items() if longest_piece in token])
+        return [key for key in candidates if keyword_lower in self.texts[key]]
@@ -1,7 +1,8 @@
 import random
 from copy import deepcopy
 from datetime import datetime, time, timedelta
-from typing import Dict, List, Optional, Union
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Union
 
 from .long_context import (
     AUTOMOBILE_EXTENSION,
@@ -126,6 +127,23 @@ DEFAULT_STATE = {
     "random_seed": 1053520,
 }
 
+# Read-only reference data, shared by all the instances
+
+# Sector -> symbols of the stocks in the sector
+SECTOR_STOCKS: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+    {
+        "Technology": ("AAPL", "GOOG", "MSFT", "NVDA"),
+        "Automobile": ("TSLA", "F", "GM"),
+    }
+)
+# Same, with the long context extensions
+LONG_CONTEXT_SECTOR_STOCKS: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+    {
+        "Technology": SECTOR_STOCKS["Technology"] + tuple(TECHNOLOGY_EXTENSION),
+        "Automobile": SECTOR_STOCKS["Automobile"] + tuple(AUTOMOBILE_EXTENSION),
+    }
+)
+
 
 class TradingBot:
     """
@@ -663,15 +681,8 @@ class TradingBot:
         Returns:
             stock_list (List[str]): List of stock symbols in the specified sector.
         """
-        sector_map = {
-            "Technology": ["AAPL", "GOOG", "MSFT", "NVDA"],
-            "Automobile": ["TSLA", "F", "GM"],
-        }
-
-        if self.long_context:
-            sector_map["Technology"].extend(TECHNOLOGY_EXTENSION)
-            sector_map["Automobile"].extend(AUTOMOBILE_EXTENSION)
-        return {"stock_list": sector_map.get(sector, [])}
+        sector_map = LONG_CONTEXT_SECTOR_STOCKS if self.long_context else SECTOR_STOCKS
+        return {"stock_list": list(sector_map.get(sector, ()))}
 
     def filter_stocks_by_price(
         self, stocks: List[str], min_price: float, max_price: float
@@ -687,12 +698,11 @@ class TradingBot:
         Returns:
             filtered_stocks (List[str]): Filtered list of stock symbols within the price range.
         """
-        filtered_stocks = [
-            symbol
-            for symbol in stocks
-            if self.stocks.get(symbol, {}).get("price", 0) >= min_price
-            and self.stocks.get(symbol, {}).get("price", 0) <= max_price
-        ]
+        filtered_stocks = []
+        for symbol in stocks:
+            price = self.stocks.get(symbol, {}).get("price", 0)
+            if price >= min_price and price <= max_price:
+                filtered_stocks.append(symbol)
         return {"filtered_stocks": filtered_stocks}
 
     def add_to_watchlist(self, stock: str) -> Dict[str, List[str]]:
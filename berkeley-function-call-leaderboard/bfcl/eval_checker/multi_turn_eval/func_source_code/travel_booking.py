@@ -1,7 +1,8 @@
 import random
 from copy import deepcopy
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Union
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Union
 
 from .long_context import BOOKING_RECORD_EXTENSION, CREDIT_CARD_EXTENSION
 
@@ -19,6 +20,250 @@ DEFAULT_STATE = {
 }
 
 
+# Read-only reference data, shared by all the instances
+
+# (departure airport, arrival airport) -> base cost of the flight in USD
+FLIGHT_BASE_COSTS: Mapping[Tuple[str, str], int] = MappingProxyType({
+    ("SFO", "LAX"): 200,
+    ("SFO", "JFK"): 500,
+    ("SFO", "ORD"): 400,
+    ("SFO", "BOS"): 450,
+    ("SFO", "RMS"): 300,
+    ("SFO", "SBK"): 350,
+    ("SFO", "MPC"): 370,
+    ("SFO", "SVP"): 320,
+    ("SFO", "SHD"): 330,
+    ("SFO", "SSV"): 340,
+    ("SFO", "OKD"): 360,
+    ("SFO", "WLB"): 310,
+    ("SFO", "CRH"): 380,
+    ("SFO", "ATV"): 390,
+    ("SFO", "PHV"): 420,
+    ("SFO", "GFD"): 430,
+    ("SFO", "CIA"): 700,
+    ("LAX", "SFO"): 100,
+    ("LAX", "JFK"): 600,
+    ("LAX", "ORD"): 500,
+    ("LAX", "BOS"): 550,
+    ("LAX", "RMS"): 310,
+    ("LAX", "SBK"): 320,
+    ("LAX", "MPC"): 330,
+    ("LAX", "SVP"): 340,
+    ("LAX", "SHD"): 350,
+    ("LAX", "SSV"): 360,
+    ("LAX", "OKD"): 370,
+    ("LAX", "WLB"): 380,
+    ("LAX", "CRH"): 390,
+    ("LAX", "ATV"): 400,
+    ("LAX", "PHV"): 410,
+    ("LAX", "GFD"): 420,
+    ("JFK", "ORD"): 300,
+    ("JFK", "BOS"): 250,
+    ("JFK", "RMS"): 450,
+    ("JFK", "SBK"): 460,
+    ("JFK", "MPC"): 470,
+    ("JFK", "SVP"): 480,
+    ("JFK", "SHD"): 490,
+    ("JFK", "SSV"): 500,
+    ("JFK", "OKD"): 510,
+    ("JFK", "WLB"): 520,
+    ("JFK", "CRH"): 530,
+    ("JFK", "ATV"): 540,
+    ("JFK", "PHV"): 550,
+    ("JFK", "GFD"): 560,
+    ("JFK", "LAX"): 570,
+    ("JFK", "HND"): 800,
+    ("JFK", "PVG"): 950,
+    ("JFK", "PEK"): 1000,
+    ("ORD", "LAX"): 180,
+    ("ORD", "BOS"): 200,
+    ("ORD", "RMS"): 350,
+    ("ORD", "SBK"): 360,
+    ("ORD", "MPC"): 370,
+    ("ORD", "SVP"): 380,
+    ("ORD", "SHD"): 390,
+    ("ORD", "SSV"): 400,
+    ("ORD", "OKD"): 410,
+    ("ORD", "WLB"): 420,
+    ("ORD", "CRH"): 430,
+    ("ORD", "ATV"): 440,
+    ("ORD", "PHV"): 450,
+    ("ORD", "GFD"): 460,
+    ("BOS", "RMS"): 400,
+    ("BOS", "SBK"): 410,
+    ("BOS", "MPC"): 420,
+    ("BOS", "SVP"): 430,
+    ("BOS", "SHD"): 440,
+    ("BOS", "SSV"): 450,
+    ("BOS", "OKD"): 460,
+    ("BOS", "WLB"): 470,
+    ("BOS", "CRH"): 480,
+    ("BOS", "ATV"): 490,
+    ("BOS", "PHV"): 500,
+    ("BOS", "GFD"): 510,
+    ("RMS", "BOS"): 200,
+    ("RMS", "JFK"): 210,
+    ("RMS", "SBK"): 220,
+    ("RMS", "MPC"): 230,
+    ("RMS", "SVP"): 240,
+    ("RMS", "SHD"): 250,
+    ("RMS", "SSV"): 260,
+    ("RMS", "OKD"): 270,
+    ("RMS", "WLB"): 280,
+    ("RMS", "CRH"): 290,
+    ("RMS", "ATV"): 300,
+    ("RMS", "PHV"): 310,
+    ("RMS", "GFD"): 320,
+    ("RMS", "LAX"): 330,
+    ("SBK", "MPC"): 200,
+    ("SBK", "SVP"): 210,
+    ("SBK", "SHD"): 220,
+    ("SBK", "SSV"): 230,
+    ("SBK", "OKD"): 240,
+    ("SBK", "WLB"): 250,
+    ("SBK", "CRH"): 260,
+    ("SBK", "ATV"): 270,
+    ("SBK", "PHV"): 280,
+    ("SBK", "GFD"): 290,
+    ("MPC", "SVP"): 210,
+    ("MPC", "SHD"): 220,
+    ("MPC", "SSV"): 230,
+    ("MPC", "OKD"): 240,
+    ("MPC", "WLB"): 250,
+    ("MPC", "CRH"): 260,
+    ("MPC", "ATV"): 270,
+    ("MPC", "PHV"): 280,
+    ("MPC", "GFD"): 290,
+    ("SVP", "SHD"): 230,
+    ("SVP", "SSV"): 240,
+    ("SVP", "OKD"): 250,
+    ("SVP", "WLB"): 260,
+    ("SVP", "CRH"): 270,
+    ("SVP", "ATV"): 280,
+    ("SVP", "PHV"): 290,
+    ("SVP", "GFD"): 300,
+    ("SHD", "SSV"): 220,
+    ("SHD", "OKD"): 230,
+    ("SHD", "WLB"): 240,
+    ("SHD", "CRH"): 250,
+    ("SHD", "ATV"): 260,
+    ("SHD", "PHV"): 270,
+    ("SHD", "GFD"): 280,
+    ("SSV", "OKD"): 240,
+    ("SSV", "WLB"): 250,
+    ("SSV", "CRH"): 260,
+    ("SSV", "ATV"): 270,
+    ("SSV", "PHV"): 280,
+    ("SSV", "GFD"): 290,
+    ("OKD", "WLB"): 230,
+    ("OKD", "CRH"): 240,
+    ("OKD", "ATV"): 250,
+    ("OKD", "PHV"): 260,
+    ("OKD", "GFD"): 270,
+    ("WLB", "CRH"): 250,
+    ("WLB", "ATV"): 260,
+    ("WLB", "PHV"): 270,
+    ("WLB", "GFD"): 280,
+    ("CRH", "ATV"): 240,
+    ("CRH", "PHV"): 250,
+    ("CRH", "GFD"): 260,
+    ("CRH", "SFO"): 270,
+    ("CRH", "RMS"): 280,
+    ("ATV", "PHV"): 230,
+    ("ATV", "GFD"): 240,
+    ("PHV", "GFD"): 220,
+    ("LHR", "CDG"): 100,
+    ("OKD", "LAX"): 220
+})
+# The routes, as they are listed in the long context flight costs, with their base cost
+FLIGHT_ROUTE_DESCRIPTIONS: Tuple[Tuple[str, int], ...] = tuple(
+    ("From: " + travel_from + " To: " + travel_to + " Cost: ", base_cost)
+    for (travel_from, travel_to), base_cost in FLIGHT_BASE_COSTS.items()
+)
+
+AIRPORTS: Tuple[str, ...] = (
+    "RMS",
+    "SBK",
+    "MPC",
+    "SVP",
+    "SHD",
+    "CDG",
+    "LHR",
+    "SSV",
+    "OKD",
+    "WLB",
+    "PEK",
+    "HND",
+    "HKG",
+    "CIA",
+    "CRH",
+    "ATV",
+    "PHV",
+    "GFD",
+    "SFO",
+    "LAX",
+    "JFK",
+    "ORD",
+    "BOS",
+)
+
+# City -> nearest airport
+CITY_AIRPORTS: Mapping[str, str] = MappingProxyType({
+    "Rivermist": "RMS",
+    "Stonebrook": "SBK",
+    "Maplecrest": "MPC",
+    "Silverpine": "SVP",
+    "Shadowridge": "SHD",
+    "London": "LHR",
+    "Paris": "CDG",
+    "Sunset Valley": "SSV",
+    "Oakendale": "OKD",
+    "Willowbend": "WLB",
+    "Crescent Hollow": "CRH",
+    "Autumnville": "ATV",
+    "Pinehaven": "PHV",
+    "Greenfield": "GFD",
+    "San Francisco": "SFO",
+    "Los Angeles": "LAX",
+    "New York": "JFK",
+    "Chicago": "ORD",
+    "Boston": "BOS",
+    "Beijing": "PEK",
+    "Hong Kong": "HKG",
+    "Rome": "CIA",
+    "Tokyo": "HND",
+})
+
+# (currency, other currency) -> exchange rate
+EXCHANGE_RATES: Mapping[Tuple[str, str], float] = MappingProxyType({
+    ("USD", "RMB"): 7,
+    ("USD", "EUR"): 0.8,
+    ("USD", "JPY"): 110,
+    ("USD", "GBP"): 0.7,
+    ("USD", "CAD"): 1.3,
+    ("USD", "AUD"): 1.4,
+    ("USD", "INR"): 70,
+    ("USD", "RUB"): 60,
+    ("USD", "BRL"): 3.8,
+    ("USD", "MXN"): 20
+})
+
+
+def _build_exchange_rate_lookup() -> Mapping[Tuple[str, str], Tuple[float, bool]]:
+    """
+    Map each (base currency, target currency) pair, in both directions of every exchange rate, to the rate and whether the value is divided by it.
+    The first matching rate wins, in `EXCHANGE_RATES` order.
+    """
+    exchange_rate_lookup = {}
+    for (currency, other_currency), rate in EXCHANGE_RATES.items():
+        exchange_rate_lookup.setdefault((currency, other_currency), (rate, False))
+        exchange_rate_lookup.setdefault((other_currency, currency), (rate, True))
+    return MappingProxyType(exchange_rate_lookup)
+
+
+EXCHANGE_RATE_LOOKUP = _build_exchange_rate_lookup()
+
+
 class TravelAPI:
     # Adapted from source : https://developer.concur.com/api-reference/
     def __init__(self):
@@ -234,165 +479,13 @@ class TravelAPI:
         Returns:
             travel_cost_list (List[float]): The list of cost of the travel
         """
-        base_costs: Dict[Tuple[str, str], int] = {
-            ("SFO", "LAX"): 200,
-            ("SFO", "JFK"): 500,
-            ("SFO", "ORD"): 400,
-            ("SFO", "BOS"): 450,
-            ("SFO", "RMS"): 300,
-            ("SFO", "SBK"): 350,
-            ("SFO", "MPC"): 370,
-            ("SFO", "SVP"): 320,
-            ("SFO", "SHD"): 330,
-            ("SFO", "SSV"): 340,
-            ("SFO", "OKD"): 360,
-            ("SFO", "WLB"): 310,
-            ("SFO", "CRH"): 380,
-            ("SFO", "ATV"): 390,
-            ("SFO", "PHV"): 420,
-            ("SFO", "GFD"): 430,
-            ("SFO", "CIA"): 700,
-            ("LAX", "SFO"): 100,
-            ("LAX", "JFK"): 600,
-            ("LAX", "ORD"): 500,
-            ("LAX", "BOS"): 550,
-            ("LAX", "RMS"): 310,
-            ("LAX", "SBK"): 320,
-            ("LAX", "MPC"): 330,
-            ("LAX", "SVP"): 340,
-            ("LAX", "SHD"): 350,
-            ("LAX", "SSV"): 360,
-            ("LAX", "OKD"): 370,
-            ("LAX", "WLB"): 380,
-            ("LAX", "CRH"): 390,
-            ("LAX", "ATV"): 400,
-            ("LAX", "PHV"): 410,
-            ("LAX", "GFD"): 420,
-            ("JFK", "ORD"): 300,
-            ("JFK", "BOS"): 250,
-            ("JFK", "RMS"): 450,
-            ("JFK", "SBK"): 460,
-            ("JFK", "MPC"): 470,
-            ("JFK", "SVP"): 480,
-            ("JFK", "SHD"): 490,
-            ("JFK", "SSV"): 500,
-            ("JFK", "OKD"): 510,
-            ("JFK", "WLB"): 520,
-            ("JFK", "CRH"): 530,
-            ("JFK", "ATV"): 540,
-            ("JFK", "PHV"): 550,
-            ("JFK", "GFD"): 560,
-            ("JFK", "LAX"): 570,
-            ("JFK", "HND"): 800,
-            ("JFK", "PVG"): 950,
-            ("JFK", "PEK"): 1000,
-            ("ORD", "LAX"): 180,
-            ("ORD", "BOS"): 200,
-            ("ORD", "RMS"): 350,
-            ("ORD", "SBK"): 360,
-            ("ORD", "MPC"): 370,
-            ("ORD", "SVP"): 380,
-            ("ORD", "SHD"): 390,
-            ("ORD", "SSV"): 400,
-            ("ORD", "OKD"): 410,
-            ("ORD", "WLB"): 420,
-            ("ORD", "CRH"): 430,
-            ("ORD", "ATV"): 440,
-            ("ORD", "PHV"): 450,
-            ("ORD", "GFD"): 460,
-            ("BOS", "RMS"): 400,
-            ("BOS", "SBK"): 410,
-            ("BOS", "MPC"): 420,
-            ("BOS", "SVP"): 430,
-            ("BOS", "SHD"): 440,
-            ("BOS", "SSV"): 450,
-            ("BOS", "OKD"): 460,
-            ("BOS", "WLB"): 470,
-            ("BOS", "CRH"): 480,
-            ("BOS", "ATV"): 490,
-            ("BOS", "PHV"): 500,
-            ("BOS", "GFD"): 510,
-            ("RMS", "BOS"): 200,
-            ("RMS", "JFK"): 210,
-            ("RMS", "SBK"): 220,
-            ("RMS", "MPC"): 230,
-            ("RMS", "SVP"): 240,
-            ("RMS", "SHD"): 250,
-            ("RMS", "SSV"): 260,
-            ("RMS", "OKD"): 270,
-            ("RMS", "WLB"): 280,
-            ("RMS", "CRH"): 290,
-            ("RMS", "ATV"): 300,
-            ("RMS", "PHV"): 310,
-            ("RMS", "GFD"): 320,
-            ("RMS", "LAX"): 330,
-            ("SBK", "MPC"): 200,
-            ("SBK", "SVP"): 210,
-            ("SBK", "SHD"): 220,
-            ("SBK", "SSV"): 230,
-            ("SBK", "OKD"): 240,
-            ("SBK", "WLB"): 250,
-            ("SBK", "CRH"): 260,
-            ("SBK", "ATV"): 270,
-            ("SBK", "PHV"): 280,
-            ("SBK", "GFD"): 290,
-            ("MPC", "SVP"): 210,
-            ("MPC", "SHD"): 220,
-            ("MPC", "SSV"): 230,
-            ("MPC", "OKD"): 240,
-            ("MPC", "WLB"): 250,
-            ("MPC", "CRH"): 260,
-            ("MPC", "ATV"): 270,
-            ("MPC", "PHV"): 280,
-            ("MPC", "GFD"): 290,
-            ("SVP", "SHD"): 230,
-            ("SVP", "SSV"): 240,
-            ("SVP", "OKD"): 250,
-            ("SVP", "WLB"): 260,
-            ("SVP", "CRH"): 270,
-            ("SVP", "ATV"): 280,
-            ("SVP", "PHV"): 290,
-            ("SVP", "GFD"): 300,
-            ("SHD", "SSV"): 220,
-            ("SHD", "OKD"): 230,
-            ("SHD", "WLB"): 240,
-            ("SHD", "CRH"): 250,
-            ("SHD", "ATV"): 260,
-            ("SHD", "PHV"): 270,
-            ("SHD", "GFD"): 280,
-            ("SSV", "OKD"): 240,
-            ("SSV", "WLB"): 250,
-            ("SSV", "CRH"): 260,
-            ("SSV", "ATV"): 270,
-            ("SSV", "PHV"): 280,
-            ("SSV", "GFD"): 290,
-            ("OKD", "WLB"): 230,
-            ("OKD", "CRH"): 240,
-            ("OKD", "ATV"): 250,
-            ("OKD", "PHV"): 260,
-            ("OKD", "GFD"): 270,
-            ("WLB", "CRH"): 250,
-            ("WLB", "ATV"): 260,
-            ("WLB", "PHV"): 270,
-            ("WLB", "GFD"): 280,
-            ("CRH", "ATV"): 240,
-            ("CRH", "PHV"): 250,
-            ("CRH", "GFD"): 260,
-            ("CRH", "SFO"): 270,
-            ("CRH", "RMS"): 280,
-            ("ATV", "PHV"): 230,
-            ("ATV", "GFD"): 240,
-            ("PHV", "GFD"): 220,
-            ("LHR", "CDG"): 100,
-            ("OKD", "LAX"): 220
-        }
 
         # Ensure the travel_from and travel_to is a tuple in the correct order (from, to)
         travel_pair = (travel_from, travel_to)
 
         # Get the base cost, raise an error if the route is not available
-        if travel_pair in base_costs:
-            base_cost = base_costs[travel_pair]
+        if travel_pair in FLIGHT_BASE_COSTS:
+            base_cost = FLIGHT_BASE_COSTS[travel_pair]
         else:
             raise ValueError("No available route for the given airports.")
 
@@ -413,23 +506,18 @@ class TravelAPI:
         # Calculate the total cost
         travel_cost = float(base_cost * factor * travel_date_multiplier)
 
-        travel_cost_list = []
         if self.long_context:
-            for k, v in base_costs.items():
-                travel_cost = float(v * factor * travel_date_multiplier)
-                travel_cost_list.append(
-                    "From: "
-                    + k[0]
-                    + " To: "
-                    + k[1]
-                    + " Cost: "
-                    + str(travel_cost)
-                    + " USD. This is a domestica flight with a travel class of "
-                    + travel_class
-                    + " and a travel date of "
-                    + travel_date
-                    + "."
-                )
+            route_suffix = (
+                " USD. This is a domestica flight with a travel class of "
+                + travel_class
+                + " and a travel date of "
+                + travel_date
+                + "."
+            )
+            travel_cost_list = [
+                route_prefix + str(float(route_base_cost * factor * travel_date_multiplier)) + route_suffix
+                for route_prefix, route_base_cost in FLIGHT_ROUTE_DESCRIPTIONS
+            ]
             return {"travel_cost_list": travel_cost_list}
         return {"travel_cost_list": [travel_cost]}
 
@@ -584,31 +672,7 @@ class TravelAPI:
         Returns:
             airports (List[str]): A list of all available airports
         """
-        return [
-            "RMS",
-            "SBK",
-            "MPC",
-            "SVP",
-            "SHD",
-            "CDG",
-            "LHR",
-            "SSV",
-            "OKD",
-            "WLB",
-            "PEK",
-            "HND",
-            "HKG",
-            "CIA",
-            "CRH",
-            "ATV",
-            "PHV",
-            "GFD",
-            "SFO",
-            "LAX",
-            "JFK",
-            "ORD",
-            "BOS",
-        ]
+        return list(AIRPORTS)
 
     def cancel_booking(
         self, access_token: str, booking_id: str
@@ -649,23 +713,14 @@ class TravelAPI:
             exchanged_value (float): The value after the exchange
 
         """
-        exchange_rates = {
-            ("USD", "RMB"): 7,
-            ("USD", "EUR"): 0.8,
-            ("USD", "JPY"): 110,
-            ("USD", "GBP"): 0.7,
-            ("USD", "CAD"): 1.3,
-            ("USD", "AUD"): 1.4,
-            ("USD", "INR"): 70,
-            ("USD", "RUB"): 60,
-            ("USD", "BRL"): 3.8,
-            ("USD", "MXN"): 20
-        }
-        for key, val in exchange_rates.items():
-            if base_currency == key[0] and target_currency == key[1]:
-                return {"exchanged_value": value * val}
-            elif base_currency == key[1] and target_currency == key[0]:
-                return {"exchanged_value": round(value / val, 2)}
+        # Other types never match a currency (and may not be hashable)
+        if isinstance(base_currency, str) and isinstance(target_currency, str):
+            exchange_rate = EXCHANGE_RATE_LOOKUP.get((base_currency, target_currency))
+            if exchange_rate is not None:
+                rate, is_inverse = exchange_rate
+                if is_inverse:
+                    return {"exchanged_value": round(value / rate, 2)}
+                return {"exchanged_value": value * rate}
         raise ValueError("No available exchange rate for the given currencies.")
 
     def verify_traveler_information(
@@ -752,33 +807,7 @@ class TravelAPI:
         Returns:
             nearest_airport (str): The nearest airport to the given location
         """
-        airport_map = {
-            "Rivermist": "RMS",
-            "Stonebrook": "SBK",
-            "Maplecrest": "MPC",
-            "Silverpine": "SVP",
-            "Shadowridge": "SHD",
-            "London": "LHR",
-            "Paris": "CDG",
-            "Sunset Valley": "SSV",
-            "Oakendale": "OKD",
-            "Willowbend": "WLB",
-            "Crescent Hollow": "CRH",
-            "Autumnville": "ATV",
-            "Pinehaven": "PHV",
-            "Greenfield": "GFD",
-            "San Francisco": "SFO",
-            "Los Angeles": "LAX",
-            "New York": "JFK",
-            "Chicago": "ORD",
-            "Boston": "BOS",
-            "Beijing": "PEK",
-            "Hong Kong": "HKG",
-            "Rome": "CIA",
-            "Tokyo": "HND",
-        }
-
-        return {"nearest_airport": airport_map.get(location, "Unknown")}
+        return {"nearest_airport": CITY_AIRPORTS.get(location, "Unknown")}
 
     def purchase_insurance(
         self,
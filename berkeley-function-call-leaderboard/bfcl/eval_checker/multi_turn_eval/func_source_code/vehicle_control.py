@@ -1,6 +1,7 @@
 import random
 from copy import deepcopy
-from typing import Dict, List, Union
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Union
 
 from .long_context import (
     CAR_STATUS_METADATA_EXTENSION,
@@ -46,6 +47,46 @@ DEFAULT_STATE = {
     "rearRightTirePressure": 30.0,
 }
 
+# Read-only reference data, shared by all the instances
+
+# (zipcode, zipcode) -> distance between the two cities in km; the distances are symmetric
+_CITY_DISTANCES = {
+    ("83214", "74532"): 750.0,
+    ("56108", "62947"): 320.0,
+    ("71354", "83462"): 450.0,
+    ("47329", "52013"): 290.0,
+    ("69238", "51479"): 630.0,
+    ("94016", "83214"): 980.0,
+    ("94016", "94704"): 600.0,
+    ("94704", "08540"): 2550.0,
+    ("94016", "08540"): 1950.0,
+    ("62947", "47329"): 1053.0,
+    ("94016", "62947"): 780.0,
+    ("74532", "94016"): 880.0,
+}
+CITY_DISTANCES: Mapping[Tuple[str, str], float] = MappingProxyType(
+    {
+        **_CITY_DISTANCES,
+        **{(zipcode_b, zipcode_a): distance for (zipcode_a, zipcode_b), distance in _CITY_DISTANCES.items()},
+    }
+)
+# City -> zipcode
+CITY_ZIPCODES: Mapping[str, str] = MappingProxyType(
+    {
+        "Rivermist": "83214",
+        "Stonebrook": "74532",
+        "Maplecrest": "56108",
+        "Silverpine": "62947",
+        "Shadowridge": "71354",
+        "Sunset Valley": "83462",
+        "Oakendale": "47329",
+        "Willowbend": "52013",
+        "Crescent Hollow": "69238",
+        "Autumnville": "51479",
+        "San Francisco": "94016",
+    }
+)
+
 
 class VehicleControlAPI:
 
@@ -557,54 +598,12 @@ class VehicleControlAPI:
             distance (float): The distance between the two cities in km.
             intermediaryCities (List[str]): [Optional] The list of intermediary cities between the two cities.
         """
-        if (cityA == "83214" and cityB == "74532") or (
-            cityA == "74532" and cityB == "83214"
-        ):
-            distance = {"distance": 750.0}
-        elif (cityA == "56108" and cityB == "62947") or (
-            cityA == "62947" and cityB == "56108"
-        ):
-            distance = {"distance": 320.0}
-        elif (cityA == "71354" and cityB == "83462") or (
-            cityA == "83462" and cityB == "71354"
-        ):
-            distance = {"distance": 450.0}
-        elif (cityA == "47329" and cityB == "52013") or (
-            cityA == "52013" and cityB == "47329"
-        ):
-            distance = {"distance": 290.0}
-        elif (cityA == "69238" and cityB == "51479") or (
-            cityA == "51479" and cityB == "69238"
-        ):
-            distance = {"distance": 630.0}
-        elif (cityA == "94016" and cityB == "83214") or (
-            cityA == "83214" and cityB == "94016"
-        ):
-            distance = {"distance": 980.0}
-        elif (cityA == "94016" and cityB == "94704") or (
-            cityA == "94704" and cityB == "94016"
-        ):
-            distance = {"distance": 600.0}
-        elif (cityA == "94704" and cityB == "08540") or (
-            cityA == "08540" and cityB == "94704"
-        ):
-            distance = {"distance": 2550.0}
-        elif (cityA == "94016" and cityB == "08540") or (
-            cityA == "08540" and cityB == "94016"
-        ):
-            distance = {"distance": 1950.0}
-        elif (cityA == "62947" and cityB == "47329") or (
-            cityA == "47329" and cityB == "62947"
-        ):
-            distance = {"distance": 1053.0}
-        elif (cityA == "94016" and cityB == "62947") or (
-            cityA == "62947" and cityB == "94016"
-        ):
-            distance = {"distance": 780.0}
-        elif (cityA == "74532" and cityB == "94016") or (
-            cityA == "94016" and cityB == "74532"
-        ):
-            distance = {"distance": 880.0}
+        distance_km = None
+        # Other types never match a zipcode (and may not be hashable)
+        if isinstance(cityA, str) and isinstance(cityB, str):
+            distance_km = CITY_DISTANCES.get((cityA, cityB))
+        if distance_km is not None:
+            distance = {"distance": distance_km}
         else:
             distance = {"error": "distance not found in database."}
 
@@ -620,30 +619,10 @@ class VehicleControlAPI:
         Returns:
             zipcode (str): The zipcode of the city.
         """
-        if city == "Rivermist":
-            return {"zipcode": "83214"}
-        elif city == "Stonebrook":
-            return {"zipcode": "74532"}
-        elif city == "Maplecrest":
-            return {"zipcode": "56108"}
-        elif city == "Silverpine":
-            return {"zipcode": "62947"}
-        elif city == "Shadowridge":
-            return {"zipcode": "71354"}
-        elif city == "Sunset Valley":
-            return {"zipcode": "83462"}
-        elif city == "Oakendale":
-            return {"zipcode": "47329"}
-        elif city == "Willowbend":
-            return {"zipcode": "52013"}
-        elif city == "Crescent Hollow":
-            return {"zipcode": "69238"}
-        elif city == "Autumnville":
-            return {"zipcode": "51479"}
-        elif city == "San Francisco":
-            return {"zipcode": "94016"}
-        else:
-            return {"zipcode": "00000"}
+        # Other types never match a city (and may not be hashable)
+        if isinstance(city, str):
+            return {"zipcode": CITY_ZIPCODES.get(city, "00000")}
+        return {"zipcode": "00000"}
 
     def set_navigation(self, destination: str) -> Dict[str, str]:
         """
@@ -2,6 +2,7 @@ from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
     execute_multi_turn_func_call,
     is_empty_execute_response,
 )
+from bfcl.profiling import profile_span
 
 #### Main functions ####
 
@@ -104,7 +105,8 @@ def multi_turn_checker(
         assert set(model_instances.keys()) == set(ground_truth_instances.keys())
 
         # Check the state of the instances
-        state_check_result = state_checker(model_instances, ground_truth_instances)
+        with profile_span("state_checker"):
+            state_check_result = state_checker(model_instances, ground_truth_instances)
         if not state_check_result["valid"]:
             state_check_result["execution_result"] = execution_results
             return state_check_result
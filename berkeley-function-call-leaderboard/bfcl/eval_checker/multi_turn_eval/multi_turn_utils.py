@@ -1,8 +1,10 @@
+import copy
 import importlib
 import inspect
 import json
 import re
-import copy
+
+from bfcl.profiling import profile_span
 
 CLASS_FILE_PATH_MAPPING = {
     "GorillaFileSystem": "bfcl.eval_checker.multi_turn_eval.func_source_code.gorilla_file_system",
@@ -20,6 +22,25 @@ STATELESS_CLASSES = [
     "MathAPI",
 ]
 
+# Class -> names of its public methods, see `_get_public_method_names`
+_public_method_names = {}
+
+# When set, with `set_simulator_executor`, the function calls are run by this executor (e.g. in isolated worker processes) instead of in this process
+_simulator_executor = None
+
+
+def set_simulator_executor(executor) -> None:
+    global _simulator_executor
+    _simulator_executor = executor
+
+
+def release_multi_turn_instances(model_name: str, test_entry_id: str, is_evaL_run: bool = False) -> None:
+    """
+    Let the simulator executor, if any, forget the instances of a test entry once they are no longer used.
+    """
+    if _simulator_executor is not None:
+        _simulator_executor.release(model_name, test_entry_id, is_evaL_run)
+
 
 def execute_multi_turn_func_call(
     func_call_list: list[str],  # a list of strings of func calls
@@ -33,6 +54,47 @@ def execute_multi_turn_func_call(
     """
     TODO: Add docstring
     """
+    with profile_span("execute_multi_turn_func_call"):
+        if _simulator_executor is not None:
+            return _simulator_executor.execute(
+                func_call_list,
+                initial_config,
+                involved_classes,
+                model_name,
+                test_entry_id,
+                long_context=long_context,
+                is_evaL_run=is_evaL_run,
+            )
+        return execute_multi_turn_func_call_in_process(
+            func_call_list,
+            initial_config,
+            involved_classes,
+            model_name,
+            test_entry_id,
+            long_context=long_context,
+            is_evaL_run=is_evaL_run,
+        )
+
+
+def create_instance(class_, class_initial_config: dict, long_context: bool = False):
+    """
+    Create an instance of the simulator class `class_` with the given scenario loaded.
+    """
+    class_instance = class_()
+    # Deep copy the initial configuration to avoid mutation issues
+    class_instance._load_scenario(copy.deepcopy(class_initial_config), long_context=long_context)
+    return class_instance
+
+
+def execute_multi_turn_func_call_in_process(
+    func_call_list: list[str],
+    initial_config: dict,
+    involved_classes: list,
+    model_name: str,
+    test_entry_id: str,
+    long_context: bool = False,
+    is_evaL_run: bool = False,
+) -> tuple[list[str], dict]:
     if is_evaL_run:
         model_name += "_eval"
 
@@ -47,13 +109,11 @@ def execute_multi_turn_func_call(
         if instance_name not in globals():
             module = importlib.import_module(module_name)
             class_ = getattr(module, class_name)
-            class_instance = class_()
             if class_name not in STATELESS_CLASSES:
                 class_initial_config = initial_config.get(class_name, {})
-                # Deep copy the initial configuration to avoid mutation issues
-                class_instance._load_scenario(
-                    copy.deepcopy(class_initial_config), long_context=long_context
-                )
+                class_instance = create_instance(class_, class_initial_config, long_context=long_context)
+            else:
+                class_instance = class_()
             globals()[instance_name] = class_instance
         # This happens in subsequent turns
         else:
@@ -62,12 +122,7 @@ def execute_multi_turn_func_call(
         involved_instances[class_name] = class_instance
 
         # Retrieve all method names and map them to the instance
-        for method_name, method in inspect.getmembers(
-            class_instance, predicate=inspect.ismethod
-        ):
-            # Skip private methods
-            if method_name.startswith("_"):
-                continue
+        for method_name in _get_public_method_names(class_instance):
             class_method_name_mapping[method_name] = instance_name
 
     execution_results = []
@@ -110,6 +165,21 @@ def execute_multi_turn_func_call(
     return execution_results, involved_instances
 
 
+def _get_public_method_names(class_instance) -> list[str]:
+    """
+    The names of the public methods of an instance. They only depend on its class, so they are only looked up once per class.
+    """
+    class_ = type(class_instance)
+    if class_ not in _public_method_names:
+        _public_method_names[class_] = [
+            method_name
+            for method_name, _ in inspect.getmembers(class_instance, predicate=inspect.ismethod)
+            # Skip private methods
+            if not method_name.startswith("_")
+        ]
+    return _public_method_names[class_]
+
+
 def is_empty_execute_response(input_list: list):
     if len(input_list) == 0:
         return True
@@ -0,0 +1,374 @@
+import atexit
+import math
+import multiprocessing
+import signal
+import threading
+import zlib
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+from bfcl.eval_checker.constant import (
+    SIMULATOR_CALL_MEMORY_LIMIT,
+    SIMULATOR_CALL_TIME_LIMIT,
+    SIMULATOR_KILL_GRACE_PERIOD,
+)
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where only the wall time limit is enforced
+    resource = None
+
+# Number of instance sets whose fetched copies are kept by each worker
+FETCHED_INSTANCES_CACHE_SIZE = 16
+
+
+class SimulatorLimitExceeded(Exception):
+    pass
+
+
+class SimulatorWorkerError(RuntimeError):
+    """
+    The worker process did not respond in time, or exited, while handling a request; the worker has been restarted.
+    """
+
+    pass
+
+
+class IsolatedSimulatorExecutor:
+    """
+    Execute the multi-turn function calls in a pool of warm worker processes, with per-call limits on wall time, CPU time and memory.
+
+    All the instances of a test entry (model and ground truth) live in the same worker, between steps and turns, so only the function call strings and their results cross the process boundary.
+    The state of an instance is only transferred when it is read, through the `involved_instances` mapping returned by `execute`.
+    A call that exceeds a limit returns an execution error instead of stalling the run.
+    A worker stuck in a call (e.g. in a long computation that can't be interrupted) is killed and restarted; the instances it held are then rebuilt by replaying their previous calls.
+    Reading the instances of a worker that fails while they are fetched raises a `SimulatorWorkerError`.
+    """
+
+    def __init__(
+        self,
+        num_processes: int,
+        time_limit: float = SIMULATOR_CALL_TIME_LIMIT,
+        cpu_time_limit: float = None,
+        memory_limit: int = SIMULATOR_CALL_MEMORY_LIMIT,
+    ) -> None:
+        """
+        Args:
+            num_processes (int): The number of worker processes.
+            time_limit (float): The wall time limit of each function call, in seconds.
+            cpu_time_limit (float, optional): The CPU time limit of each function call, in seconds. Defaults to `time_limit`.
+            memory_limit (int): The memory (address space) each function call may allocate, in MiB.
+        """
+        limits = (time_limit, cpu_time_limit if cpu_time_limit is not None else time_limit, memory_limit)
+        self.workers = [_SimulatorWorker(limits) for _ in range(num_processes)]
+        atexit.register(self.close)
+
+    def execute(
+        self,
+        func_call_list: list[str],
+        initial_config: dict,
+        involved_classes: list,
+        model_name: str,
+        test_entry_id: str,
+        long_context: bool = False,
+        is_evaL_run: bool = False,
+    ) -> tuple[list[str], Mapping]:
+        """
+        Same as `execute_multi_turn_func_call`, except that the returned instances are copies, fetched from the worker when accessed.
+        """
+        call_args = (initial_config, involved_classes, model_name, test_entry_id, long_context, is_evaL_run)
+        worker = self._get_worker(test_entry_id)
+        execution_results = worker.execute(call_args, func_call_list)
+        return execution_results, WorkerInstances(worker, call_args)
+
+    def release(self, model_name: str, test_entry_id: str, is_evaL_run: bool = False) -> None:
+        """
+        Forget the calls recorded to rebuild the instances of a test entry, once they are no longer used.
+        """
+        self._get_worker(test_entry_id).release((model_name, test_entry_id, is_evaL_run))
+
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.close()
+
+    def _get_worker(self, test_entry_id: str) -> "_SimulatorWorker":
+        return self.workers[zlib.crc32(str(test_entry_id).encode("utf-8")) % len(self.workers)]
+
+
+class WorkerInstances(Mapping):
+    """
+    The instances involved in a function call execution, by class name, living in a worker process.
+    The instances are copies of their current state, fetched all at once on first access, and again after any further call on them.
+    """
+
+    def __init__(self, worker: "_SimulatorWorker", call_args: tuple) -> None:
+        self._worker = worker
+        self._call_args = call_args
+        self._class_names = list(dict.fromkeys(call_args[1]))
+
+    def __getitem__(self, class_name):
+        if class_name not in self._class_names:
+            raise KeyError(class_name)
+        return self._worker.fetch_instances(self._call_args)[class_name]
+
+    def __iter__(self):
+        return iter(self._class_names)
+
+    def __len__(self) -> int:
+        return len(self._class_names)
+
+
+class _SimulatorWorker:
+    def __init__(self, limits: tuple) -> None:
+        self.time_limit = limits[0]
+        self.limits = limits
+        self.lock = threading.Lock()
+        # (model name, test entry id, is eval run) -> the calls executed on those instances, in order, to rebuild them after a restart
+        self.history = {}
+        # The keys of `history` whose instances exist in the current worker process
+        self.live_keys = set()
+        # key -> the last fetched copies of the instances, until the next call on them
+        self.fetched_instances = {}
+        self.process = None
+        self.conn = None
+
+    def execute(self, call_args: tuple, func_call_list: list[str]) -> list[str]:
+        key = _get_instance_key(call_args)
+        with self.lock:
+            if func_call_list:
+                self.fetched_instances.pop(key, None)
+            self._ensure_started()
+            self._restore(key)
+            if not func_call_list:
+                # Only create the instances
+                try:
+                    self._request(("execute", call_args, []), self.time_limit + SIMULATOR_KILL_GRACE_PERIOD)
+                except SimulatorWorkerError:
+                    # The instances are created again by the next call on them
+                    return []
+                self.live_keys.add(key)
+                return []
+
+            execution_results = []
+            remaining_calls = list(func_call_list)
+            self.conn.send(("execute", call_args, remaining_calls))
+            while remaining_calls:
+                func_call = remaining_calls.pop(0)
+                error_message = None
+                if not self.conn.poll(self.time_limit + SIMULATOR_KILL_GRACE_PERIOD):
+                    error_message = _time_limit_message(self.time_limit)
+                else:
+                    try:
+                        result, within_limits = self.conn.recv()
+                    except (EOFError, OSError):
+                        error_message = f"The simulator process exited unexpectedly (exit code {self._get_exit_code()})."
+
+                if error_message is not None:
+                    execution_results.append(f"Error during execution: {error_message}")
+                    # The state of every instance in the worker is lost with it; they are rebuilt when used again
+                    self._restart()
+                    self._restore(key)
+                    if remaining_calls:
+                        self.conn.send(("execute", call_args, remaining_calls))
+                    continue
+
+                execution_results.append(result)
+                if within_limits:
+                    self.history.setdefault(key, []).append((call_args, func_call))
+            self.live_keys.add(key)
+            # The reply to the last call is the end of the request
+            return execution_results
+
+    def fetch_instances(self, call_args: tuple) -> dict:
+        key = _get_instance_key(call_args)
+        with self.lock:
+            if key not in self.fetched_instances:
+                self._ensure_started()
+                self._restore(key)
+                if len(self.fetched_instances) >= FETCHED_INSTANCES_CACHE_SIZE:
+                    # The entries are evaluated one after the other, so the oldest fetches are not read again
+                    self.fetched_instances.pop(next(iter(self.fetched_instances)))
+                self.fetched_instances[key] = self._request(
+                    ("fetch", call_args), self.time_limit + SIMULATOR_KILL_GRACE_PERIOD
+                )
+                self.live_keys.add(key)
+            return self.fetched_instances[key]
+
+    def release(self, key: tuple) -> None:
+        with self.lock:
+            self.history.pop(key, None)
+            self.fetched_instances.pop(key, None)
+            self.live_keys.discard(key)
+
+    def close(self) -> None:
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+            self.process = None
+
+    def _ensure_started(self) -> None:
+        if self.process is None:
+            # Spawned rather than forked, as the parent process may be running other threads
+            context = multiprocessing.get_context("spawn")
+            conn, child_conn = context.Pipe()
+            process = context.Process(target=_worker_main, args=(child_conn, self.limits), daemon=True)
+            process.start()
+            child_conn.close()
+            self.process, self.conn = process, conn
+            self.live_keys = set()
+
+    def _restart(self) -> None:
+        self.close()
+        self._ensure_started()
+
+    def _restore(self, key: tuple) -> None:
+        """
+        Rebuild the instances of `key` in the current worker process, if they were lost with a previous one.
+        """
+        if key in self.live_keys or key not in self.history:
+            return
+        calls = self.history[key]
+        try:
+            self._request(("replay", calls), len(calls) * self.time_limit + SIMULATOR_KILL_GRACE_PERIOD)
+        except SimulatorWorkerError:
+            # Should the replay itself get stuck, the instances start over from their initial state
+            self.history.pop(key)
+            self._restart()
+        self.live_keys.add(key)
+
+    def _request(self, message: tuple, timeout: float):
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            self._restart()
+            raise SimulatorWorkerError("The simulator process did not respond in time.")
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            exit_code = self._get_exit_code()
+            self._restart()
+            raise SimulatorWorkerError(f"The simulator process exited unexpectedly (exit code {exit_code}).")
+
+    def _get_exit_code(self):
+        self.process.join(timeout=1)
+        return self.process.exitcode
+
+
+def _get_instance_key(call_args: tuple) -> tuple:
+    _, _, model_name, test_entry_id, _, is_evaL_run = call_args
+    return model_name, test_entry_id, is_evaL_run
+
+
+def _time_limit_message(time_limit: float) -> str:
+    return f"Function call exceeded the time limit of {time_limit} seconds."
+
+
+#### Worker process ####
+
+
+def _worker_main(conn, limits: tuple) -> None:
+    from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
+        execute_multi_turn_func_call_in_process,
+    )
+
+    time_limit, cpu_time_limit, memory_limit = limits
+    # Interruptions are handled by the parent process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _get_limit_handler(_time_limit_message(time_limit)))
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(
+            signal.SIGXCPU,
+            _get_limit_handler(f"Function call exceeded the CPU time limit of {cpu_time_limit} seconds."),
+        )
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+
+        if message[0] == "execute":
+            _, call_args, func_call_list = message
+            if not func_call_list:
+                execute_multi_turn_func_call_in_process([], *call_args)
+                conn.send(None)
+                continue
+            # Each call is run on its own, so that the limits apply to every call separately
+            for func_call in func_call_list:
+                with _call_limits(limits) as limit_state:
+                    try:
+                        result = execute_multi_turn_func_call_in_process([func_call], *call_args)[0][0]
+                    except Exception as e:
+                        # e.g. a limit exceeded while creating the instances
+                        result = f"Error during execution: {str(e)}"
+                conn.send((result, not limit_state["exceeded"]))
+
+        elif message[0] == "replay":
+            for call_args, func_call in message[1]:
+                with _call_limits(limits):
+                    try:
+                        execute_multi_turn_func_call_in_process([func_call], *call_args)
+                    except Exception:
+                        pass
+            conn.send(None)
+
+        elif message[0] == "fetch":
+            _, involved_instances = execute_multi_turn_func_call_in_process([], *message[1])
+            conn.send(involved_instances)
+
+
+# Whether a limit was exceeded during the current call, set by the signal handlers
+_limit_state = {"exceeded": False}
+
+
+def _get_limit_handler(error_message: str):
+    def handler(signum, frame):
+        _limit_state["exceeded"] = True
+        raise SimulatorLimitExceeded(error_message)
+
+    return handler
+
+
+@contextmanager
+def _call_limits(limits: tuple):
+    time_limit, cpu_time_limit, memory_limit = limits
+    _limit_state["exceeded"] = False
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _set_soft_limit(resource.RLIMIT_CPU, math.ceil(usage.ru_utime + usage.ru_stime + cpu_time_limit))
+        address_space = _get_address_space()
+        if address_space is not None:
+            _set_soft_limit(resource.RLIMIT_AS, address_space + memory_limit * 1024 * 1024)
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        yield _limit_state
+    finally:
+        if hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if resource is not None:
+            _set_soft_limit(resource.RLIMIT_CPU, None)
+            _set_soft_limit(resource.RLIMIT_AS, None)
+
+
+def _set_soft_limit(limit: int, value) -> None:
+    """
+    Set the soft limit to `value`, or lift it (up to the hard limit) if `value` is None.
+    """
+    _, hard_limit = resource.getrlimit(limit)
+    if value is None or (hard_limit != resource.RLIM_INFINITY and value > hard_limit):
+        value = hard_limit
+    resource.setrlimit(limit, (value, hard_limit))
+
+
+def _get_address_space():
+    """
+    The current size of the address space of the process in bytes, or None where it can't be read.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,137 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from bfcl.constant import VERSION_PREFIX
+from bfcl.eval_checker.constant import VERDICT_CACHE_DIR_NAME
+from bfcl.eval_checker.dataset_index import CategoryIndex
+from bfcl.eval_checker.score_writer import ScoreFileWriter, load_score_file
+
+
+@lru_cache(maxsize=1)
+def get_checker_fingerprint() -> str:
+    """
+    Digest of the source code of the `bfcl` package.
+    Any change to the checkers, the decoders or the simulated APIs invalidates the previously recorded verdicts.
+    """
+    package_root = Path(__file__).resolve().parents[1]
+    digest = hashlib.sha256()
+    for source_file in sorted(package_root.rglob("*.py")):
+        digest.update(str(source_file.relative_to(package_root)).encode("utf-8"))
+        digest.update(source_file.read_bytes())
+    return digest.hexdigest()
+
+
+class ScoreVerdictCache:
+    """
+    The verdicts of the previous evaluation of one model on one test category, used to only re-check the entries that changed since then.
+
+    For every entry, the cache records a digest of the model result entry, the dataset entry and the checker source code, along with whether the entry was valid.
+    An entry is re-checked when its digest changed, or when its id is not unique. The failure records of the other entries are taken from the existing score file.
+    """
+
+    def __init__(self, score_dir: Path, model_name: str, test_category: str, dataset_index: CategoryIndex) -> None:
+        self.score_file_path = score_dir / model_name / f"{VERSION_PREFIX}_{test_category}_score.json"
+        self.verdict_file_path = (
+            score_dir / model_name / VERDICT_CACHE_DIR_NAME / f"{VERSION_PREFIX}_{test_category}_verdict.json"
+        )
+        self.dataset_index = dataset_index
+        # entry id -> {"digest": str, "valid": bool}
+        self.previous_verdicts = {}
+        # entry id -> failure records of that entry in the existing score file
+        self.previous_records = {}
+        self.digests = []
+        # Failure records of the re-checked entries
+        self.checked_records = []
+
+        if self.score_file_path.exists() and self.verdict_file_path.exists():
+            with open(self.verdict_file_path, "r") as f:
+                self.previous_verdicts = json.load(f)
+            for record in load_score_file(self.score_file_path)[1:]:
+                self.previous_records.setdefault(record["id"], []).append(record)
+
+    def select_entries_to_check(self, model_result: list[dict], entry_positions: list[int]) -> list[int]:
+        """
+        Return the indices of the model result entries that need to be re-checked.
+        """
+        id_count = {}
+        for entry in model_result:
+            id_count[entry["id"]] = id_count.get(entry["id"], 0) + 1
+
+        self.digests = []
+        indices_to_check = []
+        for i, entry in enumerate(model_result):
+            digest = hashlib.sha256(
+                json.dumps(
+                    [
+                        get_checker_fingerprint(),
+                        self.dataset_index.entry_digest(entry_positions[i]),
+                        entry,
+                    ],
+                    sort_keys=True,
+                    default=str,
+                ).encode("utf-8")
+            ).hexdigest()
+            self.digests.append(digest)
+
+            test_entry_id = entry["id"]
+            previous_verdict = self.previous_verdicts.get(test_entry_id)
+            if (
+                id_count[test_entry_id] > 1
+                or len(self.dataset_index.positions[test_entry_id]) > 1
+                or previous_verdict is None
+                or previous_verdict["digest"] != digest
+                or (not previous_verdict["valid"] and test_entry_id not in self.previous_records)
+            ):
+                indices_to_check.append(i)
+
+        return indices_to_check
+
+    def add(self, record: dict) -> None:
+        """
+        Collect a failure record of a re-checked entry; the category runners write to the cache as they would to a `ScoreFileWriter`.
+        """
+        self.checked_records.append(record)
+
+    def merge(
+        self,
+        model_result: list[dict],
+        checked_indices: list[int],
+        checked_correct_count: int,
+        score_writer: ScoreFileWriter,
+    ) -> int:
+        """
+        Write the failure records of the whole model result to `score_writer`, in model result order, combining the re-checked entries with the previous verdicts.
+        Return the correct count of the whole model result, and record the verdicts of all entries.
+        """
+        checked_records_by_id = {}
+        for record in self.checked_records:
+            checked_records_by_id.setdefault(record["id"], []).append(record)
+
+        checked_indices = set(checked_indices)
+        correct_count = checked_correct_count
+        verdicts = {}
+        for i, entry in enumerate(model_result):
+            test_entry_id = entry["id"]
+            if i in checked_indices:
+                valid = test_entry_id not in checked_records_by_id
+                # Entries sharing an id are adjacent, so all of their records are written at the first one
+                for record in checked_records_by_id.pop(test_entry_id, []):
+                    score_writer.add(record)
+            else:
+                valid = self.previous_verdicts[test_entry_id]["valid"]
+                if valid:
+                    correct_count += 1
+                else:
+                    for record in self.previous_records[test_entry_id]:
+                        score_writer.add(record)
+            verdicts[test_entry_id] = {"digest": self.digests[i], "valid": valid}
+
+        self.previous_verdicts = verdicts
+        return correct_count
+
+    def save(self) -> None:
+        self.verdict_file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.verdict_file_path, "w") as f:
+            json.dump(self.previous_verdicts, f)
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from bfcl.constant import VERSION_PREFIX
+from bfcl.eval_checker.constant import (
+    BULKY_SCORE_FIELDS,
+    SCORE_BLOB_DIR_NAME,
+    SCORE_BLOB_MIN_SIZE,
+)
+from bfcl.profiling import profile_span
+from bfcl.utils import json_dumps_serializable, load_file
+
+BLOB_REFERENCE_KEY = "$blob"
+
+
+class ScoreFileWriter:
+    """
+    Write the score file of one model on one test category, one failure record at a time.
+
+    The records are streamed to a temporary file as they are produced, and the score file is assembled on `close`, once the accuracy header is known.
+    Used as a context manager, the writer is aborted if the block exits without closing it: the temporary files are removed and the previous score file is left untouched.
+    In compact mode, the bulky fields of the records (function docs, inference logs, raw model results and instance states) are content-addressed:
+    each distinct (large enough) value is stored once in a blob file, and the records only keep a `{"$blob": digest}` reference to it.
+    """
+
+    def __init__(self, score_dir: Path, model_name: str, test_category: str, compact: bool = False) -> None:
+        self.model_score_dir = score_dir / model_name
+        self.model_score_dir.mkdir(parents=True, exist_ok=True)
+        self.score_file_path = self.model_score_dir / f"{VERSION_PREFIX}_{test_category}_score.json"
+        self.blob_file_path = get_blob_file_path(score_dir, model_name, test_category)
+        self.compact = compact
+
+        self._record_file = open(f"{self.score_file_path}.tmp", "w")
+        self._blob_file = None
+        self._blob_digests = set()
+        if self.compact:
+            self.blob_file_path.parent.mkdir(parents=True, exist_ok=True)
+            self._blob_file = open(f"{self.blob_file_path}.tmp", "w")
+        self._closed = False
+
+    def __enter__(self) -> "ScoreFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if not self._closed:
+            self.abort()
+
+    def add(self, record: dict) -> None:
+        with profile_span("write_score_file"):
+            if self.compact:
+                record = self._replace_bulky_fields(record)
+            self._record_file.write("\n" + json_dumps_serializable(record))
+
+    def close(self, correct_count: int, total_count: int) -> float:
+        accuracy = correct_count / total_count
+        header = {
+            "accuracy": accuracy,
+            "correct_count": correct_count,
+            "total_count": total_count,
+        }
+
+        self._record_file.close()
+        with profile_span("write_score_file"), open(self.score_file_path, "w") as f:
+            f.write(json.dumps(header))
+            with open(self._record_file.name, "r") as record_file:
+                while chunk := record_file.read(1 << 20):
+                    f.write(chunk)
+        os.remove(self._record_file.name)
+
+        if self.compact:
+            self._blob_file.close()
+            os.replace(self._blob_file.name, self.blob_file_path)
+        elif self.blob_file_path.exists():
+            # Blobs from a previous compact score file are no longer referenced
+            os.remove(self.blob_file_path)
+
+        self._closed = True
+        return accuracy
+
+    def abort(self) -> None:
+        """
+        Close the temporary files and remove them, without writing the score file.
+        """
+        for temp_file in (self._record_file, self._blob_file):
+            if temp_file is None:
+                continue
+            temp_file.close()
+            if os.path.exists(temp_file.name):
+                os.remove(temp_file.name)
+        self._closed = True
+
+    def _replace_bulky_fields(self, record: dict) -> dict:
+        record = dict(record)
+        for field_path in BULKY_SCORE_FIELDS:
+            # Copy the containers along the path, as the records may share them with the dataset entries
+            parent = record
+            for key in field_path[:-1]:
+                if not isinstance(parent.get(key), dict):
+                    parent = None
+                    break
+                parent[key] = dict(parent[key])
+                parent = parent[key]
+            if parent is None or field_path[-1] not in parent:
+                continue
+
+            serialized_value = json_dumps_serializable(parent[field_path[-1]])
+            if len(serialized_value) < SCORE_BLOB_MIN_SIZE:
+                continue
+            digest = hashlib.sha256(serialized_value.encode("utf-8")).hexdigest()[:16]
+            if digest not in self._blob_digests:
+                self._blob_digests.add(digest)
+                self._blob_file.write(f'{{"digest": "{digest}", "value": {serialized_value}}}\n')
+            parent[field_path[-1]] = {BLOB_REFERENCE_KEY: digest}
+        return record
+
+
+def get_blob_file_path(score_dir: Path, model_name: str, test_category: str) -> Path:
+    return score_dir / model_name / SCORE_BLOB_DIR_NAME / f"{VERSION_PREFIX}_{test_category}_blobs.jsonl"
+
+
+def load_score_file(score_file_path: Path) -> list[dict]:
+    """
+    Load a score file, resolving the blob references of compact score files.
+    """
+    score_file_path = Path(score_file_path)
+    score_entries = load_file(score_file_path)
+    blob_file_path = score_file_path.parent / SCORE_BLOB_DIR_NAME / score_file_path.name.replace("_score.json", "_blobs.jsonl")
+    if not blob_file_path.exists():
+        return score_entries
+
+    blobs = {blob["digest"]: blob["value"] for blob in load_file(blob_file_path)}
+    for record in score_entries[1:]:
+        for field_path in BULKY_SCORE_FIELDS:
+            parent = record
+            for key in field_path[:-1]:
+                parent = parent.get(key) if isinstance(parent, dict) else None
+            if not isinstance(parent, dict):
+                continue
+            value = parent.get(field_path[-1])
+            if isinstance(value, dict) and list(value.keys()) == [BLOB_REFERENCE_KEY]:
+                parent[field_path[-1]] = blobs[value[BLOB_REFERENCE_KEY]]
+    return score_entries
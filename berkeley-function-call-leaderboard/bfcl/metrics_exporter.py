@@ -0,0 +1,258 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Number of latest query latencies kept per model and provider to compute the latency quantiles
+LATENCY_WINDOW_SIZE = 1000
+LATENCY_QUANTILES = (0.5, 0.95)
+
+# Seconds between two writes of the metrics textfile
+METRICS_TEXTFILE_INTERVAL = 15
+
+# When set, with `set_generation_metrics`, the progress of the generation is recorded by this collector
+_generation_metrics = None
+
+_NULL_CONTEXT = nullcontext()
+
+
+def set_generation_metrics(generation_metrics) -> None:
+    global _generation_metrics
+    _generation_metrics = generation_metrics
+
+
+def track_query(handler):
+    """
+    A context manager around one model query: the query counts as in flight until the block exits, and its latency is recorded if it succeeds.
+    It does nothing unless a metrics collector is set.
+    """
+    if _generation_metrics is None:
+        return _NULL_CONTEXT
+    return _generation_metrics.track_query(_get_labels(handler))
+
+
+def record_retry(handler, error: Exception) -> None:
+    if _generation_metrics is not None:
+        _generation_metrics.record_retry(_get_labels(handler), type(error).__name__)
+
+
+def record_entry_completed(handler, result: dict) -> None:
+    """
+    Record a generated entry, as written to the result file: its outcome and the tokens it used.
+    """
+    if _generation_metrics is not None:
+        _generation_metrics.record_entry_completed(_get_labels(handler), result)
+
+
+class GenerationMetrics:
+    """
+    Live metrics of a generation run, per model and provider, in the Prometheus text exposition format:
+    queries in flight, completed entries per test category, retries per error class, token counts and throughput, and query latency quantiles.
+
+    The metrics can be published by a textfile (eg, for the node_exporter textfile collector), rewritten every `METRICS_TEXTFILE_INTERVAL` seconds,
+    and/or by an HTTP endpoint serving `/metrics`.
+    """
+
+    def __init__(self, textfile_path: Path = None, port: int = None) -> None:
+        """
+        Args:
+            textfile_path (Path, optional): The file the metrics are written to. Defaults to None, for no textfile.
+            port (int, optional): The port of the HTTP endpoint. Defaults to None, for no endpoint.
+        """
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        # (model, provider) -> number of queries in flight
+        self.queries_in_flight = {}
+        # (model, provider, test category, status) -> number of entries
+        self.entries_completed = {}
+        # (model, provider, error class) -> number of retries
+        self.retries = {}
+        # (model, provider, direction) -> number of tokens
+        self.tokens = {}
+        # (model, provider) -> latest query latencies, and the [count, sum] of all of them
+        self.latency_windows = {}
+        self.latency_totals = {}
+
+        self.textfile_path = Path(textfile_path) if textfile_path is not None else None
+        self._stop_event = threading.Event()
+        self._textfile_thread = None
+        if self.textfile_path is not None:
+            self.textfile_path.parent.mkdir(parents=True, exist_ok=True)
+            self._textfile_thread = threading.Thread(
+                target=self._write_textfile_periodically, name="bfcl-metrics-textfile", daemon=True
+            )
+            self._textfile_thread.start()
+
+        self._server = None
+        if port is not None:
+            self._server = ThreadingHTTPServer(("", port), _get_request_handler_class(self))
+            threading.Thread(target=self._server.serve_forever, name="bfcl-metrics-server", daemon=True).start()
+
+    @contextmanager
+    def track_query(self, labels: tuple):
+        with self.lock:
+            self.queries_in_flight[labels] = self.queries_in_flight.get(labels, 0) + 1
+        start_time = time.perf_counter()
+        try:
+            yield
+            latency = time.perf_counter() - start_time
+            with self.lock:
+                self.latency_windows.setdefault(labels, deque(maxlen=LATENCY_WINDOW_SIZE)).append(latency)
+                latency_total = self.latency_totals.setdefault(labels, [0, 0.0])
+                latency_total[0] += 1
+                latency_total[1] += latency
+        finally:
+            with self.lock:
+                self.queries_in_flight[labels] -= 1
+
+    def record_retry(self, labels: tuple, error_class: str) -> None:
+        key = labels + (error_class,)
+        with self.lock:
+            self.retries[key] = self.retries.get(key, 0) + 1
+
+    def record_entry_completed(self, labels: tuple, result: dict) -> None:
+        test_category = result["id"].rsplit("_", 1)[0]
+        # A failed entry has the error message as its result, see `multi_threaded_inference`
+        failed = isinstance(result["result"], str) and result["result"].startswith("Error during inference")
+        key = labels + (test_category, "error" if failed else "success")
+        with self.lock:
+            self.entries_completed[key] = self.entries_completed.get(key, 0) + 1
+            for direction in ("input", "output"):
+                token_count = _sum_nested(result.get(f"{direction}_token_count", 0))
+                if token_count:
+                    token_key = labels + (direction,)
+                    self.tokens[token_key] = self.tokens.get(token_key, 0) + token_count
+
+    def render(self) -> str:
+        with self.lock:
+            elapsed = max(time.time() - self.start_time, 1e-9)
+            lines = []
+            _add_metric(
+                lines,
+                "bfcl_queries_in_flight",
+                "gauge",
+                "Number of model queries currently in progress.",
+                ("model", "provider"),
+                self.queries_in_flight,
+            )
+            _add_metric(
+                lines,
+                "bfcl_entries_completed_total",
+                "counter",
+                "Number of test entries generated, by test category and outcome.",
+                ("model", "provider", "test_category", "status"),
+                self.entries_completed,
+            )
+            _add_metric(
+                lines,
+                "bfcl_retries_total",
+                "counter",
+                "Number of retries of a query (with backoff) or of a whole entry, by class of the error that caused the retry.",
+                ("model", "provider", "error_class"),
+                self.retries,
+            )
+            _add_metric(
+                lines,
+                "bfcl_tokens_total",
+                "counter",
+                "Number of tokens of the generated entries, by direction (input or output).",
+                ("model", "provider", "direction"),
+                self.tokens,
+            )
+            _add_metric(
+                lines,
+                "bfcl_tokens_per_second",
+                "gauge",
+                "Average token throughput since the start of the run, by direction (input or output).",
+                ("model", "provider", "direction"),
+                {key: token_count / elapsed for key, token_count in self.tokens.items()},
+            )
+
+            lines.append("# HELP bfcl_query_latency_seconds Latency of the model queries; the quantiles are over the latest queries.")
+            lines.append("# TYPE bfcl_query_latency_seconds summary")
+            for labels, latency_window in sorted(self.latency_windows.items()):
+                sorted_latencies = sorted(latency_window)
+                for quantile in LATENCY_QUANTILES:
+                    quantile_latency = sorted_latencies[max(math.ceil(quantile * len(sorted_latencies)) - 1, 0)]
+                    lines.append(
+                        f"bfcl_query_latency_seconds{_format_labels(('model', 'provider', 'quantile'), labels + (str(quantile),))} {quantile_latency}"
+                    )
+                count, total = self.latency_totals[labels]
+                lines.append(f"bfcl_query_latency_seconds_sum{_format_labels(('model', 'provider'), labels)} {total}")
+                lines.append(f"bfcl_query_latency_seconds_count{_format_labels(('model', 'provider'), labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self) -> None:
+        # Written to a temporary file first, so that the collector never reads a partial file
+        temp_path = self.textfile_path.with_name(f".{self.textfile_path.name}.tmp")
+        with open(temp_path, "w") as f:
+            f.write(self.render())
+        os.replace(temp_path, self.textfile_path)
+
+    def close(self) -> None:
+        """
+        Write the final metrics to the textfile and stop the HTTP endpoint.
+        """
+        if self._textfile_thread is not None:
+            self._stop_event.set()
+            self._textfile_thread.join()
+            self.write_textfile()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _write_textfile_periodically(self) -> None:
+        while not self._stop_event.wait(METRICS_TEXTFILE_INTERVAL):
+            self.write_textfile()
+
+
+def _get_labels(handler) -> tuple:
+    model_style = getattr(handler, "model_style", None)
+    return handler.model_name, model_style.value if model_style is not None else "unknown"
+
+
+def _sum_nested(value) -> float:
+    # The multi-turn metadata is a list (per turn) of lists (per step)
+    if isinstance(value, list):
+        return sum(_sum_nested(item) for item in value)
+    return value if isinstance(value, (int, float)) else 0
+
+
+def _add_metric(lines: list, name: str, metric_type: str, description: str, label_names: tuple, values: dict) -> None:
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} {metric_type}")
+    for label_values, value in sorted(values.items()):
+        lines.append(f"{name}{_format_labels(label_names, label_values)} {value}")
+
+
+def _format_labels(label_names: tuple, label_values: tuple) -> str:
+    formatted_labels = []
+    for label_name, label_value in zip(label_names, label_values):
+        label_value = str(label_value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        formatted_labels.append(f'{label_name}="{label_value}"')
+    return "{" + ",".join(formatted_labels) + "}"
+
+
+def _get_request_handler_class(generation_metrics: GenerationMetrics) -> type:
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = generation_metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes are not worth a line in the console
+            pass
+
+    return MetricsRequestHandler
@@ -3,7 +3,7 @@ import os
 import time
 
 from anthropic import Anthropic, RateLimitError
-from anthropic.types import TextBlock, ToolUseBlock
+from anthropic.types import Message, TextBlock, ToolUseBlock
 from bfcl.model_handler.base_handler import BaseHandler
 from bfcl.model_handler.constant import GORILLA_TO_OPENAPI
 from bfcl.model_handler.model_style import ModelStyle
@@ -16,6 +16,8 @@ from bfcl.model_handler.utils import (
     extract_system_prompt,
     format_execution_results_prompting,
     func_doc_language_specific_pre_processing,
+    may_contain_function_call_FC,
+    may_contain_function_call_prompting,
     retry_with_backoff,
     system_prompt_pre_processing_chat_model,
 )
@@ -48,6 +50,12 @@ class ClaudeHandler(BaseHandler):
                 decoded_output.append({name: params})
             return decoded_output
 
+    def may_contain_function_call(self, result) -> bool:
+        if "FC" not in self.model_name:
+            return may_contain_function_call_prompting(result)
+        else:
+            return may_contain_function_call_FC(result)
+
     def decode_execute(self, result):
         if "FC" not in self.model_name:
             func = result
@@ -80,7 +88,7 @@ class ClaudeHandler(BaseHandler):
 
     #### FC methods ####
 
-    def _query_FC(self, inference_data: dict):
+    def _build_FC_request(self, inference_data: dict) -> dict:
         inference_data["inference_input_log"] = {
             "message": repr(inference_data["message"]),
             "tools": inference_data["tools"],
@@ -100,14 +108,20 @@ class ClaudeHandler(BaseHandler):
                             del message["content"][0]["cache_control"]
                     count += 1
 
-        return self.generate_with_backoff(
-            model=self.model_name.strip("-FC"),
-            max_tokens=(
+        return {
+            "model": self.model_name.strip("-FC"),
+            "max_tokens": (
                 8192 if "claude-3-5" in self.model_name else 4096
             ),  # 3.5 Sonnet has a higher max token limit
-            tools=inference_data["tools"],
-            messages=messages,
-        )
+            "tools": inference_data["tools"],
+            "messages": messages,
+        }
+
+    def _query_FC(self, inference_data: dict):
+        return self.generate_with_backoff(**self._build_FC_request(inference_data))
+
+    def _batch_request_FC(self, inference_data: dict) -> dict:
+        return self._build_FC_request(inference_data)
 
     def _pre_query_processing_FC(self, inference_data: dict, test_entry: dict) -> dict:
         for round_idx in range(len(test_entry["question"])):
@@ -170,7 +184,9 @@ class ClaudeHandler(BaseHandler):
             "model_responses": model_responses,
             "model_responses_message_for_chat_history": model_responses_message_for_chat_history,
             "tool_call_ids": tool_call_ids,
-            "input_token": api_response.usage.input_tokens,
+            "input_token": _get_total_input_tokens(api_response.usage),
+            "cached_input_token": getattr(api_response.usage, "cache_read_input_tokens", None) or 0,
+            "cache_creation_input_token": getattr(api_response.usage, "cache_creation_input_tokens", None) or 0,
             "output_token": api_response.usage.output_tokens,
         }
 
@@ -229,7 +245,7 @@ class ClaudeHandler(BaseHandler):
 
     #### Prompting methods ####
 
-    def _query_prompting(self, inference_data: dict):
+    def _build_prompting_request(self, inference_data: dict) -> dict:
         inference_data["inference_input_log"] = {
             "message": repr(inference_data["message"]),
             "system_prompt": inference_data["system_prompt"],
@@ -249,13 +265,19 @@ class ClaudeHandler(BaseHandler):
                             del message["content"][0]["cache_control"]
                     count += 1
 
-        return self.generate_with_backoff(
-            model=self.model_name,
-            max_tokens=(8192 if "claude-3-5-sonnet-20240620" in self.model_name else 4096),
-            temperature=self.temperature,
-            system=inference_data["system_prompt"],
-            messages=inference_data["message"],
-        )
+        return {
+            "model": self.model_name,
+            "max_tokens": (8192 if "claude-3-5-sonnet-20240620" in self.model_name else 4096),
+            "temperature": self.temperature,
+            "system": inference_data["system_prompt"],
+            "messages": inference_data["message"],
+        }
+
+    def _query_prompting(self, inference_data: dict):
+        return self.generate_with_backoff(**self._build_prompting_request(inference_data))
+
+    def _batch_request_prompting(self, inference_data: dict) -> dict:
+        return self._build_prompting_request(inference_data)
 
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
         functions: list = test_entry["function"]
@@ -294,7 +316,9 @@ class ClaudeHandler(BaseHandler):
     def _parse_query_response_prompting(self, api_response: any) -> dict:
         return {
             "model_responses": api_response.content[0].text,
-            "input_token": api_response.usage.input_tokens,
+            "input_token": _get_total_input_tokens(api_response.usage),
+            "cached_input_token": getattr(api_response.usage, "cache_read_input_tokens", None) or 0,
+            "cache_creation_input_token": getattr(api_response.usage, "cache_creation_input_tokens", None) or 0,
             "output_token": api_response.usage.output_tokens,
         }
 
@@ -339,3 +363,47 @@ class ClaudeHandler(BaseHandler):
         )
 
         return inference_data
+
+    #### Batch API methods ####
+
+    def _submit_batch(self, batch_requests: dict[str, dict]) -> str:
+        batch = self.client.beta.messages.batches.create(
+            requests=[
+                {"custom_id": custom_id, "params": request}
+                for custom_id, request in batch_requests.items()
+            ]
+        )
+        return batch.id
+
+    def _retrieve_batch(self, batch_id: str) -> dict:
+        batch = self.client.beta.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        batch_responses = {}
+        for individual_response in self.client.beta.messages.batches.results(batch_id):
+            result = individual_response.result
+            if result.type == "succeeded":
+                # Convert back from the beta types, so that the content blocks are recognized by `_parse_query_response_xxx`
+                batch_responses[individual_response.custom_id] = Message.model_validate(
+                    result.message.model_dump()
+                )
+            else:
+                batch_responses[individual_response.custom_id] = RuntimeError(
+                    f"Batch request {result.type}: {getattr(result, 'error', None)}"
+                )
+
+        return batch_responses
+
+
+def _get_total_input_tokens(usage) -> int:
+    """
+    Anthropic reports the tokens read from and written to the prompt cache separately from `input_tokens`.
+    Add them back so that `input_token` is the full prompt size, consistent with the other providers.
+    Both are also reported on their own (`cached_input_token` and `cache_creation_input_token`), as they are billed at different prices.
+    """
+    return (
+        usage.input_tokens
+        + (getattr(usage, "cache_read_input_tokens", None) or 0)
+        + (getattr(usage, "cache_creation_input_tokens", None) or 0)
+    )
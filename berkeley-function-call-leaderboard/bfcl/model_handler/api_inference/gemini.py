@@ -1,4 +1,7 @@
+import datetime
+import json
 import os
+import threading
 import time
 
 import vertexai
@@ -6,24 +9,40 @@ from bfcl.model_handler.base_handler import BaseHandler
 from bfcl.model_handler.constant import GORILLA_TO_OPENAPI
 from bfcl.model_handler.model_style import ModelStyle
 from bfcl.model_handler.utils import (
+    BatchJobFailedError,
     convert_to_tool,
     default_decode_ast_prompting,
     default_decode_execute_prompting,
     extract_system_prompt,
     format_execution_results_prompting,
     func_doc_language_specific_pre_processing,
+    may_contain_function_call_FC,
+    may_contain_function_call_prompting,
     retry_with_backoff,
     system_prompt_pre_processing_chat_model,
 )
+from bfcl.utils import is_multi_turn
 from google.api_core.exceptions import ResourceExhausted
+from google.cloud import storage
 from vertexai.generative_models import (
     Content,
     FunctionDeclaration,
     GenerationConfig,
+    GenerationResponse,
     GenerativeModel,
     Part,
     Tool,
 )
+from vertexai.batch_prediction import BatchPredictionJob
+from vertexai.preview import caching
+from vertexai.preview.generative_models import GenerativeModel as PreviewGenerativeModel
+
+# Vertex AI only allows context caches of at least 32,768 tokens (for the Gemini 1.5 and 2.0 models), so this can't be lowered.
+# The system prompt and tools of the current multi-turn entries stay below it (about 23,000 tokens at most), so context caching
+# is inert on the current dataset, and only kicks in for entries with larger function docs.
+CONTEXT_CACHE_MIN_TOKEN_COUNT = 32768
+# Long enough to cover all the steps of a multi-turn entry; the caches are deleted once the entry is done, this is only a fallback
+CONTEXT_CACHE_TTL = datetime.timedelta(minutes=15)
 
 
 class GeminiHandler(BaseHandler):
@@ -36,6 +55,26 @@ class GeminiHandler(BaseHandler):
             location=os.getenv("VERTEX_AI_LOCATION"),
         )
         self.client = GenerativeModel(self.model_name.replace("-FC", ""))
+        # Entries are inferred concurrently, each on its own thread, so the context caches created for an entry are tracked per thread
+        self._context_caches = threading.local()
+
+    def inference(self, test_entry: dict, include_input_log: bool, exclude_state_log: bool):
+        self._context_caches.created = []
+        try:
+            return super().inference(test_entry, include_input_log, exclude_state_log)
+        finally:
+            self._delete_context_caches()
+
+    def _delete_context_caches(self) -> None:
+        """
+        Delete the context caches created for the current entry, so that they are not billed for storage until they expire.
+        """
+        for cached_content in self._context_caches.created:
+            try:
+                cached_content.delete()
+            except Exception as e:
+                print(f"Failed to delete context cache {cached_content.name} for {self.model_name}: {e}")
+        self._context_caches.created = []
 
     @staticmethod
     def _substitute_prompt_role(prompts: list[dict]) -> list[dict]:
@@ -59,6 +98,12 @@ class GeminiHandler(BaseHandler):
                 result = [result]
             return result
 
+    def may_contain_function_call(self, result) -> bool:
+        if "FC" not in self.model_name:
+            return may_contain_function_call_prompting(result)
+        else:
+            return may_contain_function_call_FC(result)
+
     def decode_execute(self, result):
         if "FC" not in self.model_name:
             result = result.replace("```tool_code\n", "").replace("\n```", "")
@@ -82,7 +127,8 @@ class GeminiHandler(BaseHandler):
 
     #### FC methods ####
 
-    def _query_FC(self, inference_data: dict):
+    @staticmethod
+    def _build_tools(inference_data: dict) -> list[Tool]:
         # Gemini models needs to first conver the function doc to FunctionDeclaration and Tools objects.
         # We do it here to avoid json serialization issues.
         func_declarations = []
@@ -96,9 +142,12 @@ class GeminiHandler(BaseHandler):
             )
 
         if func_declarations:
-            tools = [Tool(function_declarations=func_declarations)]
+            return [Tool(function_declarations=func_declarations)]
         else:
-            tools = None
+            return None
+
+    def _query_FC(self, inference_data: dict):
+        tools = self._build_tools(inference_data)
 
         inference_data["inference_input_log"] = {
             "message": repr(inference_data["message"]),
@@ -106,6 +155,18 @@ class GeminiHandler(BaseHandler):
             "system_prompt": inference_data.get("system_prompt", None),
         }
 
+        if inference_data["caching_enabled"] and tools is not None:
+            cached_client = self._get_context_cache_client(inference_data, tools)
+            if cached_client is not None:
+                # The system prompt and the tools are part of the cached content
+                return self.generate_with_backoff(
+                    client=cached_client,
+                    contents=inference_data["message"],
+                    generation_config=GenerationConfig(
+                        temperature=self.temperature,
+                    ),
+                )
+
         # messages are already converted to Content object
         if "system_prompt" in inference_data:
             # We re-instantiate the GenerativeModel object with the system prompt
@@ -126,6 +187,58 @@ class GeminiHandler(BaseHandler):
             tools=tools,
         )
 
+    def _get_context_cache_client(self, inference_data: dict, tools: list):
+        """
+        Return a client bound to a context cache holding the system prompt and the tools of the entry,
+        so that they are not billed at the full input price on every step of a multi-turn entry.
+        Return None if the prefix is too small to be cached or the cache could not be created.
+        The cache is rebuilt when tools are added mid-conversation (miss_func categories).
+        """
+        tool_count = len(inference_data["tools"])
+        if inference_data.get("context_cache_tool_count") == tool_count:
+            return inference_data["context_cache_client"]
+
+        inference_data["context_cache_tool_count"] = tool_count
+        inference_data["context_cache_client"] = None
+
+        # Rough estimate of 4 characters per token, to avoid an extra count_tokens call per entry
+        estimated_token_count = (
+            len(json.dumps(inference_data["tools"]))
+            + len(inference_data.get("system_prompt", ""))
+        ) // 4
+        if estimated_token_count < CONTEXT_CACHE_MIN_TOKEN_COUNT:
+            return None
+
+        try:
+            cached_content = caching.CachedContent.create(
+                model_name=self.model_name.replace("-FC", ""),
+                system_instruction=inference_data.get("system_prompt", None),
+                tools=tools,
+                ttl=CONTEXT_CACHE_TTL,
+            )
+            self._context_caches.created.append(cached_content)
+            inference_data["context_cache_client"] = PreviewGenerativeModel.from_cached_content(
+                cached_content=cached_content
+            )
+        except Exception as e:
+            print(f"Failed to create context cache for {self.model_name}, querying without it: {e}")
+
+        return inference_data["context_cache_client"]
+
+    def _batch_request_FC(self, inference_data: dict) -> dict:
+        inference_data["inference_input_log"] = {
+            "message": repr(inference_data["message"]),
+            "tools": inference_data["tools"],
+            "system_prompt": inference_data.get("system_prompt", None),
+        }
+
+        request = self._build_batch_request(inference_data)
+        tools = self._build_tools(inference_data)
+        if tools is not None:
+            request["tools"] = [_to_rest_json(tool._raw_tool) for tool in tools]
+
+        return request
+
     def _pre_query_processing_FC(self, inference_data: dict, test_entry: dict) -> dict:
 
         for round_idx in range(len(test_entry["question"])):
@@ -138,6 +251,11 @@ class GeminiHandler(BaseHandler):
         system_prompt = extract_system_prompt(test_entry["question"][0])
         if system_prompt:
             inference_data["system_prompt"] = system_prompt
+
+        test_category: str = test_entry["id"].rsplit("_", 1)[0]
+        # caching enabled only for multi_turn category
+        inference_data["caching_enabled"] = is_multi_turn(test_category)
+
         return inference_data
 
     def _compile_tools(self, inference_data: dict, test_entry: dict) -> dict:
@@ -189,6 +307,9 @@ class GeminiHandler(BaseHandler):
             "model_responses_message_for_chat_history": response_function_call_content,
             "tool_call_func_names": tool_call_func_names,
             "input_token": api_response.usage_metadata.prompt_token_count,
+            "cached_input_token": getattr(
+                api_response.usage_metadata, "cached_content_token_count", 0
+            ),
             "output_token": api_response.usage_metadata.candidates_token_count,
         }
 
@@ -270,6 +391,14 @@ class GeminiHandler(BaseHandler):
         )
         return api_response
 
+    def _batch_request_prompting(self, inference_data: dict) -> dict:
+        inference_data["inference_input_log"] = {
+            "message": repr(inference_data["message"]),
+            "system_prompt": inference_data.get("system_prompt", None),
+        }
+
+        return self._build_batch_request(inference_data)
+
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
         functions: list = test_entry["function"]
         test_category: str = test_entry["id"].rsplit("_", 1)[0]
@@ -352,3 +481,87 @@ class GeminiHandler(BaseHandler):
         )
         inference_data["message"].append(tool_message)
         return inference_data
+
+    #### Batch API methods ####
+
+    def _build_batch_request(self, inference_data: dict) -> dict:
+        # Batch prediction takes GenerateContentRequest objects in their REST JSON form
+        request = {
+            "contents": [_to_rest_json(content._raw_content) for content in inference_data["message"]],
+            "generationConfig": {"temperature": self.temperature},
+        }
+        if "system_prompt" in inference_data:
+            request["systemInstruction"] = {"parts": [{"text": inference_data["system_prompt"]}]}
+
+        return request
+
+    def _submit_batch(self, batch_requests: dict[str, dict]) -> str:
+        # Vertex AI batch prediction reads its input from and writes its output to Cloud Storage
+        batch_bucket_uri = os.getenv("VERTEX_AI_BATCH_BUCKET_URI")
+        if not batch_bucket_uri:
+            raise ValueError(
+                "The VERTEX_AI_BATCH_BUCKET_URI environment variable (eg, gs://my-bucket/bfcl) must be set to use the batch API with Gemini models."
+            )
+        bucket_name, _, prefix = batch_bucket_uri.removeprefix("gs://").partition("/")
+        job_prefix = f"{prefix.rstrip('/')}/{self.model_name_underline_replaced}_{int(time.time())}".lstrip("/")
+
+        # The custom id is carried in the request labels, which are echoed back in the output
+        batch_input = "\n".join(
+            json.dumps({"request": {**request, "labels": {"custom_id": custom_id}}})
+            for custom_id, request in batch_requests.items()
+        )
+        storage.Client(project=os.getenv("VERTEX_AI_PROJECT_ID")).bucket(bucket_name).blob(
+            f"{job_prefix}/input.jsonl"
+        ).upload_from_string(batch_input, content_type="application/jsonl")
+
+        batch_job = BatchPredictionJob.submit(
+            source_model=self.model_name.replace("-FC", ""),
+            input_dataset=f"gs://{bucket_name}/{job_prefix}/input.jsonl",
+            output_uri_prefix=f"gs://{bucket_name}/{job_prefix}/output",
+        )
+        return batch_job.resource_name
+
+    def _retrieve_batch(self, batch_id: str) -> dict:
+        batch_job = BatchPredictionJob(batch_id)
+        if not batch_job.has_ended:
+            return None
+        if not batch_job.has_succeeded:
+            # An expired or cancelled job still writes the requests completed in time; the others are missing from its output
+            state_name = getattr(batch_job.state, "name", str(batch_job.state))
+            if state_name not in _PARTIAL_BATCH_JOB_STATES or not batch_job.output_location:
+                raise BatchJobFailedError(f"Batch job {batch_id} ended with state {batch_job.state}: {batch_job.error}")
+
+        bucket_name, _, output_prefix = batch_job.output_location.removeprefix("gs://").partition("/")
+        batch_responses = {}
+        for blob in storage.Client(project=os.getenv("VERTEX_AI_PROJECT_ID")).list_blobs(
+            bucket_name, prefix=output_prefix
+        ):
+            if not blob.name.endswith(".jsonl"):
+                continue
+            for line in blob.download_as_text().splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                custom_id = record["request"]["labels"]["custom_id"]
+                if record.get("response"):
+                    batch_responses[custom_id] = GenerationResponse.from_dict(record["response"])
+                else:
+                    batch_responses[custom_id] = RuntimeError(record.get("status", "No response returned."))
+
+        return batch_responses
+
+
+# Final states of a batch prediction job whose output may hold part of the responses
+_PARTIAL_BATCH_JOB_STATES = ("JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED", "JOB_STATE_PARTIALLY_SUCCEEDED")
+
+
+def _to_rest_json(message) -> dict:
+    """
+    Convert a Vertex AI proto message to the JSON form used by the REST API (camelCase keys, enum names).
+    """
+    return type(message).to_dict(
+        message,
+        use_integers_for_enums=False,
+        including_default_value_fields=False,
+        preserving_proto_field_name=False,
+    )
@@ -0,0 +1,330 @@
+"""
+A local mock of the OpenAI and Anthropic batch APIs, to exercise `bfcl generate --batch-api` without submitting real (billed) batch jobs.
+
+Usage:
+    python -m bfcl.model_handler.api_inference.mock_batch_server --port 8000
+
+Then point the clients at it, eg in the .env file:
+    OPENAI_BASE_URL=http://localhost:8000/v1
+    ANTHROPIC_BASE_URL=http://localhost:8000
+
+Every request gets a canned response: a call to the first available tool (with no arguments) for FC requests, or a fixed text otherwise.
+The responses are in the providers' formats, so they go through the handlers' regular parsing and writing paths.
+Gemini batch prediction goes through Vertex AI and Cloud Storage, and is not covered by this server.
+"""
+
+import argparse
+import email
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOCK_TEXT_RESPONSE = "This is a mock response from the local batch server."
+
+
+class MockBatchState:
+    """
+    In-memory storage for the uploaded files and the submitted batch jobs.
+    """
+
+    def __init__(self, completion_delay: float) -> None:
+        # Seconds after submission before a batch job is reported as completed
+        self.completion_delay = completion_delay
+        self.lock = threading.Lock()
+        self.files: dict[str, bytes] = {}
+        self.openai_batches: dict[str, dict] = {}
+        self.anthropic_batches: dict[str, dict] = {}
+
+
+def _estimate_token_count(payload) -> int:
+    return max(len(json.dumps(payload)) // 4, 1)
+
+
+def _mock_chat_completion(body: dict) -> dict:
+    message = {"role": "assistant", "content": MOCK_TEXT_RESPONSE}
+    finish_reason = "stop"
+    if body.get("tools"):
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {
+                        "name": body["tools"][0]["function"]["name"],
+                        "arguments": "{}",
+                    },
+                }
+            ],
+        }
+        finish_reason = "tool_calls"
+
+    prompt_tokens = _estimate_token_count(body.get("messages", []))
+    completion_tokens = _estimate_token_count(message)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", ""),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _mock_anthropic_message(params: dict) -> dict:
+    content = [{"type": "text", "text": MOCK_TEXT_RESPONSE}]
+    stop_reason = "end_turn"
+    if params.get("tools"):
+        content = [
+            {
+                "type": "tool_use",
+                "id": f"toolu_{uuid.uuid4().hex[:24]}",
+                "name": params["tools"][0]["name"],
+                "input": {},
+            }
+        ]
+        stop_reason = "tool_use"
+
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", ""),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": _estimate_token_count(params.get("messages", [])),
+            "output_tokens": _estimate_token_count(content),
+        },
+    }
+
+
+def _format_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class MockBatchRequestHandler(BaseHTTPRequestHandler):
+    state: MockBatchState = None
+
+    #### OpenAI ####
+
+    def _upload_file(self):
+        content_type = self.headers["Content-Type"]
+        body = self._read_body()
+        # Parse the multipart/form-data body with the email parser, as the `cgi` module is deprecated
+        form = email.message_from_bytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+        )
+        file_content, file_name, purpose = b"", "", "batch"
+        for part in form.get_payload():
+            field_name = part.get_param("name", header="content-disposition")
+            if field_name == "file":
+                file_content = part.get_payload(decode=True)
+                file_name = part.get_filename()
+            elif field_name == "purpose":
+                purpose = part.get_payload(decode=True).decode("utf-8")
+
+        file_id = f"file-{uuid.uuid4().hex}"
+        with self.state.lock:
+            self.state.files[file_id] = file_content
+        self._send_json(
+            {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(file_content),
+                "created_at": int(time.time()),
+                "filename": file_name,
+                "purpose": purpose,
+                "status": "processed",
+            }
+        )
+
+    def _create_openai_batch(self):
+        body = json.loads(self._read_body())
+        with self.state.lock:
+            input_content = self.state.files.get(body["input_file_id"])
+        if input_content is None:
+            self._send_json({"error": {"message": "Input file not found."}}, status=404)
+            return
+
+        output_lines = []
+        for line in input_content.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            output_lines.append(
+                json.dumps(
+                    {
+                        "id": f"batch_req_{uuid.uuid4().hex}",
+                        "custom_id": request["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "request_id": uuid.uuid4().hex,
+                            "body": _mock_chat_completion(request["body"]),
+                        },
+                        "error": None,
+                    }
+                )
+            )
+
+        output_file_id = f"file-{uuid.uuid4().hex}"
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex}",
+            "object": "batch",
+            "endpoint": body["endpoint"],
+            "errors": None,
+            "input_file_id": body["input_file_id"],
+            "completion_window": body["completion_window"],
+            "created_at": int(time.time()),
+            "request_counts": {"total": len(output_lines), "completed": len(output_lines), "failed": 0},
+        }
+        with self.state.lock:
+            self.state.files[output_file_id] = "\n".join(output_lines).encode("utf-8")
+            self.state.openai_batches[batch["id"]] = {**batch, "output_file_id": output_file_id}
+        self._send_json(self._openai_batch_view(batch["id"]))
+
+    def _openai_batch_view(self, batch_id: str) -> dict:
+        with self.state.lock:
+            batch = dict(self.state.openai_batches[batch_id])
+        if time.time() - batch["created_at"] < self.state.completion_delay:
+            batch["status"] = "in_progress"
+            batch["output_file_id"] = None
+        else:
+            batch["status"] = "completed"
+            batch["completed_at"] = int(batch["created_at"] + self.state.completion_delay)
+        batch["error_file_id"] = None
+        return batch
+
+    #### Anthropic ####
+
+    def _create_anthropic_batch(self):
+        body = json.loads(self._read_body())
+        results = [
+            {
+                "custom_id": request["custom_id"],
+                "result": {"type": "succeeded", "message": _mock_anthropic_message(request["params"])},
+            }
+            for request in body["requests"]
+        ]
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        with self.state.lock:
+            self.state.anthropic_batches[batch_id] = {"created_at": time.time(), "results": results}
+        self._send_json(self._anthropic_batch_view(batch_id))
+
+    def _anthropic_batch_view(self, batch_id: str) -> dict:
+        with self.state.lock:
+            batch = self.state.anthropic_batches[batch_id]
+        ended = time.time() - batch["created_at"] >= self.state.completion_delay
+        request_count = len(batch["results"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else request_count,
+                "succeeded": request_count if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": _format_timestamp(batch["created_at"]),
+            "expires_at": _format_timestamp(batch["created_at"] + timedelta(days=1).total_seconds()),
+            "ended_at": _format_timestamp(batch["created_at"] + self.state.completion_delay) if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": (
+                f"http://{self.headers['Host']}/v1/messages/batches/{batch_id}/results" if ended else None
+            ),
+        }
+
+    #### HTTP plumbing ####
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        if path == "/v1/files":
+            self._upload_file()
+        elif path == "/v1/batches":
+            self._create_openai_batch()
+        elif path == "/v1/messages/batches":
+            self._create_anthropic_batch()
+        else:
+            self._send_json({"error": {"message": f"Unknown endpoint: {path}"}}, status=404)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if match := re.fullmatch(r"/v1/files/([\w-]+)/content", path):
+            with self.state.lock:
+                content = self.state.files.get(match.group(1))
+            if content is None:
+                self._send_json({"error": {"message": "File not found."}}, status=404)
+            else:
+                self._send_bytes(content, "application/octet-stream")
+        elif match := re.fullmatch(r"/v1/batches/([\w-]+)", path):
+            if match.group(1) not in self.state.openai_batches:
+                self._send_json({"error": {"message": "Batch not found."}}, status=404)
+            else:
+                self._send_json(self._openai_batch_view(match.group(1)))
+        elif match := re.fullmatch(r"/v1/messages/batches/([\w-]+)/results", path):
+            with self.state.lock:
+                results = self.state.anthropic_batches[match.group(1)]["results"]
+            self._send_bytes(
+                "\n".join(json.dumps(result) for result in results).encode("utf-8"),
+                "application/binary",
+            )
+        elif match := re.fullmatch(r"/v1/messages/batches/([\w-]+)", path):
+            if match.group(1) not in self.state.anthropic_batches:
+                self._send_json({"error": {"message": "Batch not found."}}, status=404)
+            else:
+                self._send_json(self._anthropic_batch_view(match.group(1)))
+        else:
+            self._send_json({"error": {"message": f"Unknown endpoint: {path}"}}, status=404)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send_json(self, payload: dict, status: int = 200):
+        self._send_bytes(json.dumps(payload).encode("utf-8"), "application/json", status)
+
+    def _send_bytes(self, content: bytes, content_type: str, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def create_server(host: str = "localhost", port: int = 8000, completion_delay: float = 0) -> ThreadingHTTPServer:
+    # Each server gets its own state, so that several servers can run side by side (eg, in tests)
+    request_handler = type(
+        "BoundMockBatchRequestHandler",
+        (MockBatchRequestHandler,),
+        {"state": MockBatchState(completion_delay)},
+    )
+    return ThreadingHTTPServer((host, port), request_handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of the OpenAI and Anthropic batch APIs.")
+    parser.add_argument("--host", default="localhost", type=str)
+    parser.add_argument("--port", default=8000, type=int)
+    parser.add_argument(
+        "--completion-delay",
+        default=0,
+        type=float,
+        help="Seconds after submission before a batch job is reported as completed.",
+    )
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.completion_delay)
+    print(f"Mock batch server listening on http://{args.host}:{args.port}")
+    server.serve_forever()
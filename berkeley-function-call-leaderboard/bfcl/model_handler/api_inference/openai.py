@@ -6,16 +6,21 @@ from bfcl.model_handler.base_handler import BaseHandler
 from bfcl.model_handler.constant import GORILLA_TO_OPENAPI
 from bfcl.model_handler.model_style import ModelStyle
 from bfcl.model_handler.utils import (
+    BatchJobFailedError,
     convert_to_function_call,
     convert_to_tool,
     default_decode_ast_prompting,
     default_decode_execute_prompting,
     format_execution_results_prompting,
     func_doc_language_specific_pre_processing,
+    get_usage_token_counts,
+    may_contain_function_call_FC,
+    may_contain_function_call_prompting,
     retry_with_backoff,
     system_prompt_pre_processing_chat_model,
 )
 from openai import OpenAI, RateLimitError
+from openai.types.chat import ChatCompletion
 
 
 class OpenAIHandler(BaseHandler):
@@ -35,6 +40,12 @@ class OpenAIHandler(BaseHandler):
         else:
             return default_decode_ast_prompting(result, language)
 
+    def may_contain_function_call(self, result) -> bool:
+        if "FC" in self.model_name or self.is_fc_model:
+            return may_contain_function_call_FC(result)
+        else:
+            return may_contain_function_call_prompting(result)
+
     def decode_execute(self, result):
         if "FC" in self.model_name or self.is_fc_model:
             return convert_to_function_call(result)
@@ -49,41 +60,59 @@ class OpenAIHandler(BaseHandler):
 
         return api_response, end_time - start_time
 
+    @retry_with_backoff(error_type=RateLimitError)
+    def generate_with_backoff_stream(self, **kwargs):
+        """
+        Streaming counterpart of `generate_with_backoff`.
+        The chunks are merged back into a regular `ChatCompletion`, so the response can be parsed the same way as a non-streamed one.
+        """
+        start_time = time.time()
+        time_to_first_token = None
+        chunks = []
+        stream = self.client.chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **kwargs
+        )
+        for chunk in stream:
+            if time_to_first_token is None and any(
+                choice.delta.content or choice.delta.tool_calls for choice in chunk.choices
+            ):
+                time_to_first_token = time.time() - start_time
+            chunks.append(chunk)
+        end_time = time.time()
+
+        if time_to_first_token is None:
+            time_to_first_token = end_time - start_time
+
+        return _merge_chat_completion_chunks(chunks), end_time - start_time, time_to_first_token
+
     #### FC methods ####
 
-    def _query_FC(self, inference_data: dict):
+    def _build_FC_request(self, inference_data: dict) -> dict:
         message: list[dict] = inference_data["message"]
         tools = inference_data["tools"]
         inference_data["inference_input_log"] = {"message": repr(message), "tools": tools}
 
+        request = {
+            "messages": message,
+            "model": self.model_name.replace("-FC", ""),
+        }
+        # Reasoning models don't support temperature parameter
+        # Beta limitation: https://platform.openai.com/docs/guides/reasoning/beta-limitations
+        if "o1" not in self.model_name and "o3-mini" not in self.model_name:
+            request["temperature"] = self.temperature
         if len(tools) > 0:
-            # Reasoning models don't support temperature parameter
-            # Beta limitation: https://platform.openai.com/docs/guides/reasoning/beta-limitations
-            if "o1" in self.model_name or "o3-mini" in self.model_name:
-                return self.generate_with_backoff(
-                    messages=message,
-                    model=self.model_name.replace("-FC", ""),
-                    tools=tools,
-                )
-            else:
-                return self.generate_with_backoff(
-                    messages=message,
-                    model=self.model_name.replace("-FC", ""),
-                    temperature=self.temperature,
-                    tools=tools,
-                )
-        else:
-            if "o1" in self.model_name or "o3-mini" in self.model_name:
-                return self.generate_with_backoff(
-                    messages=message,
-                    model=self.model_name.replace("-FC", ""),
-                )
-            else:
-                return self.generate_with_backoff(
-                    messages=message,
-                    model=self.model_name.replace("-FC", ""),
-                    temperature=self.temperature,
-                )
+            request["tools"] = tools
+
+        return request
+
+    def _query_FC(self, inference_data: dict):
+        return self.generate_with_backoff(**self._build_FC_request(inference_data))
+
+    def _query_FC_stream(self, inference_data: dict):
+        return self.generate_with_backoff_stream(**self._build_FC_request(inference_data))
+
+    def _batch_request_FC(self, inference_data: dict) -> dict:
+        return self._build_FC_request(inference_data)
 
     def _pre_query_processing_FC(self, inference_data: dict, test_entry: dict) -> dict:
         inference_data["message"] = []
@@ -114,13 +143,15 @@ class OpenAIHandler(BaseHandler):
             tool_call_ids = []
 
         model_responses_message_for_chat_history = api_response.choices[0].message
+        input_token_count, output_token_count = get_usage_token_counts(api_response.usage)
 
         return {
             "model_responses": model_responses,
             "model_responses_message_for_chat_history": model_responses_message_for_chat_history,
             "tool_call_ids": tool_call_ids,
-            "input_token": api_response.usage.prompt_tokens,
-            "output_token": api_response.usage.completion_tokens,
+            "input_token": input_token_count,
+            "cached_input_token": _get_cached_prompt_tokens(api_response.usage),
+            "output_token": output_token_count,
         }
 
     def add_first_turn_message_FC(
@@ -164,22 +195,30 @@ class OpenAIHandler(BaseHandler):
 
     #### Prompting methods ####
 
-    def _query_prompting(self, inference_data: dict):
+    def _build_prompting_request(self, inference_data: dict) -> dict:
         inference_data["inference_input_log"] = {"message": repr(inference_data["message"])}
 
+        request = {
+            "messages": inference_data["message"],
+            "model": self.model_name,
+        }
         # OpenAI reasoning models don't support temperature parameter
         # Beta limitation: https://platform.openai.com/docs/guides/reasoning/beta-limitations
-        if "o1" in self.model_name or "o3-mini" in self.model_name:
-            return self.generate_with_backoff(
-                messages=inference_data["message"],
-                model=self.model_name,
-            )
-        else:
-            return self.generate_with_backoff(
-                messages=inference_data["message"],
-                model=self.model_name,
-                temperature=self.temperature,
-            )
+        if "o1" not in self.model_name and "o3-mini" not in self.model_name:
+            request["temperature"] = self.temperature
+
+        return request
+
+    def _query_prompting(self, inference_data: dict):
+        return self.generate_with_backoff(**self._build_prompting_request(inference_data))
+
+    def _query_prompting_stream(self, inference_data: dict):
+        return self.generate_with_backoff_stream(
+            **self._build_prompting_request(inference_data)
+        )
+
+    def _batch_request_prompting(self, inference_data: dict) -> dict:
+        return self._build_prompting_request(inference_data)
 
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
         functions: list = test_entry["function"]
@@ -194,11 +233,13 @@ class OpenAIHandler(BaseHandler):
         return {"message": []}
 
     def _parse_query_response_prompting(self, api_response: any) -> dict:
+        input_token_count, output_token_count = get_usage_token_counts(api_response.usage)
         return {
             "model_responses": api_response.choices[0].message.content,
             "model_responses_message_for_chat_history": api_response.choices[0].message,
-            "input_token": api_response.usage.prompt_tokens,
-            "output_token": api_response.usage.completion_tokens,
+            "input_token": input_token_count,
+            "cached_input_token": _get_cached_prompt_tokens(api_response.usage),
+            "output_token": output_token_count,
         }
 
     def add_first_turn_message_prompting(
@@ -232,3 +273,120 @@ class OpenAIHandler(BaseHandler):
         )
 
         return inference_data
+
+    #### Batch API methods ####
+
+    def _submit_batch(self, batch_requests: dict[str, dict]) -> str:
+        batch_input = "\n".join(
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": request,
+                }
+            )
+            for custom_id, request in batch_requests.items()
+        )
+        batch_input_file = self.client.files.create(
+            file=("batch_input.jsonl", batch_input.encode("utf-8")), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def _retrieve_batch(self, batch_id: str) -> dict:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in ("validating", "in_progress", "finalizing", "cancelling"):
+            return None
+        if batch.status == "failed":
+            raise BatchJobFailedError(f"Batch job {batch_id} ended with status {batch.status}: {batch.errors}")
+        # An expired or cancelled job still returns the requests completed in time; the others are missing from its output
+
+        batch_responses = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id is None:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response")
+                if response is not None and response["status_code"] == 200:
+                    batch_responses[record["custom_id"]] = ChatCompletion.model_validate(
+                        response["body"]
+                    )
+                else:
+                    batch_responses[record["custom_id"]] = RuntimeError(
+                        str(record.get("error") or response)
+                    )
+
+        return batch_responses
+
+
+def _get_cached_prompt_tokens(usage) -> int:
+    """
+    Number of prompt tokens served from OpenAI's prompt cache.
+    Caching is applied automatically to prompt prefixes longer than 1024 tokens; since the tools and the chat history are only ever appended to, every step of a multi-turn entry reuses the prefix of the previous one.
+    OpenAI-compatible endpoints may not report this field.
+    """
+    prompt_tokens_details = getattr(usage, "prompt_tokens_details", None)
+    if prompt_tokens_details is None:
+        return 0
+    return prompt_tokens_details.cached_tokens or 0
+
+
+def _merge_chat_completion_chunks(chunks: list) -> ChatCompletion:
+    """
+    Rebuild a `ChatCompletion` from the chunks of a streamed chat completion.
+    Only the first choice is kept, as we never request more than one.
+    """
+    content = None
+    tool_calls: dict[int, dict] = {}
+    finish_reason = None
+    usage = None
+    completion_id, created, model = "", 0, ""
+
+    for chunk in chunks:
+        completion_id, created, model = chunk.id, chunk.created, chunk.model
+        if chunk.usage is not None:
+            usage = chunk.usage.model_dump()
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.finish_reason is not None:
+            finish_reason = choice.finish_reason
+        if choice.delta.content:
+            content = (content or "") + choice.delta.content
+        for tool_call_delta in choice.delta.tool_calls or []:
+            tool_call = tool_calls.setdefault(
+                tool_call_delta.index,
+                {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
+            )
+            if tool_call_delta.id:
+                tool_call["id"] = tool_call_delta.id
+            if tool_call_delta.function is not None:
+                if tool_call_delta.function.name:
+                    tool_call["function"]["name"] += tool_call_delta.function.name
+                if tool_call_delta.function.arguments:
+                    tool_call["function"]["arguments"] += tool_call_delta.function.arguments
+
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+
+    return ChatCompletion.model_validate(
+        {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {"index": 0, "message": message, "finish_reason": finish_reason or "stop"}
+            ],
+            "usage": usage,
+        }
+    )
@@ -1,8 +1,11 @@
 import json
+import pickle
 import time
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 
 from bfcl.constant import RESULT_PATH, VERSION_PREFIX
+from bfcl.metrics_exporter import track_query
 from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
     STATELESS_CLASSES,
     execute_multi_turn_func_call,
@@ -11,10 +14,26 @@ from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
 from bfcl.model_handler.constant import (
     DEFAULT_USER_PROMPT_FOR_ADDITIONAL_FUNCTION_FC,
     DEFAULT_USER_PROMPT_FOR_ADDITIONAL_FUNCTION_PROMPTING,
+    BATCH_API_JOB_FILE_NAME,
+    BATCH_API_MAX_ATTEMPTS,
+    BATCH_API_MAX_WAIT,
+    BATCH_API_POLL_INTERVAL,
     MAXIMUM_STEP_LIMIT,
+    STREAMING_METRIC_KEYS,
 )
 from bfcl.model_handler.model_style import ModelStyle
-from bfcl.utils import load_file, make_json_serializable, sort_key
+from bfcl.model_handler.utils import BatchJobFailedError, retry_with_backoff
+from bfcl.profiling import (
+    collect_worker_profile,
+    get_profile_category,
+    init_worker_profiler,
+    instrument_handler,
+    is_profiling,
+    merge_worker_profile,
+)
+from bfcl.utils import json_dumps_serializable, sort_key
+from overrides import final
+from tenacity.stop import stop_after_attempt
 
 
 class BaseHandler:
@@ -28,6 +47,7 @@ class BaseHandler:
         self.model_name_underline_replaced = model_name.replace("/", "_").replace("-", "_").replace(".", "_")
         self.temperature = temperature
         self.is_fc_model = False  # Whether the model is a function calling model
+        self.stream = False  # Whether to query the model in streaming mode to collect time-to-first-token metrics
 
     def inference(self, test_entry: dict, include_input_log: bool, exclude_state_log: bool):
         # This method is used to retrive model response for each model.
@@ -58,8 +78,11 @@ class BaseHandler:
         holdout_function: dict[int, list] = test_entry.get("missed_function", {})
 
         total_input_token_count: list[list[float]] = []
+        total_cached_input_token_count: list[list[float]] = []
+        total_cache_creation_input_token_count: list[list[float]] = []
         total_output_token_count: list[list[float]] = []
         total_latency: list[list[float]] = []
+        total_streaming_metrics: dict[str, list[list[float]]] = {key: [] for key in STREAMING_METRIC_KEYS}
         all_model_response: list[list] = []  # The model response that will be used for later evaluation
         all_inference_log: list[list[dict]] = []  # The debugging log for human to understand
         force_quit = False  # Whether the model has been forced to quit. If True, this whole entry will be failed.
@@ -117,8 +140,11 @@ class BaseHandler:
             current_turn_response = []
             current_turn_inference_log: list[dict] = {"begin_of_turn_query": current_turn_message}
             current_turn_input_token_count: list[float] = []
+            current_turn_cached_input_token_count: list[float] = []
+            current_turn_cache_creation_input_token_count: list[float] = []
             current_turn_output_token_count: list[float] = []
             current_turn_latency: list[float] = []
+            current_turn_streaming_metrics: dict[str, list[float]] = {key: [] for key in STREAMING_METRIC_KEYS}
 
             count = 0
             while True:
@@ -128,7 +154,7 @@ class BaseHandler:
                 # Add to the current_turn_inference_log at beginning of each step so that we don't need to bother dealing with the break statements
                 current_turn_inference_log[f"step_{count}"] = current_step_inference_log
 
-                api_response, query_latency = self._query_FC(inference_data)
+                api_response, query_latency, time_to_first_token = self._timed_query_FC(inference_data)
 
                 # This part of logging is disabled by default because it is too verbose and will make the result file extremely large
                 # It is only useful to see if the inference pipeline is working as expected (eg, does it convert all the inputs correctly)
@@ -149,8 +175,15 @@ class BaseHandler:
 
                 # Process the metadata
                 current_turn_input_token_count.append(model_response_data["input_token"])
+                current_turn_cached_input_token_count.append(model_response_data.get("cached_input_token", 0))
+                current_turn_cache_creation_input_token_count.append(
+                    model_response_data.get("cache_creation_input_token", 0)
+                )
                 current_turn_output_token_count.append(model_response_data["output_token"])
                 current_turn_latency.append(query_latency)
+                streaming_metrics = self._compute_streaming_metrics(query_latency, time_to_first_token, model_response_data["output_token"])
+                for key in STREAMING_METRIC_KEYS:
+                    current_turn_streaming_metrics[key].append(streaming_metrics[key])
 
                 current_turn_response.append(model_responses)
                 current_step_inference_log.append({"role": "assistant", "content": model_responses})
@@ -227,8 +260,12 @@ class BaseHandler:
             all_model_response.append(current_turn_response)
             all_inference_log.append(current_turn_inference_log)
             total_input_token_count.append(current_turn_input_token_count)
+            total_cached_input_token_count.append(current_turn_cached_input_token_count)
+            total_cache_creation_input_token_count.append(current_turn_cache_creation_input_token_count)
             total_output_token_count.append(current_turn_output_token_count)
             total_latency.append(current_turn_latency)
+            for key in STREAMING_METRIC_KEYS:
+                total_streaming_metrics[key].append(current_turn_streaming_metrics[key])
 
             if not exclude_state_log:
                 state_log = []
@@ -254,6 +291,13 @@ class BaseHandler:
             "latency": total_latency,
             "inference_log": all_inference_log,
         }
+        # Only record the cached (and cache write) input tokens for handlers that make use of provider-side prompt caching
+        if any(sum(total_cached_input_token_count, [])):
+            metadata["cached_input_token_count"] = total_cached_input_token_count
+        if any(sum(total_cache_creation_input_token_count, [])):
+            metadata["cache_creation_input_token_count"] = total_cache_creation_input_token_count
+        if self.stream:
+            metadata.update(total_streaming_metrics)
 
         return all_model_response, metadata
 
@@ -269,8 +313,11 @@ class BaseHandler:
         holdout_function: dict[int, list] = test_entry.get("missed_function", {})
 
         total_input_token_count: list[list[float]] = []
+        total_cached_input_token_count: list[list[float]] = []
+        total_cache_creation_input_token_count: list[list[float]] = []
         total_output_token_count: list[list[float]] = []
         total_latency: list[list[float]] = []
+        total_streaming_metrics: dict[str, list[list[float]]] = {key: [] for key in STREAMING_METRIC_KEYS}
         all_model_response: list[list] = []  # The model response that will be used for later evaluation
         all_inference_log: list[list[dict]] = []  # The debugging log for human to understand
         force_quit = False  # Whether the model has been forced to quit. If True, this whole entry will be failed.
@@ -323,8 +370,11 @@ class BaseHandler:
             current_turn_response = []
             current_turn_inference_log: list[dict] = {"begin_of_turn_query": current_turn_message}
             current_turn_input_token_count: list[float] = []
+            current_turn_cached_input_token_count: list[float] = []
+            current_turn_cache_creation_input_token_count: list[float] = []
             current_turn_output_token_count: list[float] = []
             current_turn_latency: list[float] = []
+            current_turn_streaming_metrics: dict[str, list[float]] = {key: [] for key in STREAMING_METRIC_KEYS}
 
             count = 0
             while True:
@@ -334,7 +384,7 @@ class BaseHandler:
                 # Add to the current_turn_inference_log at beginning of each step so that we don't need to bother dealing with the break statements
                 current_turn_inference_log[f"step_{count}"] = current_step_inference_log
 
-                api_response, query_latency = self._query_prompting(inference_data)
+                api_response, query_latency, time_to_first_token = self._timed_query_prompting(inference_data)
 
                 # This part of logging is disabled by default because it is too verbose and will make the result file extremely large
                 # It is only useful to see if the inference pipeline is working as expected (eg, does it convert all the inputs correctly)
@@ -355,8 +405,15 @@ class BaseHandler:
 
                 # Process the metadata
                 current_turn_input_token_count.append(model_response_data["input_token"])
+                current_turn_cached_input_token_count.append(model_response_data.get("cached_input_token", 0))
+                current_turn_cache_creation_input_token_count.append(
+                    model_response_data.get("cache_creation_input_token", 0)
+                )
                 current_turn_output_token_count.append(model_response_data["output_token"])
                 current_turn_latency.append(query_latency)
+                streaming_metrics = self._compute_streaming_metrics(query_latency, time_to_first_token, model_response_data["output_token"])
+                for key in STREAMING_METRIC_KEYS:
+                    current_turn_streaming_metrics[key].append(streaming_metrics[key])
 
                 current_turn_response.append(model_responses)
                 current_step_inference_log.append({"role": "assistant", "content": model_responses})
@@ -433,8 +490,12 @@ class BaseHandler:
             all_model_response.append(current_turn_response)
             all_inference_log.append(current_turn_inference_log)
             total_input_token_count.append(current_turn_input_token_count)
+            total_cached_input_token_count.append(current_turn_cached_input_token_count)
+            total_cache_creation_input_token_count.append(current_turn_cache_creation_input_token_count)
             total_output_token_count.append(current_turn_output_token_count)
             total_latency.append(current_turn_latency)
+            for key in STREAMING_METRIC_KEYS:
+                total_streaming_metrics[key].append(current_turn_streaming_metrics[key])
 
             if not exclude_state_log:
                 state_log = []
@@ -460,6 +521,13 @@ class BaseHandler:
             "latency": total_latency,
             "inference_log": all_inference_log,
         }
+        # Only record the cached (and cache write) input tokens for handlers that make use of provider-side prompt caching
+        if any(sum(total_cached_input_token_count, [])):
+            metadata["cached_input_token_count"] = total_cached_input_token_count
+        if any(sum(total_cache_creation_input_token_count, [])):
+            metadata["cache_creation_input_token_count"] = total_cache_creation_input_token_count
+        if self.stream:
+            metadata.update(total_streaming_metrics)
 
         return all_model_response, metadata
 
@@ -470,7 +538,7 @@ class BaseHandler:
         inference_data = self._compile_tools(inference_data, test_entry)
         inference_data = self.add_first_turn_message_FC(inference_data, test_entry["question"][0])
 
-        api_response, query_latency = self._query_FC(inference_data)
+        api_response, query_latency, time_to_first_token = self._timed_query_FC(inference_data)
 
         # Try parsing the model response
         model_response_data = self._parse_query_response_FC(api_response)
@@ -485,8 +553,14 @@ class BaseHandler:
                 }
             ]
         metadata["input_token_count"] = model_response_data["input_token"]
+        if model_response_data.get("cached_input_token", 0):
+            metadata["cached_input_token_count"] = model_response_data["cached_input_token"]
+        if model_response_data.get("cache_creation_input_token", 0):
+            metadata["cache_creation_input_token_count"] = model_response_data["cache_creation_input_token"]
         metadata["output_token_count"] = model_response_data["output_token"]
         metadata["latency"] = query_latency
+        if self.stream:
+            metadata.update(self._compute_streaming_metrics(query_latency, time_to_first_token, model_response_data["output_token"]))
 
         return model_response_data["model_responses"], metadata
 
@@ -495,7 +569,7 @@ class BaseHandler:
         inference_data: dict = self._pre_query_processing_prompting(test_entry)
         inference_data = self.add_first_turn_message_prompting(inference_data, test_entry["question"][0])
 
-        api_response, query_latency = self._query_prompting(inference_data)
+        api_response, query_latency, time_to_first_token = self._timed_query_prompting(inference_data)
 
         # Try parsing the model response
         model_response_data = self._parse_query_response_prompting(api_response)
@@ -510,11 +584,294 @@ class BaseHandler:
                 }
             ]
         metadata["input_token_count"] = model_response_data["input_token"]
+        if model_response_data.get("cached_input_token", 0):
+            metadata["cached_input_token_count"] = model_response_data["cached_input_token"]
+        if model_response_data.get("cache_creation_input_token", 0):
+            metadata["cache_creation_input_token_count"] = model_response_data["cache_creation_input_token"]
         metadata["output_token_count"] = model_response_data["output_token"]
         metadata["latency"] = query_latency
+        if self.stream:
+            metadata.update(self._compute_streaming_metrics(query_latency, time_to_first_token, model_response_data["output_token"]))
 
         return model_response_data["model_responses"], metadata
 
+    @final
+    def batch_api_inference(
+        self,
+        test_entries: list[dict],
+        include_input_log: bool,
+        result_dir,
+        update_mode: bool,
+        poll_interval: float = BATCH_API_POLL_INTERVAL,
+    ):
+        """
+        Inference for single-turn entries through the provider's asynchronous batch API.
+        All entries are submitted as one batch job; once it completes, the responses are mapped back through `_parse_query_response_*` and written to the result files.
+        Multi-turn entries are not supported, as each step depends on the response to the previous one.
+        """
+        is_fc_model = "FC" in self.model_name or self.is_fc_model
+
+        results: dict[str, dict] = {}
+        batch_requests: dict[str, dict] = {}
+        # Provider custom ids are restricted in length and charset, so we use the position of the entry instead of its id
+        custom_id_to_test_entry: dict[str, dict] = {}
+        custom_id_to_inference_data: dict[str, dict] = {}
+        for index, test_entry in enumerate(test_entries):
+            assert "multi_turn" not in test_entry["id"], "The batch API mode only supports single-turn entries."
+            test_entry = deepcopy(test_entry)
+            custom_id = f"request-{index}"
+            try:
+                if is_fc_model:
+                    inference_data: dict = {}
+                    inference_data = self._pre_query_processing_FC(inference_data, test_entry)
+                    inference_data = self._compile_tools(inference_data, test_entry)
+                    inference_data = self.add_first_turn_message_FC(inference_data, test_entry["question"][0])
+                    batch_requests[custom_id] = self._batch_request_FC(inference_data)
+                else:
+                    inference_data = self._pre_query_processing_prompting(test_entry)
+                    inference_data = self.add_first_turn_message_prompting(inference_data, test_entry["question"][0])
+                    batch_requests[custom_id] = self._batch_request_prompting(inference_data)
+            except Exception as e:
+                print(f"❗️❗️ Test case ID: {test_entry['id']}, Error: {str(e)}")
+                results[test_entry["id"]] = {
+                    "id": test_entry["id"],
+                    "result": f"Error during inference: {str(e)}",
+                }
+                continue
+            custom_id_to_test_entry[custom_id] = test_entry
+            custom_id_to_inference_data[custom_id] = inference_data
+
+        if batch_requests:
+            model_result_dir = result_dir / self.model_name.replace("/", "_")
+            batch_responses = self._run_batch_job(batch_requests, custom_id_to_test_entry, model_result_dir, poll_interval)
+            if batch_responses is None:
+                # The batch job is left to a later run; only the entries that failed before submission are written
+                self.write(list(results.values()), result_dir=result_dir, update_mode=update_mode)
+                return
+
+            for custom_id, test_entry in custom_id_to_test_entry.items():
+                api_response = batch_responses.get(custom_id, None)
+                try:
+                    if api_response is None:
+                        raise RuntimeError("No response returned by the batch job.")
+                    if isinstance(api_response, Exception):
+                        raise api_response
+
+                    if is_fc_model:
+                        model_response_data = self._parse_query_response_FC(api_response)
+                    else:
+                        model_response_data = self._parse_query_response_prompting(api_response)
+                except Exception as e:
+                    print(f"❗️❗️ Test case ID: {test_entry['id']}, Error: {str(e)}")
+                    results[test_entry["id"]] = {
+                        "id": test_entry["id"],
+                        "result": f"Error during inference: {str(e)}",
+                    }
+                    continue
+
+                result_to_write = {
+                    "id": test_entry["id"],
+                    "result": model_response_data["model_responses"],
+                }
+                if include_input_log:
+                    result_to_write["inference_log"] = [
+                        {
+                            "role": "inference_input",
+                            "content": custom_id_to_inference_data[custom_id].get("inference_input_log", ""),
+                        }
+                    ]
+                result_to_write["input_token_count"] = model_response_data["input_token"]
+                if model_response_data.get("cached_input_token", 0):
+                    result_to_write["cached_input_token_count"] = model_response_data["cached_input_token"]
+                if model_response_data.get("cache_creation_input_token", 0):
+                    result_to_write["cache_creation_input_token_count"] = model_response_data[
+                        "cache_creation_input_token"
+                    ]
+                result_to_write["output_token_count"] = model_response_data["output_token"]
+                # No latency is recorded, as batch requests are not served individually
+                results[test_entry["id"]] = result_to_write
+
+        self.write(list(results.values()), result_dir=result_dir, update_mode=update_mode)
+
+    @final
+    def _run_batch_job(
+        self, batch_requests: dict[str, dict], custom_id_to_test_entry: dict[str, dict], model_result_dir, poll_interval: float
+    ) -> dict:
+        """
+        Submit the batch job, or resume the one recorded in the result folder by a previous run for the same entries, and wait for it.
+        The id of the job is recorded in `batch_api_job.json` until its responses are collected, so that an interrupted run can be resumed.
+        Returns the responses by custom id, or None if the job is still pending after `BATCH_API_MAX_WAIT` seconds or can't be reached.
+        """
+        job_file_path = model_result_dir / BATCH_API_JOB_FILE_NAME
+        test_entry_ids = {custom_id: test_entry["id"] for custom_id, test_entry in custom_id_to_test_entry.items()}
+
+        batch_id = None
+        # Custom id in the batch job -> custom id of the same entry in this run, when resuming a job
+        custom_id_mapping = {}
+        if job_file_path.exists():
+            with open(job_file_path) as f:
+                batch_job = json.load(f)
+            if sorted(batch_job["test_entry_ids"].values()) == sorted(test_entry_ids.values()):
+                batch_id = batch_job["batch_id"]
+                # The entries may come in a different order than in the previous run, so they are matched by their id
+                custom_id_by_test_entry_id = {test_entry_id: custom_id for custom_id, test_entry_id in test_entry_ids.items()}
+                custom_id_mapping = {
+                    job_custom_id: custom_id_by_test_entry_id[test_entry_id]
+                    for job_custom_id, test_entry_id in batch_job["test_entry_ids"].items()
+                }
+                print(f"Resuming batch job {batch_id} with {len(batch_requests)} requests for {self.model_name}.")
+            else:
+                print(f"Warning: ignoring the batch job {batch_job['batch_id']} recorded in {job_file_path}, as it was submitted for other entries.")
+
+        if batch_id is None:
+            try:
+                batch_id = self._submit_batch_with_backoff(batch_requests)
+            except Exception as e:
+                # Nothing was submitted, so every request fails with the error
+                print(f"❗️❗️ Failed to submit the batch job for {self.model_name}: {str(e)}")
+                return {custom_id: e for custom_id in batch_requests}
+            model_result_dir.mkdir(parents=True, exist_ok=True)
+            with open(job_file_path, "w") as f:
+                json.dump({"batch_id": batch_id, "model_name": self.model_name, "test_entry_ids": test_entry_ids}, f, indent=4)
+            print(f"Submitted batch job {batch_id} with {len(batch_requests)} requests for {self.model_name}.")
+
+        start_time = time.time()
+        while True:
+            try:
+                batch_responses = self._retrieve_batch_with_backoff(batch_id)
+            except Exception as e:
+                print(
+                    f"❗️❗️ Failed to check the batch job {batch_id} of {self.model_name}: {str(e)}. "
+                    f"Run the same command again to resume it."
+                )
+                return None
+            if batch_responses is not None:
+                break
+            if time.time() - start_time > BATCH_API_MAX_WAIT:
+                print(
+                    f"❗️❗️ The batch job {batch_id} of {self.model_name} is still running after {BATCH_API_MAX_WAIT} seconds. "
+                    f"Run the same command again to resume it."
+                )
+                return None
+            time.sleep(poll_interval)
+        print(f"Batch job {batch_id} completed.")
+
+        job_file_path.unlink(missing_ok=True)
+        if isinstance(batch_responses, BatchJobFailedError):
+            # The job failed as a whole, so every request fails with the error
+            return {custom_id: batch_responses for custom_id in custom_id_to_test_entry}
+        return {custom_id_mapping.get(custom_id, custom_id): response for custom_id, response in batch_responses.items()}
+
+    @retry_with_backoff(error_type=Exception, stop=stop_after_attempt(BATCH_API_MAX_ATTEMPTS), reraise=True)
+    def _submit_batch_with_backoff(self, batch_requests: dict[str, dict]) -> str:
+        return self._submit_batch(batch_requests)
+
+    @retry_with_backoff(error_type=Exception, stop=stop_after_attempt(BATCH_API_MAX_ATTEMPTS), reraise=True)
+    def _retrieve_batch_with_backoff(self, batch_id: str):
+        try:
+            return self._retrieve_batch(batch_id)
+        except BatchJobFailedError as e:
+            # Not a transient error, so it is not retried
+            return e
+
+    @final
+    def supports_streaming(self) -> bool:
+        """
+        Whether the handler implements the streaming query path (`_query_FC_stream` / `_query_prompting_stream`).
+        """
+        return self._implements_streaming_variant(
+            "_query_FC_stream", "_query_FC"
+        ) or self._implements_streaming_variant("_query_prompting_stream", "_query_prompting")
+
+    @final
+    def _implements_streaming_variant(self, variant_method_name: str, query_method_name: str) -> bool:
+        """
+        The streaming path belongs to the provider, so a subclass that sets up a different client (in `__init__`) does not inherit it, as for the batch API.
+        The locally-hosted models all query the same local server through the client set up by `OSSHandler`, so only their query method matters.
+        """
+        if getattr(self, "model_style", None) == ModelStyle.OSSMODEL:
+            return self._implements_query_variant(variant_method_name, query_method_name)
+        return self._implements_query_variant(variant_method_name, query_method_name, "__init__")
+
+    @final
+    def supports_batch_api(self) -> bool:
+        """
+        Whether the handler implements the provider batch API path (`_batch_request_*`, `_submit_batch` and `_retrieve_batch`).
+        """
+        if "FC" in self.model_name or self.is_fc_model:
+            request_method_name, query_method_name = "_batch_request_FC", "_query_FC"
+        else:
+            request_method_name, query_method_name = "_batch_request_prompting", "_query_prompting"
+        # The batch API belongs to the provider, so a subclass that sets up a different client (in `__init__`) does not inherit it
+        return self._implements_query_variant(
+            request_method_name, query_method_name, "__init__"
+        ) and self._implements_query_variant("_submit_batch", "__init__")
+
+    @final
+    def _implements_query_variant(self, variant_method_name: str, *base_method_names: str) -> bool:
+        """
+        Whether the optional `variant_method_name` is implemented at least as deep in the class hierarchy as each of `base_method_names`.
+        A subclass that overrides the blocking query (eg, to talk to a different endpoint) without overriding the variant keeps using the blocking path.
+        """
+        mro = type(self).__mro__
+        variant_owner = next(cls for cls in mro if variant_method_name in cls.__dict__)
+        if variant_owner is BaseHandler:
+            return False
+        for base_method_name in base_method_names:
+            base_owner = next(cls for cls in mro if base_method_name in cls.__dict__)
+            if not issubclass(variant_owner, base_owner):
+                return False
+        return True
+
+    @final
+    def _timed_query_FC(self, inference_data: dict) -> tuple[any, float, float]:
+        """
+        Query the model in FC mode, through the streaming path if streaming is enabled and supported.
+        Returns the API response, the end-to-end latency, and the time to first token (None if not streamed).
+        """
+        with track_query(self):
+            if self.stream and self._implements_streaming_variant("_query_FC_stream", "_query_FC"):
+                return self._query_FC_stream(inference_data)
+            api_response, query_latency = self._query_FC(inference_data)
+        return api_response, query_latency, None
+
+    @final
+    def _timed_query_prompting(self, inference_data: dict) -> tuple[any, float, float]:
+        """
+        Query the model in prompting mode, through the streaming path if streaming is enabled and supported.
+        Returns the API response, the end-to-end latency, and the time to first token (None if not streamed).
+        """
+        with track_query(self):
+            if self.stream and self._implements_streaming_variant(
+                "_query_prompting_stream", "_query_prompting"
+            ):
+                return self._query_prompting_stream(inference_data)
+            api_response, query_latency = self._query_prompting(inference_data)
+        return api_response, query_latency, None
+
+    @staticmethod
+    def _compute_streaming_metrics(query_latency: float, time_to_first_token: float, output_token_count: int) -> dict:
+        """
+        Derive the decode-speed metrics of one query from its end-to-end latency, time to first token and output token count.
+        All metrics are None when the query was not streamed.
+        """
+        if time_to_first_token is None:
+            return {key: None for key in STREAMING_METRIC_KEYS}
+
+        decode_time = max(query_latency - time_to_first_token, 0)
+        inter_token_latency = None
+        output_tokens_per_second = None
+        if output_token_count and output_token_count > 1:
+            inter_token_latency = decode_time / (output_token_count - 1)
+        if output_token_count and decode_time > 0:
+            output_tokens_per_second = output_token_count / decode_time
+
+        return {
+            "time_to_first_token": time_to_first_token,
+            "inter_token_latency": inter_token_latency,
+            "output_tokens_per_second": output_tokens_per_second,
+        }
+
     def decode_ast(self, result, language="Python"):
         """
         This method takes raw model output (from `_parse_query_response_xxx`) and convert it to standard AST checker input.
@@ -527,6 +884,94 @@ class BaseHandler:
         """
         raise NotImplementedError
 
+    def may_contain_function_call(self, result) -> bool:
+        """
+        [Optional] Cheaply tell whether the raw model output may contain a function call, without decoding it.
+        It must only return False when `decode_ast` (in Python) would fail or return no function call; when in doubt, return True.
+        It is only used by the class that also defines `decode_ast`, as it is tied to that output format.
+        """
+        return True
+
+    @final
+    def batch_may_contain_function_call(self, results: list) -> list[bool]:
+        """
+        Run the `may_contain_function_call` pre-pass over all the raw model outputs of a result file.
+        """
+        # A subclass that changes `decode_ast` but not `may_contain_function_call` would inherit a check written for another output format
+        if _get_defining_class(type(self), "may_contain_function_call") is not _get_defining_class(type(self), "decode_ast"):
+            return [True] * len(results)
+        return [self.may_contain_function_call(result) for result in results]
+
+    @final
+    def batch_decode_ast(self, results: list, language="Python", num_processes: int = 1) -> list:
+        """
+        Run `decode_ast` over a whole list of raw model outputs (eg, all the entries of a result file).
+        Returns, for each raw model output, either the decoded output or the exception raised while decoding it.
+        """
+        return self._batch_decode("decode_ast", results, (language,), num_processes)
+
+    @final
+    def batch_decode_execute(self, results: list, num_processes: int = 1) -> list:
+        """
+        Run `decode_execute` over a whole list of raw model outputs (eg, all the steps of a result file).
+        Returns, for each raw model output, either the decoded output or the exception raised while decoding it.
+        """
+        return self._batch_decode("decode_execute", results, (), num_processes)
+
+    @final
+    def _batch_decode(self, decode_method_name: str, results: list, decode_args: tuple, num_processes: int) -> list:
+        """
+        Identical raw model outputs are only decoded once.
+        With `num_processes` > 1, the decoding is spread over a process pool, where each worker process sets up its own instance of the handler.
+        """
+        unique_results = []
+        result_indices = []
+        index_by_key = {}
+        for result in results:
+            try:
+                key = json.dumps(result)
+            except (TypeError, ValueError):
+                # Not JSON serializable, so we can't tell whether it is a duplicate
+                key = None
+            if key is None or key not in index_by_key:
+                if key is not None:
+                    index_by_key[key] = len(unique_results)
+                result_indices.append(len(unique_results))
+                unique_results.append(result)
+            else:
+                result_indices.append(index_by_key[key])
+
+        if num_processes > 1 and len(unique_results) > 1:
+            with ProcessPoolExecutor(
+                max_workers=num_processes,
+                initializer=_init_decode_worker,
+                initargs=(type(self), self.model_name, self.temperature, is_profiling(), get_profile_category()),
+            ) as executor:
+                decoded_results = []
+                for decoded_result, worker_profile in executor.map(
+                    _decode_in_worker,
+                    [(decode_method_name, result, decode_args) for result in unique_results],
+                    chunksize=max(len(unique_results) // (num_processes * 4), 1),
+                ):
+                    decoded_results.append(decoded_result)
+                    merge_worker_profile(worker_profile)
+        else:
+            decoded_results = [
+                _decode_or_error(self, decode_method_name, result, decode_args)
+                for result in unique_results
+            ]
+
+        # Duplicates get their own copy, so that the callers can safely modify the decoded outputs
+        outputs = []
+        seen_indices = set()
+        for index in result_indices:
+            if index in seen_indices:
+                outputs.append(deepcopy(decoded_results[index]))
+            else:
+                seen_indices.add(index)
+                outputs.append(decoded_results[index])
+        return outputs
+
     @final
     def write(self, result, result_dir, update_mode=False):
         model_name_dir = self.model_name.replace("/", "_")
@@ -536,40 +981,64 @@ class BaseHandler:
         if isinstance(result, dict):
             result = [result]
 
-        # Collect and format each entry for JSON compatibility
-        entries_to_write = [make_json_serializable(entry) for entry in result]
-
-        # Group entries by their `test_category` for efficient file handling
+        # Serialize each entry once, and group them by their `test_category` for efficient file handling
         file_entries = {}
-        for entry in entries_to_write:
+        for entry in result:
             test_category = entry["id"].rsplit("_", 1)[0]
             file_name = f"{VERSION_PREFIX}_{test_category}_result.json"
             file_path = model_result_dir / file_name
-            file_entries.setdefault(file_path, []).append(entry)
+            file_entries.setdefault(file_path, []).append((entry["id"], json_dumps_serializable(entry)))
 
         for file_path, entries in file_entries.items():
             if update_mode:
-                # Load existing entries from the file
+                # Load existing entries from the file; they are already serialized, so their lines are written back as is
                 existing_entries = {}
                 if file_path.exists():
-                    existing_entries = {entry["id"]: entry for entry in load_file(file_path)}
+                    with open(file_path) as f:
+                        for line in f:
+                            existing_entries[json.loads(line)["id"]] = line.rstrip("\n")
 
                 # Update existing entries with new data
-                for entry in entries:
-                    existing_entries[entry["id"]] = entry
+                for entry_id, json_str in entries:
+                    existing_entries[entry_id] = json_str
 
                 # Sort entries by `id` and write them back to ensure order consistency
-                sorted_entries = sorted(existing_entries.values(), key=sort_key)
+                sorted_entries = sorted(existing_entries.items(), key=lambda item: sort_key({"id": item[0]}))
                 with open(file_path, "w") as f:
-                    for entry in sorted_entries:
-                        f.write(json.dumps(entry) + "\n")
+                    for _, json_str in sorted_entries:
+                        f.write(json_str + "\n")
 
             else:
                 # Normal mode: Append in sorted order
-                entries.sort(key=sort_key)
+                entries.sort(key=lambda item: sort_key({"id": item[0]}))
                 with open(file_path, "a") as f:
-                    for entry in entries:
-                        f.write(json.dumps(entry) + "\n")
+                    for _, json_str in entries:
+                        f.write(json_str + "\n")
+
+    #### Batch API methods ####
+
+    def _submit_batch(self, batch_requests: dict[str, dict]) -> str:
+        """
+        [Optional] Submit a batch job to the provider's batch API.
+
+        Args:
+            batch_requests (dict[str, dict]): A mapping from the custom id of each request to the request built by `_batch_request_FC` or `_batch_request_prompting`.
+
+        Returns:
+            The id of the batch job.
+        """
+        raise NotImplementedError
+
+    def _retrieve_batch(self, batch_id: str) -> dict:
+        """
+        [Optional] Check the status of a batch job submitted by `_submit_batch`.
+
+        Returns:
+            None if the job is still running. Otherwise, a mapping from the custom id of each request to its response, in the same form as the one returned by `_query_FC` or `_query_prompting`, so that it can be fed into the `_parse_query_response_xxx` methods.
+            Requests that failed, or were left unfinished when the job expired or was cancelled, are mapped to an Exception instead (or left out).
+            Raise a `BatchJobFailedError` if the job as a whole failed; any other error is considered transient, and retried with backoff.
+        """
+        raise NotImplementedError
 
     #### FC methods ####
 
@@ -580,6 +1049,20 @@ class BaseHandler:
         """
         raise NotImplementedError
 
+    def _query_FC_stream(self, inference_data: dict):
+        """
+        [Optional] Streaming version of `_query_FC`, used when streaming is enabled (`--stream`).
+        Return a tuple of (api_response, query_latency, time_to_first_token). The `api_response` must be in the same form as the one returned by `_query_FC`, so that it can be fed into the `_parse_query_response_FC` method.
+        """
+        raise NotImplementedError
+
+    def _batch_request_FC(self, inference_data: dict) -> dict:
+        """
+        [Optional] Build the request for one entry of a batch job (`--batch-api`), from the same `inference_data` that `_query_FC` would send.
+        The request must be JSON serializable, in the format expected by `_submit_batch`.
+        """
+        raise NotImplementedError
+
     def _pre_query_processing_FC(self, inference_data: dict, test_entry: dict) -> dict:
         """
         Preprocess the testset entry before sending it to the model.
@@ -611,6 +1094,8 @@ class BaseHandler:
                 - model_responses (any): The parsed result that can be directly used as input to the decode method.
                 - input_token (int): The number of tokens used in the input to the model.
                 - output_token (int): The number of tokens generated by the model as output.
+                - cached_input_token (int): The number of input tokens served from the provider's prompt cache (already included in `input_token`). Optional.
+                - cache_creation_input_token (int): The number of input tokens written to the provider's prompt cache (already included in `input_token`). Optional.
                 - tool_call_ids (list[str]): The IDs of the tool calls that are generated by the model. Optional.
                 - Any other metadata that is specific to the model.
         """
@@ -662,6 +1147,20 @@ class BaseHandler:
         """
         raise NotImplementedError
 
+    def _query_prompting_stream(self, inference_data: dict):
+        """
+        [Optional] Streaming version of `_query_prompting`, used when streaming is enabled (`--stream`).
+        Return a tuple of (api_response, query_latency, time_to_first_token). The `api_response` must be in the same form as the one returned by `_query_prompting`, so that it can be fed into the `_parse_query_response_prompting` method.
+        """
+        raise NotImplementedError
+
+    def _batch_request_prompting(self, inference_data: dict) -> dict:
+        """
+        [Optional] Build the request for one entry of a batch job (`--batch-api`), from the same `inference_data` that `_query_prompting` would send.
+        The request must be JSON serializable, in the format expected by `_submit_batch`.
+        """
+        raise NotImplementedError
+
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
         """
         Preprocess the testset entry before sending it to the model.
@@ -686,6 +1185,8 @@ class BaseHandler:
                 - model_responses (any): The parsed result that can be directly used as input to the decode method.
                 - input_token (int): The number of tokens used in the input to the model.
                 - output_token (int): The number of tokens generated by the model as output.
+                - cached_input_token (int): The number of input tokens served from the provider's prompt cache (already included in `input_token`). Optional.
+                - cache_creation_input_token (int): The number of input tokens written to the provider's prompt cache (already included in `input_token`). Optional.
                 - Any other metadata that is specific to the model.
         """
         raise NotImplementedError
@@ -726,3 +1227,42 @@ class BaseHandler:
         By default, execution results are added back as a `user` role message, as most models don't support the `tool` role in prompting mode.
         """
         raise NotImplementedError
+
+
+#### Batch decoding helpers ####
+
+# The handler instance of a decoding worker process, set up by `_init_decode_worker`
+_decode_worker_handler: BaseHandler = None
+
+
+def _init_decode_worker(handler_class: type, model_name: str, temperature: float, profiling: bool, test_category: str) -> None:
+    global _decode_worker_handler
+    init_worker_profiler(profiling, test_category)
+    _decode_worker_handler = instrument_handler(handler_class(model_name, temperature))
+
+
+def _decode_in_worker(decode_task: tuple):
+    decode_method_name, result, decode_args = decode_task
+    decoded_result = _decode_or_error(_decode_worker_handler, decode_method_name, result, decode_args)
+    if isinstance(decoded_result, Exception):
+        # The exception is sent back to the main process, so it has to survive pickling
+        try:
+            pickle.dumps(decoded_result)
+        except Exception:
+            decoded_result = Exception(str(decoded_result))
+    # The span timings of the worker are merged into the profiler of the main process, if any
+    return decoded_result, collect_worker_profile()
+
+
+def _decode_or_error(handler: BaseHandler, decode_method_name: str, result, decode_args: tuple):
+    try:
+        return getattr(handler, decode_method_name)(result, *decode_args)
+    except Exception as e:
+        return e
+
+
+def _get_defining_class(cls: type, attribute_name: str) -> type:
+    for klass in cls.__mro__:
+        if attribute_name in klass.__dict__:
+            return klass
+    return None
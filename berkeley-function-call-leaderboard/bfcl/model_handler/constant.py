@@ -1,5 +1,23 @@
 MAXIMUM_STEP_LIMIT = 20
 
+# Per-query metrics recorded in the result metadata when the model is queried in streaming mode
+STREAMING_METRIC_KEYS = ["time_to_first_token", "inter_token_latency", "output_tokens_per_second"]
+
+# Seconds to wait between two status checks of a provider batch job
+BATCH_API_POLL_INTERVAL = 30
+# Seconds to wait for a provider batch job before leaving it to a later run; the providers complete or expire their jobs within 24 hours
+BATCH_API_MAX_WAIT = 25 * 60 * 60
+# Number of attempts of each call to a provider batch API, retried with backoff on transient errors
+BATCH_API_MAX_ATTEMPTS = 5
+# File, in the result folder of the model, recording the pending batch job so that a later run can resume it
+BATCH_API_JOB_FILE_NAME = "batch_api_job.json"
+
+# Maximum number of distinct raw model outputs kept in the `ast_parse` cache
+AST_PARSE_CACHE_SIZE = 20000
+
+# Maximum number of function doc sets kept in the `convert_to_tool` cache
+COMPILED_TOOL_CACHE_SIZE = 1000
+
 DEFAULT_SYSTEM_PROMPT_WITHOUT_FUNC_DOC = """You are an expert in composing functions. You are given a question and a set of possible functions. Based on the question, you will need to make one or more function/tool calls to achieve the purpose.
 If none of the functions can be used, point it out. If the given question lacks the parameters required by the function, also point it out.
 You should only return the function calls in your response.
@@ -9,13 +9,18 @@ from bfcl.constant import RESULT_PATH
 from bfcl.model_handler.base_handler import BaseHandler
 from bfcl.model_handler.model_style import ModelStyle
 from bfcl.model_handler.local_inference.constant import VLLM_PORT
+from bfcl.metrics_exporter import record_entry_completed
+from bfcl.profiling import set_profile_category
 from bfcl.model_handler.utils import (
     default_decode_ast_prompting,
     default_decode_execute_prompting,
     func_doc_language_specific_pre_processing,
+    get_usage_token_counts,
+    may_contain_function_call_prompting,
     system_prompt_pre_processing_chat_model,
 )
 from openai import OpenAI
+from openai.types import Completion
 from overrides import EnforceOverrides, final, override
 from tqdm import tqdm
 
@@ -53,6 +58,10 @@ class OSSHandler(BaseHandler, EnforceOverrides):
     def decode_execute(self, result):
         return default_decode_execute_prompting(result)
 
+    @override
+    def may_contain_function_call(self, result) -> bool:
+        return may_contain_function_call_prompting(result)
+
     @final
     def batch_inference(
         self,
@@ -239,6 +248,8 @@ class OSSHandler(BaseHandler, EnforceOverrides):
         """
         assert type(test_case["function"]) is list
 
+        set_profile_category(test_case["id"].rsplit("_", 1)[0])
+
         try:
             if "multi_turn" in test_case["id"]:
                 model_responses, metadata = self.inference_multi_turn_prompting(
@@ -264,6 +275,7 @@ class OSSHandler(BaseHandler, EnforceOverrides):
             "result": model_responses,
         }
         result_to_write.update(metadata)
+        record_entry_completed(self, result_to_write)
 
         return result_to_write
 
@@ -273,18 +285,82 @@ class OSSHandler(BaseHandler, EnforceOverrides):
         """
         Manually apply the chat template to construct the formatted prompt.
         This way, we can have full control over the final formatted prompt and is generally recommended for advanced use cases.
+
+        If the chat template is a plain concatenation of one segment per message, implement `_format_prompt_prefix`, `_format_message` and `_format_generation_prompt` instead of overriding this method.
+        The prompt will then be built incrementally across the steps of a multi-turn entry, instead of re-rendering the whole chat history on every query.
+        """
+        return (
+            self._format_prompt_prefix(function)
+            + "".join(self._format_message(message) for message in messages)
+            + self._format_generation_prompt()
+        )
+
+    def _format_prompt_prefix(self, function):
+        """
+        [Only for incremental prompt formatting]
+        Render everything that comes before the first message, such as the BOS token or the tool descriptions.
         """
         raise NotImplementedError(
             "OSS Models should implement their own prompt formatting."
         )
 
-    @override
-    def _query_prompting(self, inference_data: dict):
-        # We use the OpenAI Completions API
+    def _format_message(self, message):
+        """
+        [Only for incremental prompt formatting]
+        Render a single message. The output must only depend on the message itself, not on its neighbours.
+        """
+        raise NotImplementedError(
+            "OSS Models should implement their own prompt formatting."
+        )
+
+    def _format_generation_prompt(self):
+        """
+        [Only for incremental prompt formatting]
+        Render the trailing generation prompt that asks the model to respond as the assistant.
+        """
+        raise NotImplementedError(
+            "OSS Models should implement their own prompt formatting."
+        )
+
+    @final
+    def _build_formatted_prompt(self, inference_data: dict) -> str:
+        """
+        Build the formatted prompt for the current query.
+        For handlers that use the incremental formatting hooks, the rendered prefix and message segments are cached in `inference_data`, so each step only renders the messages added since the previous query.
+        The chat history is append-only, so the cached segments stay valid for the whole entry.
+        """
         function: list[dict] = inference_data["function"]
         message: list[dict] = inference_data["message"]
 
-        formatted_prompt: str = self._format_prompt(message, function)
+        # Handlers that override `_format_prompt` need the full chat history to render the prompt
+        if type(self)._format_prompt is not OSSHandler._format_prompt:
+            return self._format_prompt(message, function)
+
+        prompt_cache = inference_data.get("formatted_prompt_cache")
+        if (
+            prompt_cache is None
+            or prompt_cache["function"] is not function
+            or prompt_cache["num_messages"] > len(message)
+        ):
+            prompt_cache = {
+                "function": function,
+                "num_messages": 0,
+                "segments": [self._format_prompt_prefix(function)],
+            }
+            inference_data["formatted_prompt_cache"] = prompt_cache
+
+        for new_message in message[prompt_cache["num_messages"] :]:
+            prompt_cache["segments"].append(self._format_message(new_message))
+        prompt_cache["num_messages"] = len(message)
+
+        return "".join(prompt_cache["segments"]) + self._format_generation_prompt()
+
+    @final
+    def _build_completion_request(self, inference_data: dict) -> dict:
+        """
+        Build the keyword arguments of the Completions API request for the current state of the conversation.
+        """
+        formatted_prompt: str = self._build_formatted_prompt(inference_data)
         inference_data["inference_input_log"] = {"formatted_prompt": formatted_prompt}
 
         # Tokenize the formatted prompt to get token count
@@ -306,26 +382,76 @@ class OSSHandler(BaseHandler, EnforceOverrides):
         if hasattr(self, "skip_special_tokens"):
             extra_body["skip_special_tokens"] = self.skip_special_tokens
 
-        start_time = time.time()
+        request = {
+            "model": self.model_name_huggingface,
+            "temperature": self.temperature,
+            "prompt": formatted_prompt,
+            "max_tokens": leftover_tokens_count,
+        }
         if len(extra_body) > 0:
-            api_response = self.client.completions.create(
-                model=self.model_name_huggingface,
-                temperature=self.temperature,
-                prompt=formatted_prompt,
-                max_tokens=leftover_tokens_count,
-                extra_body=extra_body,
-            )
-        else:
-            api_response = self.client.completions.create(
-                model=self.model_name_huggingface,
-                temperature=self.temperature,
-                prompt=formatted_prompt,
-                max_tokens=leftover_tokens_count,
-            )
+            request["extra_body"] = extra_body
+
+        return request
+
+    @override
+    def _query_prompting(self, inference_data: dict):
+        # We use the OpenAI Completions API
+        request = self._build_completion_request(inference_data)
+
+        start_time = time.time()
+        api_response = self.client.completions.create(**request)
         end_time = time.time()
 
         return api_response, end_time - start_time
 
+    @override
+    def _query_prompting_stream(self, inference_data: dict):
+        request = self._build_completion_request(inference_data)
+
+        start_time = time.time()
+        time_to_first_token = None
+        text_parts = []
+        finish_reason = "stop"
+        usage = None
+        stream = self.client.completions.create(
+            stream=True, stream_options={"include_usage": True}, **request
+        )
+        for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage.model_dump()
+            if not chunk.choices:
+                continue
+            if chunk.choices[0].text:
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                text_parts.append(chunk.choices[0].text)
+            if chunk.choices[0].finish_reason is not None:
+                finish_reason = chunk.choices[0].finish_reason
+        end_time = time.time()
+
+        if time_to_first_token is None:
+            time_to_first_token = end_time - start_time
+
+        # Merge the chunks back into a regular Completion so that it can be parsed as usual
+        api_response = Completion.model_validate(
+            {
+                "id": "",
+                "object": "text_completion",
+                "created": int(start_time),
+                "model": self.model_name_huggingface,
+                "choices": [
+                    {
+                        "index": 0,
+                        "text": "".join(text_parts),
+                        "finish_reason": finish_reason,
+                    }
+                ],
+                "usage": usage,
+            }
+        )
+
+        return api_response, end_time - start_time, time_to_first_token
+
     @override
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
         functions: list = test_entry["function"]
@@ -341,10 +467,11 @@ class OSSHandler(BaseHandler, EnforceOverrides):
 
     @override
     def _parse_query_response_prompting(self, api_response: any) -> dict:
+        input_token_count, output_token_count = get_usage_token_counts(api_response.usage)
         return {
             "model_responses": api_response.choices[0].text,
-            "input_token": api_response.usage.prompt_tokens,
-            "output_token": api_response.usage.completion_tokens,
+            "input_token": input_token_count,
+            "output_token": output_token_count,
         }
 
     @override
@@ -7,6 +7,7 @@ from bfcl.model_handler.utils import (
     convert_system_prompt_into_user_prompt,
     convert_to_function_call,
     func_doc_language_specific_pre_processing,
+    get_usage_token_counts,
 )
 from overrides import override
 
@@ -163,11 +164,12 @@ class DeepseekCoderHandler(OSSHandler):
                 "content": api_response.choices[0].text,
             }
 
+        input_token_count, output_token_count = get_usage_token_counts(api_response.usage)
         return {
             "model_responses": model_responses,
             "model_responses_message_for_chat_history": model_responses_message_for_chat_history,
-            "input_token": api_response.usage.prompt_tokens,
-            "output_token": api_response.usage.completion_tokens,
+            "input_token": input_token_count,
+            "output_token": output_token_count,
         }
 
     @override
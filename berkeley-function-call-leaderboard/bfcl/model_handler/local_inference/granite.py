@@ -15,7 +15,7 @@ class GraniteHandler(OSSHandler):
         super().__init__(model_name, temperature)
 
     @override
-    def _format_prompt(self, messages, function):
+    def _format_prompt_prefix(self, function):
         """
         "chat_template": "{% set function_str = messages.get('functions_str', {}) %}\n{% set query = messages['query'] %}\n{% set sys_prompt = 'You are a helpful assistant with access to the following function calls. Your task is to produce a sequence of function calls necessary to generate response to the user utterance. Use the following function calls as required. ' %}\n{% set funcstr = function_str|join('\n') %}\n{{ 'SYSTEM: ' + sys_prompt + '\n<|function_call_library|>\n' + funcstr + '\n\nIf none of the functions are relevant or the given question lacks the parameters required by the function, please output \"<function_call> {\"name\": \"no_function\", \"arguments\": {}}\".\n\nUSER: ' + query}}\n{% if add_generation_prompt %}\n{{ 'ASSISTANT:' }}{% endif %}",
         """
@@ -35,12 +35,15 @@ class GraniteHandler(OSSHandler):
         functions_str = "\n".join([json.dumps(func) for func in function])
         prompt_str = prompt_str.replace("{functions_str}", functions_str)
 
-        for message in messages:
-            prompt_str += f"{message['role'].upper()}:\n{message['content']}\n\n"
+        return prompt_str
 
-        prompt_str += "ASSISTANT: "
+    @override
+    def _format_message(self, message):
+        return f"{message['role'].upper()}:\n{message['content']}\n\n"
 
-        return prompt_str
+    @override
+    def _format_generation_prompt(self):
+        return "ASSISTANT: "
 
     @override
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
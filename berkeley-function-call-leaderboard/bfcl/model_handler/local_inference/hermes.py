@@ -19,7 +19,7 @@ class HermesHandler(OSSHandler):
             self.dtype = "float16"
 
     @override
-    def _format_prompt(self, messages, function):
+    def _format_prompt_prefix(self, function):
         # Hermes use Langchain to OpenAI conversion. It does not use tool call but function call.
         function = convert_to_tool(function, GORILLA_TO_OPENAPI, ModelStyle.OSSMODEL)
         pydantic_format = """{"properties": {"arguments": {"title": "Arguments", "type": "object"}, "name": {"title": "Name", "type": "string"}}, "required": ["arguments", "name"], "title": "FunctionCall", "type": "object"}"""
@@ -46,14 +46,15 @@ class HermesHandler(OSSHandler):
             tool_call_format=tool_call_format,
         )
 
-        for message in messages:
-            formatted_prompt += (
-                f"<|im_start|>{message['role']}\n{message['content']}<|im_end|>\n"
-            )
+        return formatted_prompt
 
-        formatted_prompt += "<|im_start|>assistant\n"
+    @override
+    def _format_message(self, message):
+        return f"<|im_start|>{message['role']}\n{message['content']}<|im_end|>\n"
 
-        return formatted_prompt
+    @override
+    def _format_generation_prompt(self):
+        return "<|im_start|>assistant\n"
 
     @override
     def decode_ast(self, result, language="Python"):
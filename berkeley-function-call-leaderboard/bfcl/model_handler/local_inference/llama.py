@@ -10,12 +10,13 @@ class LlamaHandler(OSSHandler):
         super().__init__(model_name, temperature)
 
     @override
-    def _format_prompt(self, messages, function):
-        formatted_prompt = "<|begin_of_text|>"
+    def _format_prompt_prefix(self, function):
+        return "<|begin_of_text|>"
 
-        for message in messages:
-            formatted_prompt += f"<|start_header_id|>{message['role']}<|end_header_id|>\n\n{message['content'].strip()}<|eot_id|>"
-
-        formatted_prompt += f"<|start_header_id|>assistant<|end_header_id|>\n\n"
+    @override
+    def _format_message(self, message):
+        return f"<|start_header_id|>{message['role']}<|end_header_id|>\n\n{message['content'].strip()}<|eot_id|>"
 
-        return formatted_prompt
+    @override
+    def _format_generation_prompt(self):
+        return f"<|start_header_id|>assistant<|end_header_id|>\n\n"
@@ -6,6 +6,7 @@ from bfcl.model_handler.local_inference.base_oss_handler import OSSHandler
 from bfcl.model_handler.utils import (
     convert_to_function_call,
     func_doc_language_specific_pre_processing,
+    get_usage_token_counts,
 )
 from overrides import override
 
@@ -279,12 +280,13 @@ class MistralFCHandler(OSSHandler):
         except json.JSONDecodeError:
             model_responses_message_for_chat_history = model_responses
 
+        input_token_count, output_token_count = get_usage_token_counts(api_response.usage)
         return {
             "model_responses": model_responses,
             "model_responses_message_for_chat_history": model_responses_message_for_chat_history,
             "tool_call_ids": tool_call_ids,
-            "input_token": api_response.usage.prompt_tokens,
-            "output_token": api_response.usage.completion_tokens,
+            "input_token": input_token_count,
+            "output_token": output_token_count,
         }
 
     @override
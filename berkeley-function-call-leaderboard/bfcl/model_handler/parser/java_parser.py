@@ -1,18 +1,22 @@
-from tree_sitter import Language, Parser
+from tree_sitter import Language
 import tree_sitter_java
 
+from bfcl.model_handler.parser.parser_utils import (
+    ThreadLocalParser,
+    contains_error_node,
+)
+
 JAVA_LANGUAGE = Language(tree_sitter_java.language(), "java")
 
-parser = Parser()
-parser.set_language(JAVA_LANGUAGE)
+# Parsers are not thread-safe, so each thread (eg, of the OSS model inference pool) gets its own
+_parser = ThreadLocalParser(JAVA_LANGUAGE)
 
 
 def parse_java_function_call(source_code):
-    tree = parser.parse(bytes(source_code, "utf8"))
+    tree = _parser.get().parse(bytes(source_code, "utf8"))
     root_node = tree.root_node
-    sexp_result = root_node.sexp()
 
-    if "ERROR" in sexp_result:
+    if contains_error_node(root_node):
         raise Exception("Error parsing java the source code.")
 
     def get_text(node):
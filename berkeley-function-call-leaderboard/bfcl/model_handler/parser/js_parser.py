@@ -1,18 +1,22 @@
-from tree_sitter import Language, Parser
+from tree_sitter import Language
 import tree_sitter_javascript
 
+from bfcl.model_handler.parser.parser_utils import (
+    ThreadLocalParser,
+    contains_error_node,
+)
+
 JS_LANGUAGE = Language(tree_sitter_javascript.language(), "javascript")
 
-parser = Parser()
-parser.set_language(JS_LANGUAGE)
+# Parsers are not thread-safe, so each thread (eg, of the OSS model inference pool) gets its own
+_parser = ThreadLocalParser(JS_LANGUAGE)
 
 
 def parse_javascript_function_call(source_code):
     # Parse the source code
-    tree = parser.parse(bytes(source_code, "utf8"))
+    tree = _parser.get().parse(bytes(source_code, "utf8"))
     root_node = tree.root_node
-    sexp_result = root_node.sexp()
-    if "ERROR" in sexp_result:
+    if contains_error_node(root_node):
         raise Exception("Error js parsing the source code.")
 
     # Function to recursively extract argument details
@@ -0,0 +1,34 @@
+import threading
+
+from tree_sitter import Language, Node, Parser
+
+
+class ThreadLocalParser:
+    """
+    A tree-sitter `Parser` is not thread-safe, so each thread lazily gets its own parser for the language.
+    """
+
+    def __init__(self, language: Language) -> None:
+        self.language = language
+        self._local = threading.local()
+
+    def get(self) -> Parser:
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = Parser()
+            parser.set_language(self.language)
+            self._local.parser = parser
+        return parser
+
+
+def contains_error_node(node: Node) -> bool:
+    """
+    Whether the syntax tree contains an `ERROR` node.
+    The `has_error` flag lets us skip the subtrees without any syntax error, instead of rendering the whole tree into an S-expression.
+    `has_error` is also set for `MISSING` nodes (eg, a missing `;` at the end of the call), which are tolerated, so the flagged subtrees are checked for an actual `ERROR` node.
+    """
+    if not node.has_error:
+        return False
+    if node.type == "ERROR":
+        return True
+    return any(contains_error_node(child) for child in node.children)
@@ -1,10 +1,13 @@
 import ast
 import builtins
 import copy
+import hashlib
 import json
 import operator
 import re
-from functools import reduce
+import threading
+from collections import OrderedDict
+from functools import lru_cache, reduce
 from typing import Callable, Optional, Type
 
 from tenacity import (
@@ -14,7 +17,13 @@ from tenacity import (
     wait_random_exponential,
 )
 
-from bfcl.model_handler.constant import DEFAULT_SYSTEM_PROMPT, GORILLA_TO_OPENAPI
+from bfcl.metrics_exporter import record_retry
+from bfcl.model_handler.constant import (
+    AST_PARSE_CACHE_SIZE,
+    COMPILED_TOOL_CACHE_SIZE,
+    DEFAULT_SYSTEM_PROMPT,
+    GORILLA_TO_OPENAPI,
+)
 from bfcl.model_handler.model_style import ModelStyle
 from bfcl.model_handler.parser.java_parser import parse_java_function_call
 from bfcl.model_handler.parser.js_parser import parse_javascript_function_call
@@ -53,7 +62,84 @@ def _cast_to_openai_type(properties, mapping):
     return properties
 
 
+# Compiled tool lists, keyed by (digest of the function docs, type mapping, model style), least recently used last.
+# The values are the JSON-encoded tool lists, so the cached entries themselves can never be mutated by a caller.
+_COMPILED_TOOL_CACHE: OrderedDict[tuple, str] = OrderedDict()
+# id of a function doc list -> (the objects its digest was computed from, the digest), see `_get_function_docs_digest`
+_FUNCTION_DOCS_DIGESTS: OrderedDict[int, tuple[tuple, str]] = OrderedDict()
+_COMPILED_TOOL_CACHE_LOCK = threading.Lock()
+
+
 def convert_to_tool(functions, mapping, model_style):
+    """
+    Convert the function docs into the tool format expected by the given model style.
+
+    The conversion is memoized on the content of the function docs, so identical doc sets (across entries, turns and holdout recompilations) are only converted once.
+    Every call returns a fresh list decoded from the cached JSON, so callers are free to modify it (eg, to add `cache_control` flags).
+    """
+    functions_digest = _get_function_docs_digest(functions)
+    if functions_digest is None:
+        # Function docs should always be JSON-serializable; if not, skip the cache
+        return _convert_to_tool(functions, mapping, model_style)
+
+    cache_key = (functions_digest, frozenset(mapping.items()), model_style)
+    with _COMPILED_TOOL_CACHE_LOCK:
+        compiled_tools = _COMPILED_TOOL_CACHE.get(cache_key)
+        if compiled_tools is not None:
+            _COMPILED_TOOL_CACHE.move_to_end(cache_key)
+
+    if compiled_tools is None:
+        compiled_tools = json.dumps(_convert_to_tool(functions, mapping, model_style))
+        with _COMPILED_TOOL_CACHE_LOCK:
+            _COMPILED_TOOL_CACHE[cache_key] = compiled_tools
+            if len(_COMPILED_TOOL_CACHE) > COMPILED_TOOL_CACHE_SIZE:
+                _COMPILED_TOOL_CACHE.popitem(last=False)
+
+    return json.loads(compiled_tools)
+
+
+def _get_function_docs_digest(functions):
+    """
+    The digest of the JSON encoding of a function doc list, or None if it is not JSON-serializable.
+
+    The digest is computed once per doc list: the same list is converted again at every step and turn of an entry.
+    The docs are only modified in place by `func_doc_language_specific_pre_processing`, which replaces their description,
+    so the memoized digest is reused as long as the list holds the same docs with the same descriptions and parameters.
+    """
+    doc_objects = None
+    if isinstance(functions, list) and all(isinstance(function, dict) for function in functions):
+        doc_objects = tuple(
+            obj
+            for function in functions
+            for obj in (function, function.get("description"), function.get("parameters"))
+        )
+
+    if doc_objects is not None:
+        with _COMPILED_TOOL_CACHE_LOCK:
+            memoized = _FUNCTION_DOCS_DIGESTS.get(id(functions))
+        if (
+            memoized is not None
+            and len(memoized[0]) == len(doc_objects)
+            and all(a is b for a, b in zip(memoized[0], doc_objects))
+        ):
+            return memoized[1]
+
+    try:
+        functions_digest = hashlib.sha256(json.dumps(functions).encode()).hexdigest()
+    except (TypeError, ValueError):
+        return None
+
+    if doc_objects is not None:
+        with _COMPILED_TOOL_CACHE_LOCK:
+            # The memo keeps the docs alive, so their ids (and the id of the list, checked through them) are not reused
+            _FUNCTION_DOCS_DIGESTS[id(functions)] = (doc_objects, functions_digest)
+            _FUNCTION_DOCS_DIGESTS.move_to_end(id(functions))
+            if len(_FUNCTION_DOCS_DIGESTS) > COMPILED_TOOL_CACHE_SIZE:
+                _FUNCTION_DOCS_DIGESTS.popitem(last=False)
+    return functions_digest
+
+
+def _convert_to_tool(functions, mapping, model_style):
     functions = copy.deepcopy(functions)
     oai_tool = []
     for item in functions:
@@ -207,6 +293,29 @@ def convert_value(value, type_str):
 
 
 def ast_parse(input_str, language="Python"):
+    """
+    Parse the raw model output into a list of function calls.
+    The parse is memoized on (raw text, language), since the same model output gets decoded several times (by `decode_ast` and `decode_execute`, and on every evaluation run).
+    Callers get their own copy of the cached result, and a cached parse failure is raised again.
+    """
+    if not isinstance(input_str, str):
+        return _ast_parse(input_str, language)
+
+    extracted, error = _cached_ast_parse(input_str, language)
+    if error is not None:
+        raise copy.copy(error)
+    return copy.deepcopy(extracted)
+
+
+@lru_cache(maxsize=AST_PARSE_CACHE_SIZE)
+def _cached_ast_parse(input_str: str, language: str) -> tuple[list, Exception]:
+    try:
+        return _ast_parse(input_str, language), None
+    except Exception as e:
+        return None, e
+
+
+def _ast_parse(input_str, language="Python"):
     if language == "Python":
         cleaned_input = input_str.strip("[]'")
         parsed = ast.parse(cleaned_input, mode="eval")
@@ -610,6 +719,30 @@ def format_execution_results_prompting(inference_data: dict, execution_results:
     return repr(tool_results)
 
 
+def may_contain_function_call_prompting(result) -> bool:
+    """
+    Fast check for the prompting output format, decoded with `ast_parse`: without any parenthesis, the output cannot contain a Python function call.
+    """
+    return not isinstance(result, str) or "(" in result
+
+
+def may_contain_function_call_FC(result) -> bool:
+    """
+    Fast check for the function calling output format, a list of `{func_name: arguments}`: a plain text response or an empty list cannot contain a function call.
+    """
+    return not (isinstance(result, str) or (isinstance(result, list) and len(result) == 0))
+
+
+def get_usage_token_counts(usage) -> tuple[int, int]:
+    """
+    The (input, output) token counts of an API response `usage`.
+    A streamed response only has a usage if the endpoint sends a usage chunk, which some OpenAI-compatible endpoints don't; the counts are then 0.
+    """
+    if usage is None:
+        return 0, 0
+    return usage.prompt_tokens or 0, usage.completion_tokens or 0
+
+
 def default_decode_ast_prompting(result, language="Python"):
     result = result.strip("`\n ")
     if not result.startswith("["):
@@ -671,6 +804,14 @@ def decoded_output_to_execution_list(decoded_output):
     return execution_list
 
 
+class BatchJobFailedError(Exception):
+    """
+    Raised by `_retrieve_batch` when a batch job failed as a whole (eg, its input was rejected), as opposed to a transient API error.
+    """
+
+    pass
+
+
 def retry_with_backoff(
     error_type: Optional[Type[Exception]] = None,
     error_message_pattern: Optional[str] = None,
@@ -716,11 +857,7 @@ def retry_with_backoff(
         @retry(
             wait=wait_random_exponential(min=min_wait, max=max_wait),
             retry=retry_policy,
-            before_sleep=lambda retry_state: print(
-                f"Attempt {retry_state.attempt_number} failed. "
-                f"Sleeping for {retry_state.next_action.sleep:.2f} seconds before retrying... "
-                f"Error: {retry_state.outcome.exception()}"
-            ),
+            before_sleep=_before_retry_sleep,
             **kwargs,
         )
         def wrapped(*args, **inner_kwargs):
@@ -729,3 +866,14 @@ def retry_with_backoff(
         return wrapped
 
     return decorator
+
+
+def _before_retry_sleep(retry_state) -> None:
+    print(
+        f"Attempt {retry_state.attempt_number} failed. "
+        f"Sleeping for {retry_state.next_action.sleep:.2f} seconds before retrying... "
+        f"Error: {retry_state.outcome.exception()}"
+    )
+    # The decorated functions are handler methods, so the handler is the first argument
+    if retry_state.args and hasattr(retry_state.args[0], "model_name"):
+        record_retry(retry_state.args[0], retry_state.outcome.exception())
@@ -0,0 +1,259 @@
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from functools import wraps
+from pathlib import Path
+
+# Seconds between two stack samples of the sampling profiler
+PROFILE_SAMPLE_INTERVAL = 0.01
+
+# The handler methods timed by `instrument_handler`, by name prefix
+PROFILED_HANDLER_METHOD_PREFIXES = (
+    "_pre_query_processing_",
+    "_compile_tools",
+    "_query_",
+    "_parse_query_response_",
+    "decode_",
+    "write",
+)
+
+PROFILE_METRICS_FILE_NAME = "profile_metrics.json"
+PROFILE_STACKS_FILE_NAME = "profile_stacks.txt"
+
+# When set, with `set_profiler`, the spans of the hot paths are timed by this profiler
+_profiler = None
+
+# The test category the current thread is working on, see `set_profile_category`
+_thread_state = threading.local()
+
+_NULL_SPAN = nullcontext()
+
+
+def set_profiler(profiler) -> None:
+    global _profiler
+    _profiler = profiler
+
+
+def set_profile_category(test_category: str) -> None:
+    """
+    Attribute the spans of the current thread to `test_category`, until it is set again.
+    """
+    _thread_state.test_category = test_category
+
+
+def get_profile_category() -> str:
+    return getattr(_thread_state, "test_category", None)
+
+
+def init_worker_profiler(enabled: bool, test_category: str = None) -> None:
+    """
+    Set up the profiling of a worker process (eg, in the initializer of a process pool).
+    With `enabled`, which should be whether the parent process is profiled, the spans of the worker are timed by its own profiler,
+    to be sent back with each task result by `collect_worker_profile` and merged into the parent's profiler by `merge_worker_profile`.
+    """
+    set_profiler(PhaseProfiler() if enabled else None)
+    set_profile_category(test_category)
+
+
+def is_profiling() -> bool:
+    return _profiler is not None
+
+
+def collect_worker_profile():
+    """
+    The span timings recorded in this worker process since the last call, or None when it is not profiled.
+    """
+    if _profiler is None:
+        return None
+    return _profiler.drain_stats()
+
+
+def merge_worker_profile(stats) -> None:
+    if _profiler is not None and stats:
+        _profiler.merge_stats(stats)
+
+
+def profile_span(phase: str):
+    """
+    A context manager timing the enclosed block as one span of `phase`. It does nothing unless a profiler is set.
+    """
+    if _profiler is None:
+        return _NULL_SPAN
+    return _Span(_profiler, phase)
+
+
+def instrument_handler(handler):
+    """
+    Time every call of the hot-path methods of `handler` (see `PROFILED_HANDLER_METHOD_PREFIXES`), whatever subclass implements them.
+    The methods are wrapped on the instance itself, so the handler class is left untouched. Returns the handler as is when no profiler is set.
+    """
+    if _profiler is None:
+        return handler
+    for method_name in dir(type(handler)):
+        if not method_name.startswith(PROFILED_HANDLER_METHOD_PREFIXES):
+            continue
+        method = getattr(handler, method_name, None)
+        if callable(method):
+            setattr(handler, method_name, _timed_method(method, method_name))
+    return handler
+
+
+class PhaseProfiler:
+    """
+    Aggregate the duration of the spans per phase, and per test category, across all the threads of the process and the worker processes it merges (see `merge_worker_profile`).
+    Spans are inclusive: the time of a span nested in another one is counted in both phases.
+    The spans of concurrent threads and worker processes add up, so the total of a phase can exceed the wall time.
+    Optionally, the call stacks of every thread are also sampled at a fixed interval, to show where the time goes within the phases.
+    """
+
+    def __init__(self, sample_interval: float = None) -> None:
+        """
+        Args:
+            sample_interval (float, optional): Seconds between two stack samples. Defaults to None, which disables the sampling.
+        """
+        self.lock = threading.Lock()
+        # (phase, test category) -> [count, total seconds, max seconds]
+        self.stats = {}
+        self.start_time = time.perf_counter()
+        self.sampler = _StackSampler(sample_interval) if sample_interval else None
+        if self.sampler is not None:
+            self.sampler.start()
+
+    def record(self, phase: str, duration: float) -> None:
+        key = (phase, getattr(_thread_state, "test_category", None))
+        with self.lock:
+            stat = self.stats.get(key)
+            if stat is None:
+                self.stats[key] = [1, duration, duration]
+            else:
+                stat[0] += 1
+                stat[1] += duration
+                if duration > stat[2]:
+                    stat[2] = duration
+
+    def drain_stats(self) -> dict:
+        with self.lock:
+            stats, self.stats = self.stats, {}
+        return stats
+
+    def merge_stats(self, stats: dict) -> None:
+        with self.lock:
+            for key, (count, total, maximum) in stats.items():
+                stat = self.stats.get(key)
+                if stat is None:
+                    self.stats[key] = [count, total, maximum]
+                else:
+                    stat[0] += count
+                    stat[1] += total
+                    if maximum > stat[2]:
+                        stat[2] = maximum
+
+    def summary(self) -> dict:
+        phases = {}
+        categories = {}
+        with self.lock:
+            stats = {key: list(stat) for key, stat in self.stats.items()}
+        for (phase, test_category), (count, total, maximum) in stats.items():
+            phase_stat = phases.setdefault(phase, [0, 0.0, 0.0])
+            phase_stat[0] += count
+            phase_stat[1] += total
+            phase_stat[2] = max(phase_stat[2], maximum)
+            if test_category is not None:
+                categories.setdefault(test_category, {})[phase] = (count, total, maximum)
+
+        return {
+            "wall_time_seconds": round(time.perf_counter() - self.start_time, 3),
+            "phases": _format_phase_stats(phases),
+            "categories": {
+                test_category: _format_phase_stats(category_phases)
+                for test_category, category_phases in sorted(categories.items())
+            },
+        }
+
+    def write(self, output_dir: Path) -> None:
+        """
+        Write the aggregated timings to `profile_metrics.json` in `output_dir`, and the sampled stacks, if any, to `profile_stacks.txt`.
+        The stacks are in the collapsed format (`frame;frame;frame count`, root first), as read by flamegraph.pl or speedscope.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with open(output_dir / PROFILE_METRICS_FILE_NAME, "w") as f:
+            json.dump(self.summary(), f, indent=4)
+
+        if self.sampler is not None:
+            self.sampler.stop()
+            with open(output_dir / PROFILE_STACKS_FILE_NAME, "w") as f:
+                for stack, count in self.sampler.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+
+
+class _Span:
+    __slots__ = ("profiler", "phase", "start_time")
+
+    def __init__(self, profiler: PhaseProfiler, phase: str) -> None:
+        self.profiler = profiler
+        self.phase = phase
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.profiler.record(self.phase, time.perf_counter() - self.start_time)
+
+
+def _timed_method(method, phase: str):
+    @wraps(method)
+    def timed_method(*args, **kwargs):
+        with profile_span(phase):
+            return method(*args, **kwargs)
+
+    return timed_method
+
+
+def _format_phase_stats(phase_stats: dict) -> dict:
+    # Slowest phases first
+    return {
+        phase: {
+            "count": count,
+            "total_seconds": round(total, 6),
+            "mean_ms": round(total / count * 1000, 3),
+            "max_ms": round(maximum * 1000, 3),
+        }
+        for phase, (count, total, maximum) in sorted(phase_stats.items(), key=lambda item: -item[1][1])
+    }
+
+
+class _StackSampler(threading.Thread):
+    """
+    Sample the call stack of every other thread of the process every `interval` seconds, counting the identical stacks.
+    """
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="bfcl-stack-sampler", daemon=True)
+        self.interval = interval
+        # collapsed stack -> number of samples
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_thread_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Union
 
 from bfcl.constant import TEST_COLLECTION_MAPPING, TEST_FILE_MAPPING, VERSION_PREFIX
+from bfcl.profiling import profile_span
 
 
 def extract_test_category(input_string: Union[str, Path]) -> str:
@@ -72,7 +73,7 @@ def is_sql(test_category):
 
 def load_file(file_path, sort_by_id=False):
     result = []
-    with open(file_path) as f:
+    with profile_span("load_file"), open(file_path) as f:
         file = f.readlines()
         for line in file:
             result.append(json.loads(line))
@@ -93,14 +94,22 @@ def write_list_of_dicts_to_file(filename, data, subdir=None):
     # Write the list of dictionaries to the file in JSON format
     with open(filename, "w") as f:
         for i, entry in enumerate(data):
-            # Go through each key-value pair in the dictionary to make sure the values are JSON serializable
-            entry = make_json_serializable(entry)
-            json_str = json.dumps(entry)
-            f.write(json_str)
+            f.write(json_dumps_serializable(entry))
             if i < len(data) - 1:
                 f.write("\n")
 
 
+def json_dumps_serializable(value) -> str:
+    """
+    Serialize `value` to JSON, converting the values that are not JSON serializable to strings, same as `make_json_serializable`.
+    Most entries are already serializable, so they are encoded directly; only the others go through `make_json_serializable`.
+    """
+    try:
+        return json.dumps(value)
+    except (TypeError, ValueError):
+        return json.dumps(make_json_serializable(value))
+
+
 def make_json_serializable(value):
     if isinstance(value, dict):
         # If the value is a dictionary, we need to go through each key-value pair recursively
@@ -108,6 +117,9 @@ def make_json_serializable(value):
     elif isinstance(value, list):
         # If the value is a list, we need to process each element recursively
         return [make_json_serializable(item) for item in value]
+    elif value is None or type(value) in (str, int, float, bool):
+        # The JSON scalar types are serializable as is, no need to try encoding them
+        return value
     else:
         # Try to serialize the value directly, and if it fails, convert it to a string
         try:
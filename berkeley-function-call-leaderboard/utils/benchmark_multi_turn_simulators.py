@@ -0,0 +1,360 @@
+import argparse
+import copy
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+from bfcl.constant import POSSIBLE_ANSWER_PATH, PROMPT_PATH, UTILS_PATH
+from bfcl.eval_checker.multi_turn_eval import multi_turn_utils
+from bfcl.eval_checker.multi_turn_eval.multi_turn_checker import (
+    _compare_instances,
+    state_checker,
+)
+from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
+    CLASS_FILE_PATH_MAPPING,
+    STATELESS_CLASSES,
+    create_instance,
+    execute_multi_turn_func_call,
+)
+from bfcl.utils import load_file, parse_test_category_argument
+from tabulate import tabulate
+
+"""
+This script benchmarks the multi-turn simulators (the classes in `func_source_code`) and the function call execution path (`execute_multi_turn_func_call`),
+by replaying the ground truth trajectories of the multi-turn test categories.
+
+For every simulator class, it measures:
+- `load_ms`: the time to create an instance with its scenario loaded (`create_instance`), in milliseconds per instance.
+- `calls_per_sec`: the throughput of its ground truth function calls, each executed through `execute_multi_turn_func_call`.
+- `compare_ms`: the time to compare the state of two instances, as done by the state checker, in milliseconds per instance pair.
+And for the execution path as a whole, the same metrics over all the classes (the comparison time is per test entry),
+plus `memory_kib`: the memory held by the instances of a test entry after its trajectory is replayed, in KiB.
+
+In every run, the loads and the trajectories are replayed over and over until each adds up to at least `--min-time` seconds,
+and every timing reported is the median of `--repeat` runs (the baseline keeps the value of every run). The memory is measured in a separate run, under `tracemalloc`.
+
+The results can be saved as a baseline, and are compared against the saved baseline on later runs.
+Only the metrics of the execution path as a whole are gated on: if the median of one of them is worse than its baseline by more than `--threshold` (relative),
+and none of its runs overlaps with the baseline runs, it is reported as a regression, and the script exits with status 1.
+The per-class metrics are too small to be stable from run to run, so their changes are only shown, to help locate a regression.
+Baselines are only comparable on the same machine, so they are not checked in.
+
+To run this script, use the following command:
+```
+cd berkeley-function-call-leaderboard/utils
+python benchmark_multi_turn_simulators.py --save-baseline  # Before the change
+python benchmark_multi_turn_simulators.py  # After the change
+```
+"""
+
+DEFAULT_BASELINE_PATH = UTILS_PATH / "multi_turn_benchmark_baseline.json"
+# Name of the metric group of the whole function call execution path
+EXECUTION_PATH = "execute_multi_turn_func_call"
+# Metrics for which a higher value is better; for all the others, lower is better
+HIGHER_IS_BETTER_METRICS = ["calls_per_sec"]
+# Number of state comparisons timed together
+COMPARE_BATCH_SIZE = 50
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--test-category",
+        default="multi_turn",
+        type=str,
+        help="The multi-turn test categories (or collections) to replay; use commas to separate multiple test categories.",
+    )
+    parser.add_argument(
+        "--repeat", default=5, type=int, help="Number of timed runs; the median timing of each metric is kept."
+    )
+    parser.add_argument(
+        "--min-time",
+        default=1.0,
+        type=float,
+        help="Minimum time, in seconds, that the timed loads (and function calls) must add up to in each run.",
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, type=Path, help="Path to the baseline file.")
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        default=False,
+        help="Save the results as the new baseline, instead of comparing against it.",
+    )
+    parser.add_argument(
+        "--threshold",
+        default=0.2,
+        type=float,
+        help="Relative slowdown (or memory increase) over the baseline above which a metric is reported as a regression.",
+    )
+    return parser.parse_args()
+
+
+def load_test_entries(test_category_arg: str) -> list[tuple[dict, list]]:
+    """
+    Load the test entries of the given multi-turn categories, each with its ground truth trajectory.
+    """
+    test_filename_total, test_name_total = parse_test_category_argument([test_category_arg])
+    for test_name in test_name_total:
+        if not test_name.startswith("multi_turn"):
+            raise Exception(f"Only multi-turn test categories can be benchmarked, got: {test_name}")
+
+    test_entries = []
+    for file_path in test_filename_total:
+        dataset_data = load_file(PROMPT_PATH / file_path)
+        ground_truth_data = load_file(POSSIBLE_ANSWER_PATH / file_path)
+        for test_entry, ground_truth_entry in zip(dataset_data, ground_truth_data):
+            test_entries.append((test_entry, ground_truth_entry["ground_truth"]))
+    return test_entries
+
+
+def is_long_context(test_entry: dict) -> bool:
+    test_category = test_entry["id"].rsplit("_", 1)[0]
+    return "long_context" in test_category or "composite" in test_category
+
+
+def get_class_method_mapping(involved_classes: list) -> dict:
+    """
+    Map each method name to the class that executes it, the same way `execute_multi_turn_func_call` does (the last involved class wins).
+    """
+    method_class_mapping = {}
+    for class_name in involved_classes:
+        class_ = getattr(importlib.import_module(CLASS_FILE_PATH_MAPPING[class_name]), class_name)
+        for method_name in dir(class_):
+            if not method_name.startswith("_") and callable(getattr(class_, method_name)):
+                method_class_mapping[method_name] = class_name
+    return method_class_mapping
+
+
+def release_instances(model_name: str) -> None:
+    """
+    Drop the instances created by `execute_multi_turn_func_call` for `model_name`, so that they don't pile up over the run.
+    """
+    module_globals = vars(multi_turn_utils)
+    for instance_name in [name for name in module_globals if name.startswith(f"{model_name}_")]:
+        del module_globals[instance_name]
+
+
+def time_scenario_loads(test_entries: list[tuple[dict, list]], min_time: float) -> dict:
+    """
+    Load the scenarios of every test entry through `create_instance`, over and over until the loads add up to at least `min_time` seconds.
+
+    Returns:
+        dict: metric group -> accumulated `{"load_time", "load_count"}`.
+    """
+    totals = defaultdict(lambda: defaultdict(float))
+    while totals[EXECUTION_PATH]["load_time"] < min_time:
+        for test_entry, _ in test_entries:
+            initial_config = test_entry["initial_config"]
+            long_context = is_long_context(test_entry)
+            for class_name in test_entry["involved_classes"]:
+                if class_name in STATELESS_CLASSES:
+                    continue
+                class_ = getattr(importlib.import_module(CLASS_FILE_PATH_MAPPING[class_name]), class_name)
+                class_initial_config = initial_config.get(class_name, {})
+                start_time = time.perf_counter()
+                create_instance(class_, class_initial_config, long_context=long_context)
+                elapsed_time = time.perf_counter() - start_time
+                for group in [class_name, EXECUTION_PATH]:
+                    totals[group]["load_time"] += elapsed_time
+                    totals[group]["load_count"] += 1
+    return totals
+
+
+def time_trajectories(test_entries: list[tuple[dict, list]], model_name: str, min_time: float) -> dict:
+    """
+    Replay every trajectory, timing the function calls and the state comparisons,
+    over and over until the function calls add up to at least `min_time` seconds.
+    Each comparison is timed over a batch of `COMPARE_BATCH_SIZE` comparisons, as a single one is too short to be timed reliably.
+
+    Returns:
+        dict: metric group -> accumulated `{"call_time", "call_count", "compare_time", "compare_count"}`.
+    """
+    totals = defaultdict(lambda: defaultdict(float))
+    while totals[EXECUTION_PATH]["call_time"] < min_time:
+        for test_entry, ground_truth in test_entries:
+            initial_config = test_entry["initial_config"]
+            involved_classes = test_entry["involved_classes"]
+            test_entry_id = test_entry["id"]
+            long_context = is_long_context(test_entry)
+
+            # The instances are created before the calls are timed
+            _, involved_instances = execute_multi_turn_func_call(
+                [], initial_config, involved_classes, model_name, test_entry_id, long_context=long_context
+            )
+            method_class_mapping = get_class_method_mapping(involved_classes)
+            for single_turn_ground_truth in ground_truth:
+                for func_call in single_turn_ground_truth:
+                    start_time = time.perf_counter()
+                    execute_multi_turn_func_call(
+                        [func_call], initial_config, involved_classes, model_name, test_entry_id, long_context=long_context
+                    )
+                    elapsed_time = time.perf_counter() - start_time
+                    class_name = method_class_mapping.get(func_call.split("(", 1)[0].strip())
+                    for group in [class_name, EXECUTION_PATH]:
+                        if group is not None:
+                            totals[group]["call_time"] += elapsed_time
+                            totals[group]["call_count"] += 1
+
+            # State comparisons, against an identical copy, which is the most expensive case (every attribute is compared)
+            reference_instances = copy.deepcopy(involved_instances)
+            for class_name, class_instance in involved_instances.items():
+                start_time = time.perf_counter()
+                for _ in range(COMPARE_BATCH_SIZE):
+                    _compare_instances(class_instance, reference_instances[class_name])
+                totals[class_name]["compare_time"] += time.perf_counter() - start_time
+                totals[class_name]["compare_count"] += COMPARE_BATCH_SIZE
+            start_time = time.perf_counter()
+            for _ in range(COMPARE_BATCH_SIZE):
+                state_checker(involved_instances, reference_instances)
+            totals[EXECUTION_PATH]["compare_time"] += time.perf_counter() - start_time
+            totals[EXECUTION_PATH]["compare_count"] += COMPARE_BATCH_SIZE
+
+            release_instances(model_name)
+
+    return totals
+
+
+def run_memory_pass(test_entries: list[tuple[dict, list]], model_name: str) -> float:
+    """
+    Replay every trajectory once under `tracemalloc`, and return the average memory held by the instances of a test entry, in KiB.
+    """
+    total_memory = 0
+    tracemalloc.start()
+    for test_entry, ground_truth in test_entries:
+        call_args = (
+            test_entry["initial_config"],
+            test_entry["involved_classes"],
+            model_name,
+            test_entry["id"],
+        )
+        long_context = is_long_context(test_entry)
+        memory_before, _ = tracemalloc.get_traced_memory()
+        execute_multi_turn_func_call([], *call_args, long_context=long_context)
+        for single_turn_ground_truth in ground_truth:
+            execute_multi_turn_func_call(single_turn_ground_truth, *call_args, long_context=long_context)
+        memory_after, _ = tracemalloc.get_traced_memory()
+        total_memory += memory_after - memory_before
+        release_instances(model_name)
+    tracemalloc.stop()
+    return total_memory / len(test_entries) / 1024
+
+
+def run_benchmark(test_entries: list[tuple[dict, list]], repeat: int, min_time: float) -> dict:
+    """
+    Returns:
+        dict: metric group (simulator class name or `EXECUTION_PATH`) -> metric name -> value of the metric in each run.
+    """
+    samples = defaultdict(lambda: defaultdict(list))
+    for run_index in range(repeat):
+        totals = time_scenario_loads(test_entries, min_time)
+        for group, group_totals in time_trajectories(test_entries, f"benchmark_run_{run_index}", min_time).items():
+            totals[group].update(group_totals)
+        for group, group_totals in totals.items():
+            if group_totals["load_count"]:
+                samples[group]["load_ms"].append(group_totals["load_time"] / group_totals["load_count"] * 1000)
+            if group_totals["call_count"]:
+                samples[group]["calls_per_sec"].append(group_totals["call_count"] / group_totals["call_time"])
+            if group_totals["compare_count"]:
+                samples[group]["compare_ms"].append(group_totals["compare_time"] / group_totals["compare_count"] * 1000)
+
+    # The timing runs have already imported the simulator modules, so the memory run only counts the instances
+    samples[EXECUTION_PATH]["memory_kib"].append(run_memory_pass(test_entries, "benchmark_memory"))
+
+    return {
+        group: dict(samples[group]) for group in sorted(samples, key=lambda group: (group == EXECUTION_PATH, group))
+    }
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float) -> tuple[list, list]:
+    """
+    The medians of the runs are compared. A metric regresses if its median is worse than the baseline one by more than `threshold`,
+    and every run is worse than every baseline run, so that a slowdown of the whole machine during one of the runs isn't reported.
+    Only the metrics of `EXECUTION_PATH` can regress; the per-class changes are only reported.
+
+    Returns:
+        tuple[list, list]: The table rows, and the `(group, metric)` pairs that regressed.
+    """
+    rows = []
+    regressions = []
+    for group, metrics in results.items():
+        for metric, values in metrics.items():
+            value = statistics.median(values)
+            baseline_values = baseline.get(group, {}).get(metric)
+            baseline_value = statistics.median(baseline_values) if baseline_values else None
+            if baseline_value is None or baseline_value == 0:
+                rows.append([group, metric, "N/A", round(value, 3), "N/A", ""])
+                continue
+            change = value / baseline_value - 1
+            if group != EXECUTION_PATH:
+                regressed = False
+            elif metric in HIGHER_IS_BETTER_METRICS:
+                regressed = change < -threshold and max(values) < min(baseline_values)
+            else:
+                regressed = change > threshold and min(values) > max(baseline_values)
+            if regressed:
+                regressions.append((group, metric))
+            rows.append(
+                [group, metric, round(baseline_value, 3), round(value, 3), f"{change:+.1%}", "REGRESSION" if regressed else ""]
+            )
+    return rows, regressions
+
+
+def main(args):
+    test_entries = load_test_entries(args.test_category)
+    print(f"Replaying the ground truth of {len(test_entries)} test entries, {args.repeat} time(s)...")
+    results = run_benchmark(test_entries, args.repeat, args.min_time)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {
+                    "test_category": args.test_category,
+                    "python_version": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                f,
+                indent=4,
+            )
+        print(
+            tabulate(
+                [
+                    [group, metric, round(statistics.median(values), 3)]
+                    for group, metrics in results.items()
+                    for metric, values in metrics.items()
+                ],
+                headers=["Group", "Metric", "Value"],
+            )
+        )
+        print(f"Baseline saved to {args.baseline}.")
+        return 0
+
+    baseline = {}
+    if args.baseline.exists():
+        with open(args.baseline, "r") as f:
+            baseline_data = json.load(f)
+        if baseline_data["test_category"] != args.test_category:
+            print(
+                f"Warning: the baseline was measured on '{baseline_data['test_category']}', not '{args.test_category}'; it is ignored."
+            )
+        else:
+            baseline = baseline_data["results"]
+    else:
+        print(f"No baseline found at {args.baseline}; run with `--save-baseline` to create one.")
+
+    rows, regressions = compare_with_baseline(results, baseline, args.threshold)
+    print(tabulate(rows, headers=["Group", "Metric", "Baseline", "Current", "Change", ""]))
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%} over the baseline.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(get_args()))
@@ -0,0 +1,314 @@
+import argparse
+import copy
+import importlib
+import json
+import random
+
+from bfcl.constant import POSSIBLE_ANSWER_PATH, PROMPT_PATH, TEST_FILE_MAPPING
+from bfcl.eval_checker.multi_turn_eval import multi_turn_utils
+from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
+    CLASS_FILE_PATH_MAPPING,
+    execute_multi_turn_func_call,
+)
+from bfcl.utils import load_file, parse_test_category_argument, write_list_of_dicts_to_file
+
+"""
+This script generates synthetic scaled-up variants of the multi-turn test categories, to stress test the handlers, simulators and checkers with much bigger states.
+
+Every `initial_config` is scaled along the selected axes, by adding `(scale - 1)` times as many synthetic items as the config already holds (at least `scale - 1`):
+- `files`: files in every non-empty directory of the `GorillaFileSystem` (`scale - 1` times as many as the directory holds).
+- `messages`: messages in the `MessageAPI` inbox.
+- `tweets`: tweets of the `TwitterAPI`.
+- `orders`: orders and transaction history entries of the `TradingBot`.
+- `tickets`: tickets in the `TicketAPI` queue.
+- `bookings`: booking records of the `TravelAPI`.
+The existing items are left untouched, and the synthetic ones use names and IDs that the questions never refer to,
+and that don't shift the IDs the simulators assign to new items (e.g. the tweet counter), so the ground truth trajectories stay valid.
+As a safeguard, the ground truth is replayed on both the original and the scaled config, and an entry is not scaled along an axis if its calls then don't fail (or succeed) the same way
+(e.g. a directory whose files are removed one by one before the directory itself).
+
+The scaled variant of `<category>` is the category `<category>_scaled_<scale>x` (followed by the axes, if not all of them are scaled).
+Its dataset and possible answer files are written next to the original ones, and are picked up as regular test categories (see `bfcl/constant.py`),
+also available all together as the `multi_turn_scaled` collection.
+
+To run this script, use the following command:
+```
+cd berkeley-function-call-leaderboard/utils
+python generate_scaled_multi_turn_dataset.py --test-category multi_turn_base,multi_turn_long_context --scale 10,100
+```
+"""
+
+SCALING_AXES = ["files", "messages", "tweets", "orders", "tickets", "bookings"]
+# The synthetic items use IDs from here on, far above the counters the simulators assign IDs from
+SYNTHETIC_ID_OFFSET = 1000000
+SYNTHETIC_WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet",
+    "kilo", "lima", "mike", "november", "oscar", "papa", "quebec", "romeo", "sierra", "tango",
+]  # fmt: skip
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--test-category",
+        default="multi_turn",
+        type=str,
+        help="The multi-turn test categories (or collections) to scale up; use commas to separate multiple test categories.",
+    )
+    parser.add_argument(
+        "--scale", default="10", type=str, help="The scale factors; use commas to separate multiple scale factors."
+    )
+    parser.add_argument(
+        "--axes",
+        default=",".join(SCALING_AXES),
+        type=str,
+        help=f"The axes to scale along, among {', '.join(SCALING_AXES)}; use commas to separate multiple axes.",
+    )
+    parser.add_argument("--seed", default=0, type=int, help="Seed of the synthetic contents.")
+    return parser.parse_args()
+
+
+def get_scaled_test_category(test_category: str, scale: int, axes: list[str]) -> str:
+    scaled_test_category = f"{test_category}_scaled_{scale}x"
+    if sorted(axes) != sorted(SCALING_AXES):
+        scaled_test_category += "_" + "_".join(axes)
+    return scaled_test_category
+
+
+def synthetic_text(rng: random.Random, num_words: int = 8) -> str:
+    return " ".join(rng.choice(SYNTHETIC_WORDS) for _ in range(num_words))
+
+
+def get_state(class_config: dict, class_name: str, key: str):
+    """
+    The value of a state attribute in the config, or its default value (that `_load_scenario` would use) if the config doesn't set it.
+    """
+    if key not in class_config:
+        module = importlib.import_module(CLASS_FILE_PATH_MAPPING[class_name])
+        class_config[key] = copy.deepcopy(module.DEFAULT_STATE[key])
+    return class_config[key]
+
+
+#### Scalers, one per axis, that extend the config of a class in place ####
+
+
+def scale_files(class_config: dict, scale: int, rng: random.Random) -> None:
+    # Without a root, the default file system is used; it is left as is
+    for directory in class_config.get("root", {}).values():
+        _scale_directory(directory, scale, rng)
+
+
+def _scale_directory(directory: dict, scale: int, rng: random.Random) -> None:
+    if directory.get("type") != "directory":
+        return
+    contents = directory.setdefault("contents", {})
+    for item in list(contents.values()):
+        _scale_directory(item, scale, rng)
+
+    # Empty directories stay empty, as they may be removed along the trajectory
+    num_files = sum(1 for item in contents.values() if item.get("type") == "file")
+    synthetic_index = 0
+    for _ in range((scale - 1) * num_files):
+        while f"synthetic_{synthetic_index:06d}.txt" in contents:
+            synthetic_index += 1
+        contents[f"synthetic_{synthetic_index:06d}.txt"] = {
+            "type": "file",
+            "content": "\n".join(synthetic_text(rng) for _ in range(rng.randint(1, 5))),
+        }
+
+
+def scale_messages(class_config: dict, scale: int, rng: random.Random) -> None:
+    inbox = get_state(class_config, "MessageAPI", "inbox")
+    # The synthetic messages go first, so that the latest message to any user is still the same
+    class_config["inbox"] = [
+        {f"USR{900 + i % 100}": synthetic_text(rng)} for i in range((scale - 1) * max(len(inbox), 1))
+    ] + inbox
+
+
+def scale_tweets(class_config: dict, scale: int, rng: random.Random) -> None:
+    tweets = get_state(class_config, "TwitterAPI", "tweets")
+    for i in range((scale - 1) * max(len(tweets), 1)):
+        tweet_id = SYNTHETIC_ID_OFFSET + i
+        tweets[str(tweet_id)] = {
+            "id": tweet_id,
+            "username": f"synthetic_user_{i % 100}",
+            "content": synthetic_text(rng),
+            "tags": [f"#{rng.choice(SYNTHETIC_WORDS)}"],
+            "mentions": [],
+        }
+
+
+def scale_orders(class_config: dict, scale: int, rng: random.Random) -> None:
+    orders = get_state(class_config, "TradingBot", "orders")
+    symbols = list(get_state(class_config, "TradingBot", "stocks"))
+    for i in range((scale - 1) * max(len(orders), 1)):
+        order_id = SYNTHETIC_ID_OFFSET + i
+        orders[str(order_id)] = {
+            "id": order_id,
+            "order_type": rng.choice(["Buy", "Sell"]),
+            "symbol": rng.choice(symbols),
+            "price": round(rng.uniform(10, 1000), 2),
+            "amount": rng.randint(1, 100),
+            "status": rng.choice(["Completed", "Pending", "Cancelled"]),
+        }
+
+    transaction_history = get_state(class_config, "TradingBot", "transaction_history")
+    # The synthetic transactions are older than any in the scenarios
+    transaction_history[:0] = [
+        {
+            "type": rng.choice(["deposit", "withdrawal"]),
+            "amount": round(rng.uniform(10, 1000), 2),
+            "timestamp": f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+        }
+        for _ in range((scale - 1) * max(len(transaction_history), 1))
+    ]
+
+
+def scale_tickets(class_config: dict, scale: int, rng: random.Random) -> None:
+    ticket_queue = get_state(class_config, "TicketAPI", "ticket_queue")
+    for i in range((scale - 1) * max(len(ticket_queue), 1)):
+        ticket_queue.append(
+            {
+                "id": SYNTHETIC_ID_OFFSET + i,
+                "title": synthetic_text(rng, 3),
+                "description": synthetic_text(rng),
+                "status": rng.choice(["Open", "In Progress", "Closed"]),
+                "priority": rng.randint(1, 5),
+                "created_by": f"synthetic_user_{i % 100}",
+            }
+        )
+
+
+def scale_bookings(class_config: dict, scale: int, rng: random.Random) -> None:
+    booking_record = get_state(class_config, "TravelAPI", "booking_record")
+    for i in range((scale - 1) * max(len(booking_record), 1)):
+        booking_record[f"synthetic_booking_{i:06d}"] = {
+            "card_id": f"synthetic_card_{i % 100}",
+            "travel_date": f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "travel_from": rng.choice(["SFO", "LAX", "JFK", "ORD", "SEA"]),
+            "travel_to": rng.choice(["BOS", "ATL", "DFW", "DEN", "MIA"]),
+            "travel_class": rng.choice(["economy", "business", "first"]),
+            "travel_cost": round(rng.uniform(100, 2000), 2),
+            "transaction_id": f"synthetic_transaction_{i:06d}",
+        }
+
+
+# axis -> (class name, scaler)
+AXIS_SCALER_MAPPING = {
+    "files": ("GorillaFileSystem", scale_files),
+    "messages": ("MessageAPI", scale_messages),
+    "tweets": ("TwitterAPI", scale_tweets),
+    "orders": ("TradingBot", scale_orders),
+    "tickets": ("TicketAPI", scale_tickets),
+    "bookings": ("TravelAPI", scale_bookings),
+}
+
+
+#### Ground truth validation ####
+
+
+def is_error_result(execution_result: str) -> bool:
+    if execution_result.startswith("Error during execution"):
+        return True
+    try:
+        execution_result = json.loads(execution_result)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(execution_result, dict) and "error" in execution_result
+
+
+def replay_ground_truth(test_entry: dict, ground_truth: list, initial_config: dict, model_name: str) -> list[bool]:
+    """
+    Execute the ground truth trajectory on `initial_config`, and return whether each call failed.
+    """
+    test_category = test_entry["id"].rsplit("_", 1)[0]
+    call_failures = []
+    for single_turn_ground_truth in ground_truth:
+        execution_results, _ = execute_multi_turn_func_call(
+            single_turn_ground_truth,
+            initial_config,
+            test_entry["involved_classes"],
+            model_name,
+            test_entry["id"],
+            long_context=("long_context" in test_category or "composite" in test_category),
+        )
+        call_failures.extend(is_error_result(execution_result) for execution_result in execution_results)
+
+    # Drop the instances, so that they don't pile up over the run
+    module_globals = vars(multi_turn_utils)
+    for instance_name in [name for name in module_globals if name.startswith(f"{model_name}_")]:
+        del module_globals[instance_name]
+    return call_failures
+
+
+def scale_test_entry(test_entry: dict, ground_truth: list, scale: int, axes: list[str], seed: int) -> tuple[dict, list[str]]:
+    """
+    Scale the initial config of a test entry along each of the axes in turn, keeping only the axes along which the ground truth trajectory still holds.
+
+    Returns:
+        tuple[dict, list[str]]: The scaled initial config, and the axes that were dropped.
+    """
+    initial_config = test_entry["initial_config"]
+    original_call_failures = replay_ground_truth(test_entry, ground_truth, initial_config, "scaling_original")
+    scaled_config = copy.deepcopy(initial_config)
+    dropped_axes = []
+    for axis in axes:
+        class_name, scaler = AXIS_SCALER_MAPPING[axis]
+        if class_name not in test_entry["involved_classes"]:
+            continue
+        candidate_config = copy.deepcopy(scaled_config)
+        # Seeded per axis, so that the synthetic items along an axis don't depend on the other axes
+        scaler(candidate_config.setdefault(class_name, {}), scale, random.Random(f"{seed}-{test_entry['id']}-{axis}"))
+        if replay_ground_truth(test_entry, ground_truth, candidate_config, "scaling_scaled") == original_call_failures:
+            scaled_config = candidate_config
+        else:
+            dropped_axes.append(axis)
+    return scaled_config, dropped_axes
+
+
+def generate_scaled_category(test_category: str, scale: int, axes: list[str], seed: int) -> None:
+    scaled_test_category = get_scaled_test_category(test_category, scale, axes)
+    scaled_file_name = TEST_FILE_MAPPING[test_category].replace(test_category, scaled_test_category)
+
+    scaled_dataset, scaled_possible_answers = [], []
+    dropped_axes_count = {}
+    for test_entry, possible_answer in zip(
+        load_file(PROMPT_PATH / TEST_FILE_MAPPING[test_category]),
+        load_file(POSSIBLE_ANSWER_PATH / TEST_FILE_MAPPING[test_category]),
+    ):
+        scaled_config, dropped_axes = scale_test_entry(test_entry, possible_answer["ground_truth"], scale, axes, seed)
+        for axis in dropped_axes:
+            dropped_axes_count[axis] = dropped_axes_count.get(axis, 0) + 1
+
+        scaled_id = f"{scaled_test_category}_{test_entry['id'].rsplit('_', 1)[1]}"
+        scaled_dataset.append({**test_entry, "id": scaled_id, "initial_config": scaled_config})
+        scaled_possible_answers.append({**possible_answer, "id": scaled_id})
+
+    write_list_of_dicts_to_file(scaled_file_name, scaled_dataset, subdir=PROMPT_PATH)
+    write_list_of_dicts_to_file(scaled_file_name, scaled_possible_answers, subdir=POSSIBLE_ANSWER_PATH)
+    print(f"{scaled_test_category}: {len(scaled_dataset)} entries written to {scaled_file_name}")
+    for axis, count in dropped_axes_count.items():
+        print(f"    {count} entries are not scaled along `{axis}`, as their ground truth doesn't hold when scaled along it")
+
+
+def main(args):
+    _, test_name_total = parse_test_category_argument([args.test_category])
+    scales = [int(scale) for scale in args.scale.split(",")]
+    axes = args.axes.split(",")
+    for axis in axes:
+        if axis not in AXIS_SCALER_MAPPING:
+            raise Exception(f"Invalid scaling axis provided: {axis}")
+    for scale in scales:
+        if scale < 2:
+            raise Exception(f"Invalid scale factor provided: {scale}; it must be at least 2.")
+
+    for test_category in test_name_total:
+        if not test_category.startswith("multi_turn") or "_scaled_" in test_category:
+            print(f"Skipping {test_category}, as only the original multi-turn test categories can be scaled up.")
+            continue
+        for scale in scales:
+            generate_scaled_category(test_category, scale, axes, args.seed)
+
+
+if __name__ == "__main__":
+    main(get_args())